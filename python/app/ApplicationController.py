@@ -1,30 +1,51 @@
 # python/app/ApplicationController.py（修改版）
 """
 应用程序控制器 - 协调游戏服务和UI
+
+HTTP服务器（Flask）、MCP服务器（mcp/FastMCP）和游戏窗口（pygame）只在启用时才导入；
+第一个关卡在后台线程中生成，同时导入并启动服务器，缩短进程启动到可处理请求的时间。
 """
+import signal
+import sys
 import threading
+from typing import Optional
 
-from python.constants import GameConstants, ResourcePaths, ServerConstants
+from python.app.EventBridge import EventBridge
+from python.app.EventLogSink import EventLogSink
+from python.app.GameEventBus import GameEventBus
+from python.constants import GameConstants, ResourcePaths, ServerConstants, UIConstants
 from python.core.game.MazeGameService import MazeGameService
-from python.logger import logger
-from python.server.HttpGameServer import HttpGameServer
-from python.server.McpGameServer import McpGameServer
-from python.ui.GameWindow import GameWindow
+from python.logger import LoggerFactory, logger
+from python.server.McpResponseFormatter import OutputMode
+from python.server.RateLimiter import RateLimiter, RequestGate
+from python.utils.StartupProfiler import StartupProfiler
 
 
 class ApplicationController:
     """应用程序控制器"""
 
-    def __init__(self):
+    def __init__(self, profiler: Optional[StartupProfiler] = None):
+        """
+        Args:
+            profiler: 启动分析器（记录 initialize 各阶段耗时），默认新建一个不统计导入耗时的分析器
+        """
+        self.profiler = profiler or StartupProfiler()
         self.game_service = None
         self.http_server = None
         self.mcp_server = None
         self.game_window = None
         self.mcp_thread = None
+        self.request_gate = None
+        self.event_log = None
+        self.event_bridge = None
+        self.headless = False
+        # 无界面模式的主循环等待该事件（收到 SIGTERM 或调用 stop 时设置）
+        self.stop_event = threading.Event()
 
     def initialize(self, args):
         """初始化应用程序"""
         logger.info("开始初始化应用程序")
+        phase = self.profiler.phase
 
         # 确保资源目录存在
         ResourcePaths.ensure_resources_dir()
@@ -34,35 +55,121 @@ class ApplicationController:
         maze_height = args.maze_height if hasattr(args, 'maze_height') else GameConstants.MAZE_HEIGHT
         http_host = args.host if hasattr(args, 'host') else ServerConstants.DEFAULT_HOST
         http_port = args.port if hasattr(args, 'port') else ServerConstants.DEFAULT_PORT
+        self.rate_limit = getattr(args, 'rate_limit', ServerConstants.RATE_LIMIT_PER_SECOND)
+        self.rate_burst = getattr(args, 'rate_burst', ServerConstants.RATE_LIMIT_BURST)
+        max_queue = getattr(args, 'max_queue', ServerConstants.MAX_QUEUED_REQUESTS)
+        self.mcp_output_mode = OutputMode(getattr(args, 'mcp_output', OutputMode.TEXT.value))
+        self.mcp_transport = getattr(args, 'mcp_transport', None) or "sse"
+        mcp_host = getattr(args, 'mcp_host', None) or http_host
+        mcp_port = getattr(args, 'mcp_port', None)
+        self.headless = getattr(args, 'headless', False)
+        enable_http = not getattr(args, 'no_http', False)
+        enable_mcp = not getattr(args, 'no_mcp', False)
+
+        # stdio 传输使用标准输出传递协议消息，日志必须改到标准错误
+        if self.mcp_transport == "stdio":
+            LoggerFactory.use_stderr()
+
+        # 无界面模式下没有读取事件历史的组件，关闭历史记录，无订阅者的事件几乎没有开销
+        if self.headless:
+            GameEventBus().set_history_size(0)
+
+        # 创建游戏服务：第一个关卡在后台线程中生成（持有服务锁），与下面导入和启动服务器同时进行；
+        # 生成完成前到达的请求在服务锁上等待
+        with phase("游戏服务"):
+            self.game_service = MazeGameService(maze_width, maze_height, generate_in_background=True)
+        logger.info(f"游戏服务初始化完成，正在后台生成迷宫 (迷宫尺寸: {maze_width}x{maze_height})")
 
-        # MCP服务器端口（HTTP端口+1）
-        mcp_port = http_port + 1
+        # 事件日志（可选）
+        event_log_path = getattr(args, 'event_log', None)
+        if event_log_path:
+            with phase("事件日志"):
+                self.event_log = EventLogSink(event_log_path, snapshot_provider=self.game_service.snapshot)
+                GameEventBus().add_sink(self.event_log)
+            logger.info(f"事件日志已启用: {event_log_path}")
 
-        # 创建游戏服务
-        self.game_service = MazeGameService(maze_width, maze_height)
-        logger.info(f"游戏服务初始化完成 (迷宫尺寸: {maze_width}x{maze_height})")
+        # 跨进程事件桥（可选）
+        bridge_address = getattr(args, 'event_bridge', None)
+        if bridge_address:
+            with phase("事件桥"):
+                mirror_service = self.game_service if getattr(args, 'bridge_mirror', False) else None
+                self.event_bridge = EventBridge(bridge_address, mirror_service=mirror_service).start()
+
+        # HTTP和MCP共享同一个游戏服务，因此共享同一个有界请求队列
+        self.request_gate = RequestGate(
+            ServerConstants.MAX_CONCURRENT_REQUESTS, max_queue, ServerConstants.QUEUE_TIMEOUT)
 
         # 创建HTTP服务器
-        self.http_server = HttpGameServer(self.game_service, http_host, http_port)
+        if enable_http:
+            with phase("HTTP服务器"):
+                self._start_http_server(http_host, http_port)
+            logger.info(f"HTTP服务器启动完成: {self.http_server.get_server_url()}")
+        else:
+            logger.info("HTTP服务器未启用")
+
+        # 创建MCP服务器（在单独线程中运行），未指定端口时使用HTTP实际端口+1
+        if enable_mcp:
+            with phase("MCP服务器"):
+                self._start_mcp_server(mcp_host, mcp_port or (self.http_server.port if self.http_server
+                                                              else http_port) + 1)
+        else:
+            logger.info("MCP服务器未启用")
+
+        with phase("等待第一个关卡"):
+            self.game_service.wait_until_ready()
+        if self.game_service.game_state is None:
+            raise RuntimeError("生成第一个关卡失败")
+
+        # 创建游戏窗口（无界面模式下不导入 pygame）
+        if self.headless:
+            logger.info("无界面模式：不创建游戏窗口")
+        else:
+            with phase("游戏窗口"):
+                self._create_game_window(args)
+
+        logger.info(f"应用程序初始化完成 ({self.profiler.elapsed() * 1000:.0f} ms)")
+
+    def _start_http_server(self, host: str, port: int):
+        """导入并启动HTTP服务器（Flask 只在这里才导入）"""
+        from python.server.HttpGameServer import HttpGameServer
+
+        self.http_server = HttpGameServer(
+            self.game_service, host, port,
+            rate_limiter=RateLimiter(self.rate_limit, self.rate_burst),
+            request_gate=self.request_gate
+        )
         self.http_server.start()
-        logger.info(f"HTTP服务器启动完成: {self.http_server.get_server_url()}")
 
-        # 创建MCP服务器（在单独线程中运行）
-        self._start_mcp_server(http_host, mcp_port)
+    def _create_game_window(self, args):
+        """创建游戏窗口；pygame、pygame_gui 和字体只在这里才导入"""
+        import pygame
 
-        # 创建游戏窗口
-        self.game_window = GameWindow(self.game_service, self.http_server)
-        logger.info("游戏窗口初始化完成")
+        from python.ui.GameWindow import GameWindow
 
-        logger.info("应用程序初始化完成")
+        try:
+            self.game_window = GameWindow(
+                self.game_service, self.http_server,
+                max_fps=getattr(args, 'max_fps', UIConstants.MAX_FPS),
+                show_fps=getattr(args, 'show_fps', False)
+            )
+        except pygame.error as e:
+            raise RuntimeError(f"无法创建游戏窗口（没有显示器时请使用 --headless）: {e}") from e
+        logger.info("游戏窗口初始化完成")
 
     def _start_mcp_server(self, host: str, port: int):
-        """启动MCP服务器线程"""
+        """导入并启动MCP服务器线程（mcp/FastMCP 只在这里才导入）"""
+        from python.server.McpGameServer import McpGameServer
+
+        self.mcp_server = McpGameServer(
+            self.game_service,
+            rate_limiter=RateLimiter(self.rate_limit, self.rate_burst),
+            request_gate=self.request_gate,
+            output_mode=self.mcp_output_mode
+        )
 
         def run_mcp_server():
             try:
-                self.mcp_server = McpGameServer(self.game_service)
-                self.mcp_server.run(host=host, port=port)
+                self.mcp_server.run(host=host, port=port, transport=self.mcp_transport)
             except Exception as e:
                 logger.error(f"MCP服务器运行错误: {e}")
 
@@ -73,11 +180,11 @@ class ApplicationController:
         )
         self.mcp_thread.start()
 
-        logger.info(f"MCP服务器启动完成: http://{host}:{port}")
+        logger.info(f"MCP服务器启动完成: {self.mcp_server.get_endpoint_url(self.mcp_transport)}")
 
     def run(self):
         """运行应用程序"""
-        if not all([self.game_service, self.http_server, self.mcp_server]):
+        if self.game_service is None:
             raise RuntimeError("应用程序未正确初始化")
 
         # 显示启动信息
@@ -85,7 +192,10 @@ class ApplicationController:
 
         # 运行主循环
         try:
-            self.game_window.run()
+            if self.headless:
+                self._run_headless()
+            else:
+                self.game_window.run()
         except KeyboardInterrupt:
             logger.info("收到键盘中断信号")
         except Exception as e:
@@ -93,48 +203,87 @@ class ApplicationController:
         finally:
             self.shutdown()
 
+    def _run_headless(self):
+        """无界面模式的主循环：阻塞等待停止信号，服务器在各自的线程中运行"""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+
+        # 带超时等待，保证 Ctrl+C 能及时打断；stdio 传输的客户端断开后 MCP 线程结束，进程随之退出
+        while not self.stop_event.wait(ServerConstants.HEADLESS_WAIT_SECONDS):
+            if self.mcp_transport == "stdio" and self.mcp_thread and not self.mcp_thread.is_alive():
+                logger.info("MCP stdio 连接已关闭")
+                break
+
+    def stop(self):
+        """请求无界面模式的主循环退出"""
+        self.stop_event.set()
+
     def _print_startup_info(self):
         """打印启动信息"""
-        http_url = self.http_server.get_server_url()
-        mcp_url = f"http://{self.http_server.host}:{self.http_server.port + 1}"
+        http_url = self.http_server.get_server_url() if self.http_server else "未启用"
+        mcp_url = self.mcp_server.get_endpoint_url(self.mcp_transport) if self.mcp_server else "未启用"
 
         info_lines = [
             "=" * 60,
             "迷宫AI游戏",
             "=" * 60,
             f"HTTP API服务器: {http_url}",
-            f"MCP SSE服务器: {mcp_url}",
+            f"MCP服务器 ({self.mcp_transport}): {mcp_url}",
             "",
             "控制方式:",
-            "  - 界面按钮: 使用方向控制面板",
-            "  - 键盘: WASD或方向键控制方向，空格键等待",
-            "  - HTTP API: 通过RESTful API远程控制",
-            "  - MCP协议: 通过SSE协议供AI调用",
-            "",
-            "HTTP API接口:",
-            "  - GET  /api/health     - 健康检查",
-            "  - GET  /api/state      - 获取游戏状态",
-            "  - POST /api/move       - 移动玩家",
-            "  - POST /api/reset      - 重置当前关卡",
-            "  - POST /api/new-level  - 生成新关卡",
+            *([] if self.headless else [
+                "  - 界面按钮: 使用方向控制面板",
+                "  - 键盘: WASD或方向键控制方向，空格键等待，+/-键或滚轮缩放迷宫",
+            ]),
+            *(["  - HTTP API: 通过RESTful API远程控制"] if self.http_server else []),
+            *(["  - MCP协议: 通过stdio/SSE/Streamable HTTP供AI调用"] if self.mcp_server else []),
+            *(["  (无界面模式，按 Ctrl+C 或发送 SIGTERM 退出)"] if self.headless else []),
             "",
-            "MCP工具 (通过SSE):",
-            "  - get_game_state - 获取游戏状态",
-            "  - move_player(direction) - 移动玩家 (direction: up/down/left/right/wait)",
-            "  - reset_level - 重置当前关卡",
-            "  - new_level - 生成新关卡",
-            "",
-            "使用示例 (使用MCP客户端如Claude Desktop):",
-            '  配置MCP服务器:',
-            '  {',
-            f'    "command": "python",',
-            f'    "args": ["python/server/mcp/run_mcp_server.py", "--host", "{self.http_server.host}", "--port", "{self.http_server.port + 1}"]',
-            '  }',
-            "=" * 60
         ]
 
+        if self.http_server:
+            info_lines += [
+                "HTTP API接口:",
+                "  - GET  /api/health     - 健康检查",
+                "  - GET  /api/state      - 获取游戏状态",
+                "  - GET  /api/maze       - 获取迷宫布局",
+                "  - POST /api/move       - 移动玩家",
+                "  - POST /api/move/batch - 连续移动",
+                "  - GET  /api/stream     - 游戏状态推送 (SSE)",
+                "  - POST /api/reset      - 重置当前关卡",
+                "  - POST /api/new-level  - 生成新关卡",
+                "  - GET  /api/limits     - 限流与背压统计",
+                "  - GET  /api/metrics    - 性能指标 (Prometheus)",
+                "",
+            ]
+
+        if self.mcp_server:
+            mcp_settings = self.mcp_server.mcp.settings
+            info_lines += [
+                "MCP工具:",
+                "  - get_game_state - 获取游戏状态",
+                "  - move_player(direction) - 移动玩家 (direction: up/down/left/right/wait)",
+                "  - move_sequence(directions) - 连续移动 (directions: 如 \"uurrd\")",
+                "  - probe - 查看相邻格子是否可通行",
+                "  - reset_level - 重置当前关卡",
+                "  - new_level - 生成新关卡",
+                "  (所有工具支持 output 参数: text/json/terse)",
+                "",
+                "使用示例 (使用MCP客户端如Claude Desktop):",
+                f'  连接本进程: {mcp_url}',
+                '  或启动独立的MCP服务器进程 (拥有独立的迷宫):',
+                '  {',
+                f'    "command": "python",',
+                f'    "args": ["python/server/run_mcp_server.py", "--transport", "stdio"]',
+                '  }',
+                f'  其他传输: --transport streamable-http --host {mcp_settings.host} --port <端口>',
+            ]
+        info_lines.append("=" * 60)
+
+        # stdio 传输占用标准输出，启动信息改为输出到标准错误
+        stream = sys.stderr if self.mcp_transport == "stdio" else sys.stdout
         for line in info_lines:
-            print(line)
+            print(line, file=stream)
 
     def shutdown(self):
         """关闭应用程序"""
@@ -148,4 +297,12 @@ class ApplicationController:
             self.http_server.stop()
             logger.info("HTTP服务器已停止")
 
+        if self.event_bridge:
+            self.event_bridge.close()
+
+        if self.event_log:
+            GameEventBus().remove_sink(self.event_log)
+            self.event_log.close()
+            logger.info("事件日志已关闭")
+
         logger.info("应用程序关闭完成")
@@ -0,0 +1,426 @@
+# python/app/EventBridge.py
+"""
+跨进程事件桥 - 通过本机套接字在多个进程的 GameEventBus 之间转发事件
+
+同一地址上第一个启动的进程作为中心节点（hub）监听，其余进程作为客户端连接；
+每个节点把本进程总线上的事件批量发送出去，并把收到的事件重新发送到本进程总线上。
+中心节点按各客户端订阅的事件类型转发，不会把事件发回来源。
+地址为Unix域套接字路径，或 tcp://host:port（不支持Unix域套接字的平台）。
+"""
+import json
+import os
+import socket
+import struct
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from python.app.GameEventBus import GAME_EVENT_TYPES, EventType, GameEventBus
+from python.logger import logger
+from python.server.StateSerializer import encode_json
+from python.utils.MetricsRegistry import metrics
+
+SENT_EVENTS = metrics.counter(
+    "maze_event_bridge_sent_total", "事件桥发送到其他进程的事件数")
+RECEIVED_EVENTS = metrics.counter(
+    "maze_event_bridge_received_total", "事件桥从其他进程收到的事件数")
+DROPPED_BRIDGE_EVENTS = metrics.counter(
+    "maze_event_bridge_dropped_total", "事件桥发送队列已满而丢弃的事件数")
+
+# 默认转发的事件类型：游戏事件和状态更新（按键、窗口等界面事件只在本进程内有意义）
+BRIDGE_EVENT_TYPES = GAME_EVENT_TYPES + (EventType.GAME_STATE_UPDATED,)
+
+_HEADER = struct.Struct("!I")
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+def _parse_address(address: str) -> Tuple[int, Any]:
+    """解析地址，返回 (套接字族, 套接字地址)"""
+    if address.startswith("tcp://"):
+        host, _, port = address[len("tcp://"):].rpartition(":")
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    if not hasattr(socket, "AF_UNIX"):
+        raise ValueError(f"当前平台不支持Unix域套接字，请使用 tcp://127.0.0.1:<端口>: {address}")
+    return socket.AF_UNIX, address
+
+
+def _send_frame(sock: socket.socket, message: Dict[str, Any]) -> None:
+    body = encode_json(message)
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_frame(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """读取一帧，连接关闭时返回 None"""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(f"事件帧过大: {size} 字节")
+    body = _recv_exact(sock, size)
+    if body is None:
+        return None
+    return json.loads(body)
+
+
+class _Peer:
+    """中心节点上的一个客户端连接"""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.node = "?"
+        self.event_types: Optional[frozenset] = None  # 收到 hello 之前不转发
+        self.send_lock = threading.Lock()
+
+    def send_events(self, origin: str, records: List[list]) -> bool:
+        """发送该连接订阅的事件，失败时返回 False"""
+        event_types = self.event_types
+        if event_types is None:
+            return True
+        selected = [record for record in records if record[0] in event_types]
+        if not selected:
+            return True
+        try:
+            with self.send_lock:
+                _send_frame(self.sock, {"op": "events", "node": origin, "events": selected})
+            return True
+        except OSError:
+            return False
+
+
+class EventBridge:
+    """
+    跨进程事件桥
+    实例作为接收端挂到 GameEventBus（见 GameEventBus.add_sink），本进程的事件由后台线程批量发送；
+    收到的事件在接收线程上重新发送到本进程总线，此时产生的事件不会再被转发，避免回环。
+    """
+
+    def __init__(self, address: str, publish_types: Iterable[EventType] = BRIDGE_EVENT_TYPES,
+                 subscribe_types: Iterable[EventType] = BRIDGE_EVENT_TYPES, mirror_service=None,
+                 batch_size: int = 64, flush_interval: float = 0.01, max_pending: int = 10000,
+                 retry_interval: float = 1.0):
+        """
+        Args:
+            address: Unix域套接字路径，或 tcp://host:port
+            publish_types: 发送到其他进程的事件类型
+            subscribe_types: 从其他进程接收的事件类型
+            mirror_service: 可选的 MazeGameService，收到的新关卡与状态更新会恢复到该服务上，
+                            适用于只展示其他进程游戏状态的观察进程
+            batch_size: 发送队列积累到该数量时立即发送
+            flush_interval: 发送线程最长的等待时间（秒）
+            max_pending: 发送队列上限，超出后丢弃新事件
+            retry_interval: 连接断开后重连的间隔（秒）
+        """
+        self.address = address
+        self.family, self.sock_address = _parse_address(address)
+        self.event_types = tuple(publish_types)
+        self.subscribe_types = frozenset(event_type.value for event_type in subscribe_types)
+        self.mirror_service = mirror_service
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retry_interval = retry_interval
+        self.node = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self.event_bus = GameEventBus()
+        self.is_hub = False
+        self.sent_count = 0
+        self.received_count = 0
+        self.dropped_count = 0
+
+        self._pending: Deque = deque()
+        self._wakeup = threading.Event()
+        self._relaying = threading.local()
+        self._closed = False
+        self._hub_sock: Optional[socket.socket] = None  # 客户端：到中心节点的连接
+        self._hub_send_lock = threading.Lock()
+        self._listen_sock: Optional[socket.socket] = None  # 中心节点：监听套接字
+        self._lock_file = None  # 中心节点：持有的锁文件，保证同一地址只有一个中心节点
+        self._peers: List[_Peer] = []
+        self._peers_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> 'EventBridge':
+        """建立连接（或成为中心节点），挂到事件总线并启动后台线程"""
+        self._establish()
+        self.event_bus.add_sink(self)
+        self._spawn(self._send_loop, "EventBridge-Sender")
+        self._spawn(self._connection_loop, "EventBridge-Connection")
+        logger.info(f"事件桥已启动: {self.address} ({'中心节点' if self.is_hub else '客户端'})")
+        return self
+
+    def _spawn(self, target, name: str):
+        thread = threading.Thread(target=target, daemon=True, name=name)
+        thread.start()
+        self._threads.append(thread)
+
+    # ---- 连接管理 ----
+
+    def _establish(self) -> bool:
+        """连接已有的中心节点，不存在时自己成为中心节点"""
+        try:
+            sock = socket.socket(self.family, socket.SOCK_STREAM)
+            sock.connect(self.sock_address)
+        except OSError:
+            sock.close()
+            return self._listen()
+
+        try:
+            _send_frame(sock, {"op": "hello", "node": self.node, "types": sorted(self.subscribe_types)})
+        except OSError as e:
+            # 中心节点在连接后立即退出（正在交接），稍后重新连接或接替
+            sock.close()
+            logger.debug(f"事件桥发送握手失败: {e}")
+            return False
+        self._hub_sock = sock
+        self.is_hub = False
+        return True
+
+    def _listen(self) -> bool:
+        if self.family == socket.AF_UNIX:
+            if not self._acquire_hub_lock():
+                # 其他进程正在成为中心节点，稍后重新连接
+                return False
+            if os.path.exists(self.sock_address):
+                # 上一个中心节点异常退出留下的套接字文件
+                os.unlink(self.sock_address)
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        try:
+            if self.family == socket.AF_INET:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(self.sock_address)
+            sock.listen()
+        except OSError as e:
+            sock.close()
+            self._release_hub_lock()
+            logger.warning(f"事件桥无法连接或监听 {self.address}: {e}")
+            return False
+
+        self._listen_sock = sock
+        self.is_hub = True
+        return True
+
+    def _acquire_hub_lock(self) -> bool:
+        """获取中心节点锁（进程退出时由操作系统自动释放）"""
+        if fcntl is None:
+            return True
+        lock_file = open(f"{self.sock_address}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _release_hub_lock(self):
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _connection_loop(self):
+        """中心节点接受连接；客户端接收事件，断开后重连（中心节点退出时由某个客户端接替）"""
+        while not self._closed:
+            try:
+                if self._listen_sock is not None:
+                    self._accept_loop()
+                elif self._hub_sock is not None:
+                    self._receive_loop(self._hub_sock, None)
+                    self._hub_sock = None
+                    if not self._closed:
+                        logger.warning("事件桥与中心节点的连接已断开，正在重连")
+                elif not self._establish():
+                    time.sleep(self.retry_interval)
+            except Exception as e:
+                # 单次失败不能结束连接线程，否则事件桥会静默停止且不再重连
+                logger.error(f"事件桥连接出错，稍后重试: {e}")
+                time.sleep(self.retry_interval)
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                sock, _ = self._listen_sock.accept()
+            except OSError:
+                return
+            peer = _Peer(sock)
+            with self._peers_lock:
+                self._peers.append(peer)
+            threading.Thread(target=self._serve_peer, args=(peer,), daemon=True,
+                             name="EventBridge-Peer").start()
+
+    def _serve_peer(self, peer: _Peer):
+        self._receive_loop(peer.sock, peer)
+        self._drop_peer(peer)
+
+    def _drop_peer(self, peer: _Peer):
+        with self._peers_lock:
+            if peer in self._peers:
+                self._peers.remove(peer)
+            else:
+                return
+        try:
+            peer.sock.close()
+        except OSError:
+            pass
+        logger.debug(f"事件桥客户端已断开: {peer.node}")
+
+    def _receive_loop(self, sock: socket.socket, peer: Optional[_Peer]):
+        """接收并处理帧，直到连接关闭"""
+        while not self._closed:
+            try:
+                message = _recv_frame(sock)
+            except (OSError, ValueError) as e:
+                if not self._closed:
+                    logger.warning(f"事件桥接收失败: {e}")
+                return
+            if message is None:
+                return
+
+            op = message.get("op")
+            if op == "hello" and peer is not None:
+                peer.node = message.get("node", "?")
+                peer.event_types = frozenset(message.get("types") or ())
+                logger.debug(f"事件桥客户端已连接: {peer.node}")
+            elif op == "events":
+                records = message.get("events") or []
+                if peer is not None:
+                    # 中心节点转发给其他客户端
+                    self._broadcast(message.get("node", "?"), records, exclude=peer)
+                self._deliver(records)
+
+    # ---- 发送 ----
+
+    def __call__(self, event) -> None:
+        """事件总线回调：放入发送队列（在发送方线程上执行）"""
+        if self._closed or getattr(self._relaying, "active", False):
+            # 从其他进程收到的事件不再转发
+            return
+        if len(self._pending) >= self.max_pending:
+            self.dropped_count += 1
+            DROPPED_BRIDGE_EVENTS.inc()
+            return
+        self._pending.append(event)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _send_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._flush_pending()
+
+    def _flush_pending(self):
+        """把发送队列中的事件打包成批次发送（负载在这里构建，不占用发送方线程）"""
+        if not self._pending:
+            return
+        records = []
+        while self._pending:
+            event = self._pending.popleft()
+            try:
+                records.append([event.event_type.value, event.timestamp, event.data, event.session_id])
+            except Exception as e:
+                logger.error(f"事件桥构建负载失败: {event.event_type.value}, 错误: {e}")
+
+        if self.is_hub:
+            self._broadcast(self.node, records)
+        else:
+            sock = self._hub_sock
+            if sock is None:
+                # 未连接期间的事件直接丢弃，重连后以新事件为准
+                self.dropped_count += len(records)
+                DROPPED_BRIDGE_EVENTS.inc(amount=len(records))
+                return
+            try:
+                with self._hub_send_lock:
+                    _send_frame(sock, {"op": "events", "node": self.node, "events": records})
+            except OSError as e:
+                logger.warning(f"事件桥发送失败: {e}")
+                return
+        self.sent_count += len(records)
+        SENT_EVENTS.inc(amount=len(records))
+
+    def _broadcast(self, origin: str, records: List[list], exclude: Optional[_Peer] = None):
+        with self._peers_lock:
+            peers = [peer for peer in self._peers if peer is not exclude]
+        for peer in peers:
+            if not peer.send_events(origin, records):
+                self._drop_peer(peer)
+
+    # ---- 接收 ----
+
+    def _deliver(self, records: List[list]):
+        """把收到的事件发送到本进程总线（在接收线程上执行）"""
+        self._relaying.active = True
+        try:
+            for event_type_value, _, data, session_id in records:
+                if event_type_value not in self.subscribe_types:
+                    continue
+                try:
+                    event_type = EventType(event_type_value)
+                except ValueError:
+                    continue
+                self.received_count += 1
+                RECEIVED_EVENTS.inc()
+                if self.mirror_service is not None:
+                    self._mirror(event_type, data)
+                self.event_bus.emit(event_type, data, session_id)
+        finally:
+            self._relaying.active = False
+
+    def _mirror(self, event_type: EventType, data: Dict[str, Any]):
+        """把其他进程的新关卡和状态更新恢复到本进程的游戏服务"""
+        try:
+            if event_type == EventType.NEW_LEVEL_GENERATED and "maze" in data:
+                self.mirror_service.restore(data)
+            elif event_type == EventType.GAME_STATE_UPDATED and "game_state" in data:
+                self.mirror_service.restore({"game_state": data["game_state"]})
+        except Exception as e:
+            logger.error(f"事件桥同步游戏状态失败: {e}")
+
+    def close(self):
+        """停止转发并关闭连接"""
+        if self._closed:
+            return
+        self._flush_pending()
+        self._closed = True
+        self._wakeup.set()
+        self.event_bus.remove_sink(self)
+
+        sockets = [self._hub_sock, self._listen_sock]
+        with self._peers_lock:
+            sockets.extend(peer.sock for peer in self._peers)
+            self._peers.clear()
+        for sock in sockets:
+            if sock is None:
+                continue
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+        if self.is_hub and self.family == socket.AF_UNIX:
+            try:
+                os.unlink(self.sock_address)
+            except OSError:
+                pass
+            self._release_hub_lock()
+        logger.info("事件桥已关闭")
@@ -0,0 +1,174 @@
+# python/app/EventDispatcher.py
+"""
+异步事件分发 - 每个订阅者拥有独立的有界队列，事件在订阅者自己的线程或事件循环上处理
+"""
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import TYPE_CHECKING, Callable, Deque, Dict, FrozenSet, Iterable, List, Optional
+
+from python.logger import logger
+from python.utils.MetricsRegistry import metrics
+
+if TYPE_CHECKING:
+    # asyncio 只在 for_loop 中使用，不在导入时加载（不启用MCP时启动更快）
+    import asyncio
+
+DROPPED_EVENTS = metrics.counter(
+    "maze_event_dropped_total", "异步订阅者队列已满而丢弃的事件数", ("subscriber",))
+COALESCED_EVENTS = metrics.counter(
+    "maze_event_coalesced_total", "被同类型新事件取代而合并掉的事件数", ("subscriber",))
+
+
+class OverflowPolicy(Enum):
+    """队列已满时的处理策略"""
+    DROP_OLDEST = "drop_oldest"  # 丢弃队列中最旧的事件
+    DROP_NEWEST = "drop_newest"  # 丢弃新到达的事件
+    BLOCK = "block"  # 阻塞发送方直到有空位（超时后丢弃新事件），形成背压
+
+
+class QueuedSubscriber:
+    """
+    异步订阅者
+    发送方线程只把事件放入队列，订阅者在自己的线程上调用 drain() 处理；
+    coalesce 中的事件类型每个会话只保留最新一个（同一会话未处理的旧事件被新事件取代）。
+    实例可直接作为回调订阅到 GameEventBus。
+    """
+
+    def __init__(self, callback: Callable, name: str = "subscriber", max_size: int = 256,
+                 policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+                 coalesce: Iterable = (), block_timeout: float = 0.1,
+                 wakeup: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            callback: 事件处理函数，在调用 drain() 的线程上执行
+            name: 订阅者名称（用于指标）
+            max_size: 队列容量
+            policy: 队列已满时的处理策略
+            coalesce: 需要合并的事件类型
+            block_timeout: BLOCK 策略下发送方最长等待秒数
+            wakeup: 队列由空变为非空时调用（在发送方线程上），用于唤醒订阅者
+        """
+        self.callback = callback
+        self.name = name
+        self.max_size = max(1, max_size)
+        self.policy = policy
+        self.coalesce: FrozenSet = frozenset(coalesce)
+        self.block_timeout = block_timeout
+        self.wakeup = wakeup
+
+        # 队列元素为单元素列表，合并事件时原地替换其中的事件，保持其在队列中的位置
+        self._queue: Deque[List] = deque()
+        self._pending_slots: Dict = {}
+        self._condition = threading.Condition()
+        self.dropped_count = 0
+        self.coalesced_count = 0
+
+    def __call__(self, event) -> None:
+        """事件总线回调：放入队列（在发送方线程上执行）"""
+        self.push(event)
+
+    def push(self, event) -> bool:
+        """放入一个事件，返回是否被接收"""
+        with self._condition:
+            key = (event.event_type, event.session_id)
+            slot = self._pending_slots.get(key)
+            if slot is not None:
+                slot[0] = event
+                self.coalesced_count += 1
+                COALESCED_EVENTS.inc(self.name)
+                return True
+
+            if len(self._queue) >= self.max_size and not self._make_room():
+                self.dropped_count += 1
+                DROPPED_EVENTS.inc(self.name)
+                return False
+
+            slot = [event]
+            self._queue.append(slot)
+            if event.event_type in self.coalesce:
+                self._pending_slots[key] = slot
+            was_empty = len(self._queue) == 1
+
+        if was_empty and self.wakeup is not None:
+            self.wakeup()
+        return True
+
+    def _make_room(self) -> bool:
+        """队列已满时按策略腾出空位（持有锁时调用）"""
+        if self.policy == OverflowPolicy.DROP_OLDEST:
+            self._discard(self._queue.popleft())
+            self.dropped_count += 1
+            DROPPED_EVENTS.inc(self.name)
+            return True
+
+        if self.policy == OverflowPolicy.BLOCK:
+            deadline = time.monotonic() + self.block_timeout
+            while len(self._queue) >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+        return False
+
+    def _discard(self, slot: List) -> None:
+        key = (slot[0].event_type, slot[0].session_id)
+        if self._pending_slots.get(key) is slot:
+            del self._pending_slots[key]
+
+    def drain(self, max_events: Optional[int] = None) -> int:
+        """
+        在订阅者线程上处理队列中的事件
+
+        Args:
+            max_events: 本次最多处理的事件数，None 表示处理当前全部事件
+
+        Returns:
+            处理的事件数
+        """
+        handled = 0
+        while max_events is None or handled < max_events:
+            with self._condition:
+                if not self._queue:
+                    break
+                slot = self._queue.popleft()
+                self._discard(slot)
+                self._condition.notify()
+
+            event = slot[0]
+            try:
+                self.callback(event)
+            except Exception as e:
+                logger.error(f"事件处理失败: {event.event_type.value}, 订阅者: {self.name}, 错误: {e}")
+            handled += 1
+        return handled
+
+    @property
+    def pending(self) -> int:
+        """队列中等待处理的事件数"""
+        return len(self._queue)
+
+    @classmethod
+    def for_loop(cls, callback: Callable, loop: 'asyncio.AbstractEventLoop', **options) -> 'QueuedSubscriber':
+        """创建在指定 asyncio 事件循环上处理事件的订阅者（callback 可以是普通函数或协程函数）"""
+        import asyncio
+
+        subscriber = None
+
+        def deliver(event):
+            result = callback(event)
+            if asyncio.iscoroutine(result):
+                loop.create_task(result)
+
+        def wakeup():
+            try:
+                loop.call_soon_threadsafe(subscriber.drain)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+
+        subscriber = cls(deliver, wakeup=wakeup, **options)
+        return subscriber
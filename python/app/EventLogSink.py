@@ -0,0 +1,190 @@
+# python/app/EventLogSink.py
+"""
+事件日志 - 将事件总线上的游戏事件追加写入按行分隔的JSON文件（JSONL）
+
+发送方线程只把事件放入内存队列，由后台线程批量编码、写入并按大小轮转，
+移动请求不会等待磁盘I/O。每个日志文件以一条快照记录开头，可独立回放
+（见 python/tools/replay_event_log.py）。
+"""
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from python.logger import logger
+from python.server.StateSerializer import encode_json
+from python.utils.MetricsRegistry import metrics
+
+# 快照记录的类型名（其余记录的类型为 EventType 的值）
+SNAPSHOT_RECORD = "snapshot"
+
+WRITTEN_EVENTS = metrics.counter(
+    "maze_event_log_written_total", "写入事件日志的记录数")
+DROPPED_LOG_EVENTS = metrics.counter(
+    "maze_event_log_dropped_total", "事件日志队列已满而丢弃的事件数")
+
+
+class EventLogSink:
+    """
+    事件日志写入器
+    实例可直接作为回调订阅到 GameEventBus（见 GameEventBus.add_sink）。
+    """
+
+    def __init__(self, path: str, snapshot_provider: Optional[Callable[[], Dict[str, Any]]] = None,
+                 event_types: Optional[Iterable] = None, max_bytes: int = 16 * 1024 * 1024,
+                 backup_count: int = 5, flush_interval: float = 0.5, batch_size: int = 256,
+                 max_pending: int = 100000):
+        """
+        Args:
+            path: 日志文件路径，轮转后的旧文件为 path.1 ... path.N（数字越大越旧）
+            snapshot_provider: 返回游戏快照的函数（通常为 MazeGameService.snapshot），在每个文件开头写入
+            event_types: 记录的事件类型，None 表示由 GameEventBus.add_sink 决定
+            max_bytes: 单个文件的大小上限，超出后轮转
+            backup_count: 保留的旧文件数
+            flush_interval: 后台线程最长的写入间隔（秒）
+            batch_size: 队列积累到该数量时立即写入
+            max_pending: 内存队列上限，超出后丢弃新事件
+        """
+        self.path = path
+        self.snapshot_provider = snapshot_provider
+        self.event_types = tuple(event_types) if event_types is not None else None
+        self.max_bytes = max_bytes
+        self.backup_count = max(0, backup_count)
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max_pending
+
+        self._pending: Deque = deque()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._file = None
+        self._seq = 0
+        self.written_count = 0
+        self.dropped_count = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        # 文件（及开头的快照）由后台线程打开：快照需要服务锁，第一个关卡在后台生成时不阻塞启动，
+        # 在此之前到达的事件留在队列中，写在快照之后
+        self._thread = threading.Thread(target=self._run, daemon=True, name="EventLog-Writer")
+        self._thread.start()
+
+    def __call__(self, event) -> None:
+        """事件总线回调：放入内存队列（在发送方线程上执行）"""
+        if self._closed:
+            return
+        if len(self._pending) >= self.max_pending:
+            self.dropped_count += 1
+            DROPPED_LOG_EVENTS.inc()
+            return
+        self._pending.append(event)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def _run(self):
+        """后台写入线程"""
+        self._open()
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._write_pending()
+        self._write_pending()
+
+    def _write_pending(self):
+        """批量写入队列中的事件"""
+        if not self._pending:
+            return
+
+        lines: List[bytes] = []
+        while self._pending:
+            event = self._pending.popleft()
+            try:
+                lines.append(self._encode(event.event_type.value, event.timestamp, event.data, event.session_id))
+            except Exception as e:
+                logger.error(f"事件日志编码失败: {event.event_type.value}, 错误: {e}")
+
+        try:
+            self._file.write(b"".join(lines))
+            self._file.flush()
+            self.written_count += len(lines)
+            WRITTEN_EVENTS.inc(amount=len(lines))
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            logger.error(f"写入事件日志失败: {e}")
+
+    def _encode(self, record_type: str, timestamp: float, data: Dict[str, Any], session_id=None) -> bytes:
+        self._seq += 1
+        record = {"seq": self._seq, "ts": timestamp, "type": record_type, "data": data}
+        if session_id is not None:
+            record["session"] = session_id
+        return encode_json(record) + b"\n"
+
+    def _open(self):
+        """打开新的日志文件，并写入快照记录"""
+        self._file = open(self.path, "ab")
+        if self.snapshot_provider is not None:
+            try:
+                self._file.write(self._encode(SNAPSHOT_RECORD, time.time(), self.snapshot_provider()))
+                self._file.flush()
+            except Exception as e:
+                logger.error(f"写入事件日志快照失败: {e}")
+
+    def _rotate(self):
+        """轮转日志文件：path -> path.1 -> path.2 ..."""
+        self._file.close()
+        if self.backup_count == 0:
+            os.remove(self.path)
+        else:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self._open()
+
+    def flush(self):
+        """请求后台线程立即写入"""
+        self._wakeup.set()
+
+    def close(self, timeout: float = 5.0):
+        """写入剩余事件并关闭文件"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout)
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+        except OSError:
+            pass
+
+
+def log_files(path: str) -> List[str]:
+    """按时间顺序（最旧在前）列出日志文件及其轮转出的旧文件"""
+    backups = []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        backups.append(f"{path}.{index}")
+        index += 1
+    files = list(reversed(backups))
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """按顺序读取日志文件（含轮转出的旧文件）中的所有记录，跳过不完整的行"""
+    for file_path in log_files(path):
+        with open(file_path, "rb") as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # 进程异常退出时最后一行可能不完整
+                    continue
@@ -2,10 +2,20 @@
 """
 游戏事件总线系统
 """
+import itertools
+import logging
+import threading
+import time
+from collections import deque
 from enum import Enum
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
 
+from python.app.EventDispatcher import QueuedSubscriber
 from python.logger import logger
+from python.utils.MetricsRegistry import metrics
+
+DISPATCH_DURATION = metrics.histogram(
+    "maze_event_dispatch_duration_seconds", "事件总线分发耗时（所有订阅者）", ("event",))
 
 
 class EventType(Enum):
@@ -19,25 +29,78 @@ class EventType(Enum):
     BUTTON_CLICKED = "button_clicked"
 
 
+# 改变游戏状态的事件（事件日志默认记录这些事件，足以回放游戏）
+GAME_EVENT_TYPES = (EventType.PLAYER_MOVED, EventType.LEVEL_RESET, EventType.NEW_LEVEL_GENERATED)
+
+# 事件负载：字典，或返回字典的无参函数（只在有人读取时才构建）
+EventPayload = Union[Dict[str, Any], Callable[[], Dict[str, Any]], None]
+
+# 事件过滤条件：接收事件对象，返回是否投递。只应读取 event_type、session_id 等属性，
+# 读取 event.data 会构建延迟负载
+EventPredicate = Callable[['GameEvent'], bool]
+
+
 class GameEvent:
     """游戏事件类"""
 
-    def __init__(self, event_type: EventType, data: Dict[str, Any] = None):
+    __slots__ = ('event_type', 'timestamp', 'session_id', '_data', '_factory')
+
+    def __init__(self, event_type: EventType, data: EventPayload = None, session_id: Optional[Hashable] = None):
         self.event_type = event_type
-        self.data = data or {}
         self.timestamp = time.time()
+        self.session_id = session_id
+        if callable(data):
+            self._data: Optional[Dict[str, Any]] = None
+            self._factory: Optional[Callable[[], Dict[str, Any]]] = data
+        else:
+            self._data = data or {}
+            self._factory = None
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """事件负载（延迟负载在第一次读取时构建）"""
+        factory = self._factory
+        if factory is not None:
+            self._data = factory() or {}
+            self._factory = None
+        return self._data
 
     def __str__(self) -> str:
         return f"GameEvent({self.event_type.value}, data={self.data})"
 
 
-import time
+class Subscription:
+    """订阅句柄，由 GameEventBus.subscribe 返回，cancel() 以 O(1) 取消订阅"""
+
+    __slots__ = ('event_type', 'callback', 'priority', 'predicate', 'session_id', 'order', '_bus')
+
+    def __init__(self, bus: 'GameEventBus', event_type: Optional[EventType], callback: Callable,
+                 priority: int, predicate: Optional[EventPredicate], session_id: Optional[Hashable], order: int):
+        self._bus = bus
+        self.event_type = event_type
+        self.callback = callback
+        self.priority = priority
+        self.predicate = predicate
+        self.session_id = session_id
+        self.order = order
+
+    @property
+    def key(self) -> Tuple[Optional[EventType], Optional[Hashable]]:
+        return self.event_type, self.session_id
+
+    def cancel(self):
+        """取消订阅（可重复调用）"""
+        self._bus.remove_subscription(self)
 
 
 class GameEventBus:
     """
     游戏事件总线 - 实现观察者模式
     用于解耦游戏逻辑与UI显示
+
+    订阅按 (事件类型, 会话) 分组存放，通配订阅的事件类型为 None；
+    每种 (事件类型, 会话) 组合的投递列表按优先级排好后缓存，订阅变化时失效，
+    分发开销只与匹配的订阅数有关。
     """
 
     _instance = None
@@ -50,48 +113,196 @@ class GameEventBus:
 
     def _init_singleton(self):
         """初始化单例"""
-        self._listeners: Dict[EventType, list] = {}
-        self._event_history = []
-        self._max_history_size = 100
+        self._lock = threading.Lock()
+        # (事件类型或None, 会话或None) -> {回调: 订阅}，字典保持订阅顺序且增删为 O(1)
+        self._subscriptions: Dict[Tuple, Dict[Callable, Subscription]] = {}
+        # 有会话订阅的会话 -> 订阅数；其他会话的事件与不带会话的事件共用投递列表
+        self._session_counts: Dict[Hashable, int] = {}
+        # (事件类型, 会话或None) -> 按优先级排序的订阅元组
+        self._dispatch_cache: Dict[Tuple, Tuple[Subscription, ...]] = {}
+        self._order = itertools.count()
+        self._event_history: deque = deque(maxlen=100)
+
+    def subscribe(self, event_type: Optional[EventType], callback: Callable[[GameEvent], None],
+                  priority: int = 0, predicate: Optional[EventPredicate] = None,
+                  session_id: Optional[Hashable] = None) -> Subscription:
+        """
+        订阅事件
+
+        Args:
+            event_type: 事件类型，None 表示所有事件（也可使用 subscribe_all）
+            callback: 事件处理函数；同一回调对同一 (事件类型, 会话) 重复订阅时返回已有的订阅
+            priority: 优先级，数值大的先收到事件，相同优先级按订阅顺序
+            predicate: 过滤条件，在构建负载之前调用，返回 False 时不投递
+            session_id: 只接收该会话发出的事件
 
-    def subscribe(self, event_type: EventType, callback: Callable[[GameEvent], None]):
-        """订阅事件"""
-        if event_type not in self._listeners:
-            self._listeners[event_type] = []
+        Returns:
+            订阅句柄
+        """
+        key = (event_type, session_id)
+        with self._lock:
+            group = self._subscriptions.setdefault(key, {})
+            subscription = group.get(callback)
+            if subscription is not None:
+                return subscription
 
-        if callback not in self._listeners[event_type]:
-            self._listeners[event_type].append(callback)
-            logger.debug(f"已订阅事件: {event_type.value}")
+            subscription = Subscription(self, event_type, callback, priority, predicate,
+                                        session_id, next(self._order))
+            group[callback] = subscription
+            if session_id is not None:
+                self._session_counts[session_id] = self._session_counts.get(session_id, 0) + 1
+            self._dispatch_cache = {}
 
-    def unsubscribe(self, event_type: EventType, callback: Callable[[GameEvent], None]):
+        logger.debug(f"已订阅事件: {event_type.value if event_type else '*'}")
+        return subscription
+
+    def subscribe_all(self, callback: Callable[[GameEvent], None], **options) -> Subscription:
+        """订阅所有事件，options 同 subscribe（priority, predicate, session_id）"""
+        return self.subscribe(None, callback, **options)
+
+    def subscribe_queued(self, event_types, callback: Callable[[GameEvent], None],
+                         **options) -> QueuedSubscriber:
+        """
+        以异步方式订阅事件：发送方只把事件放入订阅者自己的有界队列，
+        订阅者在自己的线程上调用返回对象的 drain() 处理（或用 QueuedSubscriber.for_loop 投递到事件循环）
+
+        Args:
+            event_types: 单个事件类型或事件类型列表
+            callback: 事件处理函数
+            **options: QueuedSubscriber 的其他参数（name, max_size, policy, coalesce 等），
+                       coalesce 默认合并 GAME_STATE_UPDATED（每个会话只需处理最新状态）
+
+        Returns:
+            订阅者对象，取消订阅时传给 unsubscribe_queued()
+        """
+        if isinstance(callback, QueuedSubscriber):
+            subscriber = callback
+        else:
+            options.setdefault("coalesce", (EventType.GAME_STATE_UPDATED,))
+            subscriber = QueuedSubscriber(callback, **options)
+        for event_type in ((event_types,) if isinstance(event_types, EventType) else event_types):
+            self.subscribe(event_type, subscriber)
+        return subscriber
+
+    def unsubscribe(self, event_type: Optional[EventType], callback: Callable[[GameEvent], None],
+                    session_id: Optional[Hashable] = None):
         """取消订阅事件"""
-        if event_type in self._listeners:
-            if callback in self._listeners[event_type]:
-                self._listeners[event_type].remove(callback)
-                logger.debug(f"已取消订阅事件: {event_type.value}")
+        group = self._subscriptions.get((event_type, session_id))
+        subscription = group.get(callback) if group else None
+        if subscription is not None:
+            self.remove_subscription(subscription)
+
+    def remove_subscription(self, subscription: Subscription):
+        """按句柄取消订阅"""
+        with self._lock:
+            group = self._subscriptions.get(subscription.key)
+            if not group or group.get(subscription.callback) is not subscription:
+                return
+            del group[subscription.callback]
+            if not group:
+                del self._subscriptions[subscription.key]
+            session_id = subscription.session_id
+            if session_id is not None:
+                remaining = self._session_counts[session_id] - 1
+                if remaining:
+                    self._session_counts[session_id] = remaining
+                else:
+                    del self._session_counts[session_id]
+            self._dispatch_cache = {}
+
+        event_type = subscription.event_type
+        logger.debug(f"已取消订阅事件: {event_type.value if event_type else '*'}")
+
+    def _remove_callback(self, callback: Callable[[GameEvent], None]):
+        """从所有分组中移除回调"""
+        for group in list(self._subscriptions.values()):
+            subscription = group.get(callback)
+            if subscription is not None:
+                self.remove_subscription(subscription)
+
+    def add_sink(self, sink: Callable[[GameEvent], None], event_types=None):
+        """
+        添加事件接收端（例如 EventLogSink），接收端应只做入队等轻量操作
 
-    def emit(self, event_type: EventType, data: Dict[str, Any] = None):
-        """触发事件"""
-        event = GameEvent(event_type, data)
+        Args:
+            sink: 接收事件的回调
+            event_types: 接收的事件类型，默认使用 sink.event_types，未指定时为所有游戏事件
+        """
+        event_types = event_types or getattr(sink, "event_types", None) or GAME_EVENT_TYPES
+        for event_type in event_types:
+            self.subscribe(event_type, sink)
 
-        # 记录事件历史
+    def remove_sink(self, sink: Callable[[GameEvent], None]):
+        """移除事件接收端"""
+        self._remove_callback(sink)
+
+    def unsubscribe_queued(self, subscriber: QueuedSubscriber):
+        """从所有事件类型中取消异步订阅者"""
+        self._remove_callback(subscriber)
+
+    def _listeners_for(self, event_type: EventType, session_id: Optional[Hashable]) -> Tuple[Subscription, ...]:
+        """获取事件的投递列表（已按优先级排序并缓存）"""
+        if session_id is not None and session_id not in self._session_counts:
+            session_id = None
+        key = (event_type, session_id)
+        listeners = self._dispatch_cache.get(key)
+        if listeners is not None:
+            return listeners
+
+        with self._lock:
+            keys = [(event_type, None), (None, None)]
+            if session_id is not None:
+                keys += [(event_type, session_id), (None, session_id)]
+            subscriptions = [subscription
+                             for group_key in keys
+                             for subscription in self._subscriptions.get(group_key, {}).values()]
+            subscriptions.sort(key=lambda subscription: (-subscription.priority, subscription.order))
+            listeners = tuple(subscriptions)
+            self._dispatch_cache[key] = listeners
+        return listeners
+
+    def emit(self, event_type: EventType, data: EventPayload = None, session_id: Optional[Hashable] = None):
+        """
+        触发事件
+
+        Args:
+            event_type: 事件类型
+            data: 事件负载；传入无参函数时只在订阅者读取 event.data 时才构建，
+                  函数应只引用不会再变化的数据（例如状态快照）
+            session_id: 发出事件的会话（HTTP客户端标识或MCP会话），供会话订阅和过滤条件使用
+        """
+        listeners = self._listeners_for(event_type, session_id)
+        if not listeners and not self._event_history.maxlen:
+            # 没有订阅者且不记录历史，不创建事件对象
+            return
+
+        event = GameEvent(event_type, data, session_id)
+
+        # 记录事件历史（环形缓冲区，自动淘汰最旧事件）
         self._event_history.append(event)
-        if len(self._event_history) > self._max_history_size:
-            self._event_history.pop(0)
 
-        # 通知订阅者
-        if event_type in self._listeners:
-            for callback in self._listeners[event_type]:
+        # 通知订阅者（投递列表是不可变元组，其他线程可以在分发期间订阅/取消订阅）
+        if listeners:
+            start = time.perf_counter()
+            for subscription in listeners:
                 try:
-                    callback(event)
+                    predicate = subscription.predicate
+                    if predicate is None or predicate(event):
+                        subscription.callback(event)
                 except Exception as e:
                     logger.error(f"事件处理失败: {event_type.value}, 错误: {e}")
+            DISPATCH_DURATION.observe(time.perf_counter() - start, event_type.value)
 
-        logger.debug(f"事件已触发: {event}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"事件已触发: {event}")
 
     def get_event_history(self) -> list:
         """获取事件历史"""
-        return self._event_history.copy()
+        return list(self._event_history)
+
+    def set_history_size(self, size: int):
+        """设置保留的事件历史条数，0 表示不记录历史（无订阅者时 emit 几乎没有开销）"""
+        self._event_history = deque(self._event_history, maxlen=max(0, size))
 
     def clear_event_history(self):
         """清空事件历史"""
@@ -99,5 +310,8 @@ class GameEventBus:
 
     def clear_all_listeners(self):
         """清空所有监听器"""
-        self._listeners.clear()
+        with self._lock:
+            self._subscriptions.clear()
+            self._session_counts.clear()
+            self._dispatch_cache = {}
         self.clear_event_history()
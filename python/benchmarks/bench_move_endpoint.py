@@ -0,0 +1,98 @@
+# python/benchmarks/bench_move_endpoint.py
+"""
+/api/move 微基准测试 - 对比旧版序列化路径与按版本缓存的快速序列化路径
+
+用法:
+    python python/benchmarks/bench_move_endpoint.py --requests 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from flask import jsonify, request
+
+from python.app.GameEventBus import EventType
+from python.core.game.MazeGameService import MazeGameService
+from python.core.models.GameModels import Direction
+from python.server.HttpGameServer import HttpGameServer
+from python.server.RateLimiter import RateLimiter
+from python.server.StateSerializer import orjson
+
+
+def register_legacy_route(server: HttpGameServer):
+    """注册与优化前实现一致的移动接口，作为对照组"""
+
+    @server.flask_app.route('/api/move-legacy', methods=['POST'])
+    def legacy_move():
+        request_data = request.get_json()
+        direction = Direction(request_data['direction'])
+        move_result = server.game_service.move_player(direction)
+
+        server.event_bus.emit(
+            EventType.PLAYER_MOVED,
+            {
+                "direction": direction.value,
+                "result": move_result.to_dict(),
+                "game_state": server.game_service.get_current_state().to_dict()
+            }
+        )
+        server.event_bus.emit(
+            EventType.GAME_STATE_UPDATED,
+            {
+                "game_state": server.game_service.get_current_state().to_dict()
+            }
+        )
+
+        return jsonify({
+            "success": move_result.success,
+            "message": move_result.message,
+            "data": move_result.to_dict()
+        })
+
+
+def run_benchmark(client, route: str, total: int) -> float:
+    """在起点附近左右往返移动，返回每秒请求数"""
+    directions = ("left", "right")
+    start = time.perf_counter()
+    for i in range(total):
+        response = client.post(route, json={"direction": directions[i % 2]})
+        if response.status_code != 200:
+            raise RuntimeError(f"请求失败: {route} -> {response.status_code}")
+    elapsed = time.perf_counter() - start
+    return total / elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='/api/move 微基准测试')
+    parser.add_argument('--requests', type=int, default=5000, help='每组请求数 (默认: 5000)')
+    parser.add_argument('--warmup', type=int, default=200, help='预热请求数 (默认: 200)')
+    args = parser.parse_args()
+
+    game_service = MazeGameService()
+    # 基准测试不限流
+    server = HttpGameServer(game_service, rate_limiter=RateLimiter(0, 1))
+    register_legacy_route(server)
+    client = server.flask_app.test_client()
+
+    results = {}
+    for label, route in (("before", "/api/move-legacy"), ("after", "/api/move")):
+        game_service.reset_current_level()
+        run_benchmark(client, route, args.warmup)
+        results[label] = run_benchmark(client, route, args.requests)
+
+    print(f"JSON编码器: {'orjson' if orjson is not None else 'json (标准库)'}")
+    print(f"before: {results['before']:.0f} req/s")
+    print(f"after:  {results['after']:.0f} req/s")
+    print(f"提升:   {results['after'] / results['before']:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+# python/client/AsyncMazeClient.py
+"""
+迷宫游戏异步客户端 - 基于asyncio的HTTP/1.1长连接池，支持请求流水线
+"""
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from python.client.MazeClient import (DirectionLike, DirectionsLike, MazeClientError, direction_value,
+                                      directions_payload, iter_sse_events, parse_response_body)
+from python.core.models.GameModels import GameState, MoveResponse, MoveSequenceResult
+from python.core.models.MazeModels import MazeData
+
+# 流水线请求：(方法, 路径, JSON负载)
+RequestSpec = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+class _AsyncConnection:
+    """单条HTTP/1.1长连接"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+
+    def write_request(self, host: str, method: str, path: str, body: Optional[bytes],
+                      headers: Dict[str, str]):
+        """写入一个请求（不等待响应，可连续写入多个以实现流水线）"""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {host}"]
+        lines.extend(f"{key}: {value}" for key, value in headers.items())
+        lines.append(f"Content-Length: {len(body) if body else 0}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+
+    async def read_head(self) -> Tuple[int, Dict[str, str]]:
+        """读取状态行和响应头"""
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("连接已被服务器关闭")
+        status = int(status_line.split()[1])
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        return status, headers
+
+    async def read_response(self) -> Tuple[int, Dict[str, str], bytes]:
+        """读取一个完整响应"""
+        status, headers = await self.read_head()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = b"".join([chunk async for chunk in self.iter_chunks()])
+        elif "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self.reader.read()
+            self.closed = True
+
+        if headers.get("connection", "").lower() == "close":
+            self.closed = True
+        return status, headers, body
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        """读取分块传输编码的响应体"""
+        while True:
+            size_line = await self.reader.readline()
+            size = int(size_line.split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                await self.reader.readline()
+                return
+            chunk = await self.reader.readexactly(size)
+            await self.reader.readexactly(2)
+            yield chunk
+
+    async def iter_lines(self, headers: Dict[str, str]) -> AsyncIterator[bytes]:
+        """按行读取流式响应体"""
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            buffer = b""
+            async for chunk in self.iter_chunks():
+                buffer += chunk
+                while b"\n" in buffer:
+                    line, buffer = buffer.split(b"\n", 1)
+                    yield line + b"\n"
+        else:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    return
+                yield line
+
+    def close(self):
+        self.closed = True
+        self.writer.close()
+
+
+class AsyncMazeClient:
+    """
+    迷宫游戏异步客户端
+    请求复用连接池中的长连接；pipeline() 将多个独立请求连续写入同一连接后
+    再依次读取响应（HTTP/1.1 流水线），减少往返等待。
+    """
+
+    def __init__(self, base_url: str = "http://127.0.0.1:8080", pool_size: int = 4,
+                 timeout: float = 10.0, client_id: Optional[str] = None, max_retries: int = 2):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.pool_size = max(1, pool_size)
+        self.max_retries = max_retries
+        self.headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        if client_id:
+            self.headers["X-Client-Id"] = client_id
+
+        self._idle: List[_AsyncConnection] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 延迟创建，保证绑定到调用方的事件循环
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.pool_size)
+        return self._semaphore
+
+    async def _acquire_connection(self) -> Tuple[_AsyncConnection, bool]:
+        while self._idle:
+            connection = self._idle.pop()
+            if not connection.closed and not connection.reader.at_eof():
+                return connection, True
+            connection.close()
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+        return _AsyncConnection(reader, writer), False
+
+    def _release_connection(self, connection: _AsyncConnection):
+        if connection.closed or len(self._idle) >= self.pool_size:
+            connection.close()
+        else:
+            self._idle.append(connection)
+
+    async def _exchange(self, specs: Sequence[RequestSpec]) -> List[Tuple[int, Dict[str, str], bytes]]:
+        """在一条连接上流水线发送多个请求并按顺序读取响应"""
+        async with self._get_semaphore():
+            connection, reused = await self._acquire_connection()
+            try:
+                for method, path, payload in specs:
+                    body = json.dumps(payload).encode("utf-8") if payload is not None else None
+                    connection.write_request(self.host, method, path, body, self.headers)
+                await connection.writer.drain()
+                responses = []
+                for _ in specs:
+                    responses.append(await asyncio.wait_for(connection.read_response(), self.timeout))
+                    if connection.closed and len(responses) < len(specs):
+                        raise ConnectionResetError("连接在流水线完成前被关闭")
+            except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+                connection.close()
+                if not reused or len(specs) > 1:
+                    raise
+                # 复用的空闲连接可能已被服务器关闭，换新连接重试单个请求
+                return await self._exchange_fresh(specs)
+            except BaseException:
+                connection.close()
+                raise
+
+            self._release_connection(connection)
+            return responses
+
+    async def _exchange_fresh(self, specs: Sequence[RequestSpec]) -> List[Tuple[int, Dict[str, str], bytes]]:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+        connection = _AsyncConnection(reader, writer)
+        try:
+            for method, path, payload in specs:
+                body = json.dumps(payload).encode("utf-8") if payload is not None else None
+                connection.write_request(self.host, method, path, body, self.headers)
+            await connection.writer.drain()
+            responses = [await asyncio.wait_for(connection.read_response(), self.timeout) for _ in specs]
+        except BaseException:
+            connection.close()
+            raise
+        self._release_connection(connection)
+        return responses
+
+    async def request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """发送请求并返回响应中的 data 字段"""
+        attempt = 0
+        while True:
+            try:
+                (status, headers, body), = await self._exchange([(method, path, payload)])
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                raise MazeClientError(f"请求失败: {e}")
+
+            try:
+                return parse_response_body(status, headers, body).get("data") or {}
+            except MazeClientError as e:
+                if not e.is_throttled or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                await asyncio.sleep(e.retry_after or 1.0)
+
+    async def health(self) -> Dict[str, Any]:
+        """健康检查"""
+        return await self.request("GET", "/api/health")
+
+    async def get_state(self) -> GameState:
+        """获取当前游戏状态"""
+        return GameState.from_dict(await self.request("GET", "/api/state"))
+
+    async def get_maze(self) -> MazeData:
+        """获取迷宫布局"""
+        return MazeData.from_rows((await self.request("GET", "/api/maze"))["rows"])
+
+    async def move(self, direction: DirectionLike) -> MoveResponse:
+        """移动玩家"""
+        data = await self.request("POST", "/api/move", {"direction": direction_value(direction)})
+        return MoveResponse.from_dict(data)
+
+    async def move_batch(self, directions: DirectionsLike, stop_on_failure: bool = True) -> MoveSequenceResult:
+        """连续执行多个移动（一次请求）"""
+        data = await self.request("POST", "/api/move/batch", {
+            "directions": directions_payload(directions),
+            "stop_on_failure": stop_on_failure
+        })
+        return MoveSequenceResult.from_dict(data)
+
+    async def reset(self) -> GameState:
+        """重置当前关卡"""
+        return GameState.from_dict(await self.request("POST", "/api/reset"))
+
+    async def new_level(self) -> GameState:
+        """生成新关卡"""
+        return GameState.from_dict(await self.request("POST", "/api/new-level"))
+
+    async def pipeline(self, specs: Sequence[RequestSpec]) -> List[Any]:
+        """
+        流水线执行多个相互独立的请求，按提交顺序返回各响应的 data 字段
+
+        请求被均分到连接池的各条连接上，每条连接连续写入其分到的请求后再读取响应。
+
+        Args:
+            specs: (方法, 路径, JSON负载) 列表，例如 [("GET", "/api/state", None)]
+
+        Returns:
+            结果列表；失败的请求对应位置为 MazeClientError
+        """
+        if not specs:
+            return []
+
+        lanes = min(self.pool_size, len(specs))
+        groups = [list(range(lane, len(specs), lanes)) for lane in range(lanes)]
+        lane_results = await asyncio.gather(
+            *(self._exchange([specs[index] for index in group]) for group in groups),
+            return_exceptions=True
+        )
+
+        results: List[Any] = [None] * len(specs)
+        for group, lane_result in zip(groups, lane_results):
+            for position, index in enumerate(group):
+                if isinstance(lane_result, BaseException):
+                    results[index] = MazeClientError(f"请求失败: {lane_result}")
+                    continue
+                status, headers, body = lane_result[position]
+                try:
+                    results[index] = parse_response_body(status, headers, body).get("data") or {}
+                except MazeClientError as e:
+                    results[index] = e
+        return results
+
+    async def gather(self, *calls: Awaitable) -> List[Any]:
+        """并发执行多个客户端调用（各自占用连接池中的连接）"""
+        return list(await asyncio.gather(*calls, return_exceptions=True))
+
+    async def stream_states(self) -> AsyncIterator[GameState]:
+        """订阅游戏状态推送（使用独立连接）"""
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+        connection = _AsyncConnection(reader, writer)
+        try:
+            connection.write_request(self.host, "GET", "/api/stream", None, self.headers)
+            await writer.drain()
+            status, headers = await connection.read_head()
+            if status >= 400:
+                raise MazeClientError(f"订阅状态推送失败 (HTTP {status})", status)
+
+            lines = []
+            async for line in connection.iter_lines(headers):
+                lines.append(line)
+                if line.strip():
+                    continue
+                for event_name, data in iter_sse_events(iter(lines)):
+                    if event_name == "game_state":
+                        yield GameState.from_dict(json.loads(data))
+                lines = []
+        finally:
+            connection.close()
+
+    async def close(self):
+        """关闭所有连接"""
+        while self._idle:
+            self._idle.pop().close()
+
+    async def __aenter__(self) -> 'AsyncMazeClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
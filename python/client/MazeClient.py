@@ -0,0 +1,263 @@
+# python/client/MazeClient.py
+"""
+迷宫游戏同步客户端 - 基于连接池复用HTTP长连接
+"""
+import http.client
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlsplit
+
+from python.core.models.GameModels import Direction, GameState, MoveResponse, MoveSequenceResult
+from python.core.models.MazeModels import MazeData
+
+# 可被方向参数接受的类型：Direction 枚举、方向名或单字符缩写串
+DirectionLike = Union[Direction, str]
+DirectionsLike = Union[str, Sequence[DirectionLike]]
+
+
+class MazeClientError(Exception):
+    """客户端请求失败"""
+
+    def __init__(self, message: str, status: int = 0, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def is_throttled(self) -> bool:
+        """是否被服务器限流或丢弃"""
+        return self.status in (429, 503)
+
+
+def direction_value(direction: DirectionLike) -> str:
+    """获取方向的字符串值"""
+    return direction.value if isinstance(direction, Direction) else str(direction)
+
+
+def directions_payload(directions: DirectionsLike) -> Union[str, List[str]]:
+    """转换为批量移动接口接受的方向参数"""
+    if isinstance(directions, str):
+        return directions
+    return [direction_value(direction) for direction in directions]
+
+
+def parse_response_body(status: int, headers: Dict[str, str], body: bytes) -> Dict[str, Any]:
+    """解析标准JSON响应，失败时抛出 MazeClientError"""
+    try:
+        payload = json.loads(body) if body else {}
+    except ValueError:
+        raise MazeClientError(f"无效的响应内容 (HTTP {status})", status)
+
+    if status >= 400:
+        retry_after = headers.get("retry-after")
+        raise MazeClientError(
+            payload.get("message", f"HTTP {status}"),
+            status,
+            float(retry_after) if retry_after else None
+        )
+    return payload
+
+
+def iter_sse_events(lines: Iterator[bytes]) -> Iterator[Tuple[str, str]]:
+    """将SSE文本行解析为 (事件名, 数据) 序列"""
+    event_name = "message"
+    data_lines: List[str] = []
+    for raw_line in lines:
+        line = raw_line.decode("utf-8").rstrip("\r\n")
+        if not line:
+            if data_lines:
+                yield event_name, "\n".join(data_lines)
+            event_name, data_lines = "message", []
+        elif line.startswith(":"):
+            continue
+        elif line.startswith("event:"):
+            event_name = line[6:].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+
+
+class MazeClient:
+    """
+    迷宫游戏同步客户端
+    所有请求复用连接池中的长连接，线程安全，可在多个线程间共享。
+    """
+
+    def __init__(self, base_url: str = "http://127.0.0.1:8080", pool_size: int = 4,
+                 timeout: float = 10.0, client_id: Optional[str] = None, max_retries: int = 2):
+        """
+        Args:
+            base_url: 服务器基础URL
+            pool_size: 连接池大小（同时也是并行请求的最大并发数）
+            timeout: 单次请求超时（秒）
+            client_id: 客户端标识，服务器据此限流（X-Client-Id 头）
+            max_retries: 被限流（429/503）时按 Retry-After 自动重试的次数
+        """
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.pool_size = max(1, pool_size)
+        self.max_retries = max_retries
+        self.headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        if client_id:
+            self.headers["X-Client-Id"] = client_id
+
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=self.pool_size)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _acquire_connection(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """从连接池取出连接，返回 (连接, 是否为复用连接)"""
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(), False
+
+    def _release_connection(self, connection: http.client.HTTPConnection):
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def _send(self, method: str, path: str, body: Optional[bytes]) -> Tuple[int, Dict[str, str], bytes]:
+        """发送一次请求；复用的连接若已被服务器关闭则换新连接重试一次"""
+        connection, reused = self._acquire_connection()
+        try:
+            connection.request(method, path, body=body, headers=self.headers)
+            response = connection.getresponse()
+            data = response.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            connection.close()
+            if not reused:
+                raise
+            connection = self._new_connection()
+            connection.request(method, path, body=body, headers=self.headers)
+            response = connection.getresponse()
+            data = response.read()
+        except Exception:
+            connection.close()
+            raise
+
+        headers = {key.lower(): value for key, value in response.getheaders()}
+        if response.will_close:
+            connection.close()
+        else:
+            self._release_connection(connection)
+        return response.status, headers, data
+
+    def request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """发送请求并返回响应中的 data 字段"""
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        attempt = 0
+        while True:
+            try:
+                status, headers, data = self._send(method, path, body)
+            except (OSError, http.client.HTTPException) as e:
+                raise MazeClientError(f"请求失败: {e}")
+
+            try:
+                return parse_response_body(status, headers, data).get("data") or {}
+            except MazeClientError as e:
+                if not e.is_throttled or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                time.sleep(e.retry_after or 1.0)
+
+    def health(self) -> Dict[str, Any]:
+        """健康检查"""
+        return self.request("GET", "/api/health")
+
+    def get_state(self) -> GameState:
+        """获取当前游戏状态"""
+        return GameState.from_dict(self.request("GET", "/api/state"))
+
+    def get_maze(self) -> MazeData:
+        """获取迷宫布局"""
+        return MazeData.from_rows(self.request("GET", "/api/maze")["rows"])
+
+    def move(self, direction: DirectionLike) -> MoveResponse:
+        """移动玩家"""
+        data = self.request("POST", "/api/move", {"direction": direction_value(direction)})
+        return MoveResponse.from_dict(data)
+
+    def move_batch(self, directions: DirectionsLike, stop_on_failure: bool = True) -> MoveSequenceResult:
+        """连续执行多个移动（一次请求）"""
+        data = self.request("POST", "/api/move/batch", {
+            "directions": directions_payload(directions),
+            "stop_on_failure": stop_on_failure
+        })
+        return MoveSequenceResult.from_dict(data)
+
+    def reset(self) -> GameState:
+        """重置当前关卡"""
+        return GameState.from_dict(self.request("POST", "/api/reset"))
+
+    def new_level(self) -> GameState:
+        """生成新关卡"""
+        return GameState.from_dict(self.request("POST", "/api/new-level"))
+
+    def pipeline(self, calls: Sequence[Tuple[Callable, tuple]]) -> List[Any]:
+        """
+        并行执行多个相互独立的请求，按提交顺序返回结果
+
+        Args:
+            calls: (方法, 参数元组) 列表，例如 [(client.get_state, ()), (client.move, ("up",))]
+
+        Returns:
+            结果列表；失败的调用对应位置为异常对象
+        """
+        executor = self._get_executor()
+        futures = [executor.submit(func, *args) for func, args in calls]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.pool_size, thread_name_prefix="MazeClient")
+            return self._executor
+
+    def stream_states(self) -> Iterator[GameState]:
+        """订阅游戏状态推送（使用独立连接，阻塞迭代）"""
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=None)
+        try:
+            connection.request("GET", "/api/stream", headers=self.headers)
+            response = connection.getresponse()
+            if response.status >= 400:
+                headers = {key.lower(): value for key, value in response.getheaders()}
+                parse_response_body(response.status, headers, response.read())
+            for event_name, data in iter_sse_events(response):
+                if event_name == "game_state":
+                    yield GameState.from_dict(json.loads(data))
+        finally:
+            connection.close()
+
+    def close(self):
+        """关闭所有连接"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def __enter__(self) -> 'MazeClient':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
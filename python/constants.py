@@ -47,6 +47,29 @@ class UIConstants:
     PANEL_BACKGROUND_COLOR = (220, 220, 220)
     BORDER_COLOR = (180, 180, 180)
 
+    # 主循环待处理的其他线程事件上限
+    EVENT_QUEUE_SIZE = 256
+
+    # 迷宫底图分块缓存：每块的边长上限（像素）和最多缓存的块数
+    MAZE_TILE_PIXELS = 512
+    MAZE_TILE_CACHE_SIZE = 64
+
+    # 主循环：最大帧率（0表示不限制）、空闲时等待事件的超时（毫秒）、
+    # 收到输入后持续重绘的时长（秒，让悬停等界面动画完成）
+    MAX_FPS = 60
+    IDLE_WAIT_MS = 1000
+    ACTIVE_RENDER_SECONDS = 0.5
+    # 帧率统计的刷新间隔（秒）
+    FPS_OVERLAY_INTERVAL = 1.0
+
+    # 多会话缩略图视图：每帧最多刷新的缩略图数、事件队列上限
+    MOSAIC_REFRESH_BUDGET = 16
+    MOSAIC_EVENT_QUEUE_SIZE = 4096
+    MOSAIC_LABEL_FONT_SIZE = 12
+
+    # 非UI文字渲染缓存的条目数（见 FontManager.render_text）
+    TEXT_CACHE_SIZE = 512
+
     @classmethod
     def calculate_layout(cls, window_width: int, window_height: int) -> Dict[str, Any]:
         """根据窗口大小计算布局尺寸"""
@@ -93,6 +116,8 @@ class GameConstants:
     CELL_SIZE = 20
     MIN_CELL_SIZE = 10
     MAX_CELL_SIZE = 40
+    # 缩放级别（单元格像素尺寸，介于 MIN_CELL_SIZE 与 MAX_CELL_SIZE 之间）
+    ZOOM_CELL_SIZES = (10, 14, 20, 28, 40)
     MAZE_PADDING = 40
     MIN_SCALE = 0.5
     MAX_SCALE = 2.0
@@ -181,3 +206,28 @@ class ServerConstants:
     MIN_PORT = 1024
     MAX_PORT = 65535
     PORT_RANGE = 100
+
+    # 限流（每个客户端/会话的令牌桶，速率为0表示不限流）
+    RATE_LIMIT_PER_SECOND = 20.0
+    RATE_LIMIT_BURST = 40
+
+    # 背压（游戏服务的并发执行数与排队上限）
+    MAX_CONCURRENT_REQUESTS = 4
+    MAX_QUEUED_REQUESTS = 32
+    QUEUE_TIMEOUT = 2.0
+
+    # 批量移动与状态推送
+    MAX_BATCH_MOVES = 1000
+    STREAM_QUEUE_SIZE = 64
+    STREAM_KEEPALIVE = 15.0
+    # 同时保持的状态推送连接上限（每个连接占用一个服务器线程和一个事件订阅），超出返回429
+    MAX_STREAMS = 32
+    STREAM_RETRY_AFTER = 5
+
+    # MCP工具在独立线程池中调用游戏服务，避免阻塞事件循环
+    MCP_WORKER_THREADS = 8
+    MCP_CALL_TIMEOUT = 10.0
+    MCP_NEW_LEVEL_TIMEOUT = 60.0
+
+    # 无界面模式主循环检查停止信号的间隔（秒）
+    HEADLESS_WAIT_SECONDS = 1.0
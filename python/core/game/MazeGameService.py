@@ -2,53 +2,124 @@
 """
 游戏核心逻辑服务
 """
-from typing import Optional, Tuple
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 from python.core.maze.MazeGenerator import MazeGenerator
 from python.core.models.GameModels import *
 from python.core.models.MazeModels import MazeData
 from python.logger import logger
+from python.utils.MetricsRegistry import metrics
+
+MOVE_DURATION = metrics.histogram(
+    "maze_game_move_duration_seconds", "move_player 耗时（含等待服务锁）", ("result",))
+GENERATE_LEVEL_DURATION = metrics.histogram(
+    "maze_game_generate_level_duration_seconds", "generate_new_level 耗时")
 
 
 class MazeGameService:
     """迷宫游戏核心服务"""
 
-    def __init__(self, maze_width: int = 55, maze_height: int = 35):
+    def __init__(self, maze_width: int = 55, maze_height: int = 35, generate_in_background: bool = False):
+        """
+        Args:
+            maze_width: 迷宫宽度
+            maze_height: 迷宫高度
+            generate_in_background: 在后台线程中生成第一个关卡，构造函数立即返回；
+                                    生成期间调用方法的线程在服务锁上等待，可用 wait_until_ready 等待完成
+        """
         self.maze_width: int = maze_width
         self.maze_height: int = maze_height
         self.maze_data: Optional[MazeData] = None
         self.game_state: Optional[GameState] = None
-        self._initialize_game()
+        # 状态版本号（每次状态变化递增）和关卡版本号（每次生成新迷宫递增）
+        self.state_version: int = 0
+        self.level_version: int = 0
+        # 服务可能被UI线程、HTTP线程和MCP线程同时访问
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        if generate_in_background:
+            locked = threading.Event()
+            threading.Thread(target=self._initialize_in_background, args=(locked,),
+                             daemon=True, name="Maze-Generator").start()
+            # 等后台线程持有服务锁后再返回，保证之后的调用都排在生成之后
+            locked.wait()
+        else:
+            self._initialize_game()
+            self._ready.set()
+
+    def _initialize_in_background(self, locked: threading.Event) -> None:
+        """后台线程：持有服务锁生成第一个关卡（此时还没有可访问的关卡，调用方只能等待）"""
+        with self._lock:
+            locked.set()
+            try:
+                with GENERATE_LEVEL_DURATION.time():
+                    self._initialize_game()
+            except Exception as e:
+                logger.error(f"生成第一个关卡失败: {e}")
+            finally:
+                self._ready.set()
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待第一个关卡生成完成
+
+        Returns:
+            是否已完成（生成失败时也返回 True，此时 game_state 为 None）
+        """
+        return self._ready.wait(timeout)
 
     def _initialize_game(self) -> None:
-        """初始化新游戏"""
+        """初始化新游戏（生成并切换到新关卡）"""
+        self._install_level(*self._build_level(self.maze_width, self.maze_height))
+
+    @staticmethod
+    def _build_level(maze_width: int, maze_height: int) -> Tuple[MazeData, GameState]:
+        """生成新关卡的迷宫和初始状态；不访问服务状态，可以在不持有服务锁时调用"""
         logger.info("初始化新游戏")
 
-        generator = MazeGenerator(self.maze_width, self.maze_height)
-        self.maze_data = generator.generate()
+        generator = MazeGenerator(maze_width, maze_height)
+        maze_data = generator.generate()
 
         # 设置起点（左下角）和终点（右上角）
-        start_pos = Position(row=self.maze_data.height - 2, col=0)
-        exit_pos = Position(row=1, col=self.maze_data.width - 1)
+        start_pos = Position(row=maze_data.height - 2, col=0)
+        exit_pos = Position(row=1, col=maze_data.width - 1)
 
         # 打通入口和出口
-        self.maze_data.grid[self.maze_data.height - 2][0] = 0
-        self.maze_data.grid[self.maze_data.height - 2][1] = 0
-        self.maze_data.grid[1][self.maze_data.width - 2] = 0
-        self.maze_data.grid[1][self.maze_data.width - 1] = 0
+        maze_data.grid[maze_data.height - 2][0] = 0
+        maze_data.grid[maze_data.height - 2][1] = 0
+        maze_data.grid[1][maze_data.width - 2] = 0
+        maze_data.grid[1][maze_data.width - 1] = 0
 
-        self.game_state = GameState(
-            maze_size=MazeSize(self.maze_data.width, self.maze_data.height),
+        game_state = GameState(
+            maze_size=MazeSize(maze_data.width, maze_data.height),
             player_position=start_pos,
             exit_position=exit_pos,
             move_count=0,
             is_completed=False
         )
+        return maze_data, game_state
 
-        logger.info(f"游戏初始化完成 (玩家位置: {start_pos}, 出口位置: {exit_pos})")
+    def _install_level(self, maze_data: MazeData, game_state: GameState) -> None:
+        """切换到新关卡（调用方持有锁，或在构造期间调用）"""
+        self.maze_data = maze_data
+        self.game_state = game_state
+        self.level_version += 1
+        self._touch_state()
+
+        logger.info(f"游戏初始化完成 (玩家位置: {game_state.player_position}, 出口位置: {game_state.exit_position})")
 
     def move_player(self, direction: Direction) -> MoveResponse:
         """移动玩家"""
+        start = time.perf_counter()
+        with self._lock:
+            response = self._move_player_locked(direction)
+        MOVE_DURATION.observe(time.perf_counter() - start, response.result.value)
+        return response
+
+    def _move_player_locked(self, direction: Direction) -> MoveResponse:
+        """移动玩家（调用方持有锁）"""
         logger.debug(f"尝试移动玩家方向: {direction.value}")
 
         if self.game_state is None or self.maze_data is None:
@@ -107,6 +178,8 @@ class MazeGameService:
             self.game_state.is_completed = True
             logger.info(f"玩家到达出口! 总移动次数: {self.game_state.move_count}")
 
+        self._touch_state()
+
         logger.debug(f"移动成功，新位置: ({new_row}, {new_col})")
         return MoveResponse(
             success=True,
@@ -115,6 +188,68 @@ class MazeGameService:
             message="Move successful"
         )
 
+    def move_sequence(self, directions: List[Direction], stop_on_failure: bool = True) -> MoveSequenceResult:
+        """
+        在一次加锁内连续执行多个移动
+
+        Args:
+            directions: 移动方向序列
+            stop_on_failure: 遇到撞墙/越界时是否停止执行
+
+        Returns:
+            连续移动结果，包含停止位置和原因
+        """
+        with self._lock:
+            responses: List[MoveResponse] = []
+            stop_index: Optional[int] = None
+            stop_result: Optional[MoveResult] = None
+
+            for index, direction in enumerate(directions):
+                response = self._move_player_locked(direction)
+                responses.append(response)
+
+                if response.result == MoveResult.ALREADY_AT_EXIT or \
+                        (not response.success and stop_on_failure):
+                    stop_index, stop_result = index, response.result
+                    break
+                if self.game_state.is_completed and index < len(directions) - 1:
+                    # 已到达出口，剩余移动不再执行
+                    stop_index, stop_result = index + 1, MoveResult.ALREADY_AT_EXIT
+                    break
+
+            return MoveSequenceResult(
+                requested=len(directions),
+                executed=len(responses),
+                game_state=self.game_state.clone(),
+                stop_index=stop_index,
+                stop_result=stop_result,
+                responses=responses
+            )
+
+    def probe(self) -> Tuple[Position, Dict[str, bool]]:
+        """
+        查询玩家四个相邻格子是否可通行（不改变任何状态）
+
+        Returns:
+            (玩家位置, 以方向值为键（up/down/left/right）的可通行标记)
+        """
+        with self._lock:
+            if self.game_state is None or self.maze_data is None:
+                raise RuntimeError("Game not initialized")
+
+            open_directions = {}
+            for direction in (Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT):
+                row, col = self._calculate_new_position(direction)
+                open_directions[direction.value] = (self._is_within_bounds(row, col) and
+                                                    self.maze_data.grid[row][col] == 0)
+            player_pos = self.game_state.player_position
+            return Position(player_pos.row, player_pos.col), open_directions
+
+    def _touch_state(self) -> None:
+        """标记游戏状态已变化，递增状态版本号"""
+        self.state_version += 1
+        self.game_state.version = self.state_version
+
     def _calculate_new_position(self, direction: Direction) -> Tuple[int, int]:
         """计算新位置坐标"""
         row, col = self.game_state.player_position.row, self.game_state.player_position.col
@@ -139,31 +274,76 @@ class MazeGameService:
         """重置当前关卡（玩家回到起点）"""
         logger.info("重置当前关卡")
 
-        if self.game_state is None:
-            raise RuntimeError("Game not initialized")
+        with self._lock:
+            if self.game_state is None:
+                raise RuntimeError("Game not initialized")
 
-        self.game_state.player_position = Position(
-            row=self.maze_data.height - 2,
-            col=1
-        )
-        self.game_state.move_count = 0
-        self.game_state.is_completed = False
+            self.game_state.player_position = Position(
+                row=self.maze_data.height - 2,
+                col=1
+            )
+            self.game_state.move_count = 0
+            self.game_state.is_completed = False
+            self._touch_state()
 
-        logger.info(f"关卡重置完成 (玩家位置重置)")
-        return self.game_state.clone()
+            logger.info(f"关卡重置完成 (玩家位置重置)")
+            return self.game_state.clone()
 
-    def generate_new_level(self) -> GameState:
-        """生成全新关卡"""
+    def generate_new_level(self) -> Tuple[int, MazeData, GameState]:
+        """
+        生成全新关卡
+
+        Returns:
+            (关卡版本号, 迷宫数据, 游戏状态)，三者来自同一次切换；并发生成时不能再用 get_maze_data 配对
+        """
         logger.info("生成新关卡")
-        self._initialize_game()
-        return self.game_state.clone()
+        with GENERATE_LEVEL_DURATION.time():
+            # 大迷宫的生成可能很慢，在锁外进行，期间其他请求照常访问当前关卡；只有切换关卡时持有锁
+            with self._lock:
+                maze_width, maze_height = self.maze_width, self.maze_height
+            maze_data, game_state = self._build_level(maze_width, maze_height)
+            with self._lock:
+                self._install_level(maze_data, game_state)
+                return self.level_version, self.maze_data, self.game_state.clone()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """获取可持久化的游戏快照（游程编码的迷宫布局与游戏状态）"""
+        with self._lock:
+            if self.game_state is None or self.maze_data is None:
+                raise RuntimeError("Game not initialized")
+            return {"maze": self.maze_data.to_rle(), "game_state": self.game_state.to_dict()}
+
+    def restore(self, snapshot: Dict[str, Any]) -> GameState:
+        """
+        从快照恢复游戏
+
+        Args:
+            snapshot: snapshot() 的结果；不含 "maze" 时只恢复游戏状态，保留当前迷宫
+        """
+        maze_data = MazeData.from_rle(snapshot["maze"]) if snapshot.get("maze") else None
+        game_state = GameState.from_dict(snapshot["game_state"])
+
+        with self._lock:
+            if maze_data is not None:
+                self.maze_data = maze_data
+                self.maze_width, self.maze_height = maze_data.width, maze_data.height
+                self.level_version += 1
+            self.game_state = game_state
+            self._touch_state()
+            return self.game_state.clone()
 
     def get_current_state(self) -> GameState:
         """获取当前游戏状态"""
-        if self.game_state is None:
-            raise RuntimeError("Game not initialized")
-        return self.game_state.clone()
+        with self._lock:
+            if self.game_state is None:
+                raise RuntimeError("Game not initialized")
+            return self.game_state.clone()
 
     def get_maze_data(self) -> Optional[MazeData]:
         """获取迷宫数据"""
         return self.maze_data
+
+    def get_versioned_maze_data(self) -> Tuple[int, Optional[MazeData]]:
+        """获取关卡版本号及对应的迷宫数据（两者保证一致）"""
+        with self._lock:
+            return self.level_version, self.maze_data
@@ -3,7 +3,7 @@
 迷宫生成器
 """
 import random
-from typing import List
+from typing import List, Tuple
 
 from python.core.models.MazeModels import MazeData
 from python.logger import logger
@@ -27,8 +27,8 @@ class MazeGenerator:
             for _ in range(self.height)
         ]
 
-        # 使用递归回溯算法生成迷宫
-        self._recursive_backtrack(grid, 1, 1)
+        # 使用回溯算法生成迷宫
+        self._backtrack(grid, 1, 1)
 
         # 创建迷宫数据对象
         maze_data = MazeData(
@@ -40,17 +40,32 @@ class MazeGenerator:
         logger.info("迷宫生成完成")
         return maze_data
 
-    def _recursive_backtrack(self, grid: List[List[int]], col: int, row: int) -> None:
-        """递归回溯算法核心实现"""
+    def _backtrack(self, grid: List[List[int]], col: int, row: int) -> None:
+        """
+        回溯算法核心实现
+
+        使用显式栈代替递归，大迷宫（例如 501x501，路径深度可达数万）不会超出递归深度限制。
+        """
         grid[row][col] = 0
+        stack = [(col, row, self._shuffled_directions())]
 
-        directions = [(0, -2), (2, 0), (0, 2), (-2, 0)]
-        random.shuffle(directions)
+        while stack:
+            col, row, directions = stack[-1]
+            while directions:
+                dx, dy = directions.pop()
+                new_col, new_row = col + dx, row + dy
 
-        for dx, dy in directions:
-            new_col, new_row = col + dx, row + dy
+                if (1 <= new_col < self.width - 1) and (1 <= new_row < self.height - 1) and grid[new_row][new_col] == 1:
+                    wall_col, wall_row = col + dx // 2, row + dy // 2
+                    grid[wall_row][wall_col] = 0
+                    grid[new_row][new_col] = 0
+                    stack.append((new_col, new_row, self._shuffled_directions()))
+                    break
+            else:
+                stack.pop()
 
-            if (1 <= new_col < self.width - 1) and (1 <= new_row < self.height - 1) and grid[new_row][new_col] == 1:
-                wall_col, wall_row = col + dx // 2, row + dy // 2
-                grid[wall_row][wall_col] = 0
-                self._recursive_backtrack(grid, new_col, new_row)
+    @staticmethod
+    def _shuffled_directions() -> List[Tuple[int, int]]:
+        directions = [(0, -2), (2, 0), (0, 2), (-2, 0)]
+        random.shuffle(directions)
+        return directions
@@ -2,9 +2,9 @@
 """
 游戏核心数据模型
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 
 class Direction(Enum):
@@ -16,6 +16,42 @@ class Direction(Enum):
     WAIT = "wait"
 
 
+# 连续移动字符串中的单字符方向缩写
+DIRECTION_CHARS = {
+    "u": Direction.UP,
+    "d": Direction.DOWN,
+    "l": Direction.LEFT,
+    "r": Direction.RIGHT,
+    "w": Direction.WAIT,
+}
+
+
+def parse_directions(value: Any) -> List[Direction]:
+    """
+    解析移动方向序列
+
+    支持方向名列表（["up", "left"]）、逗号/空格分隔的方向名（"up,left"）
+    以及单字符缩写串（"uulr"）。无法识别时抛出 ValueError。
+    """
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if "," in text or " " in text:
+            names = [name for name in text.replace(",", " ").split() if name]
+        elif text in {direction.value for direction in Direction}:
+            names = [text]
+        else:
+            try:
+                return [DIRECTION_CHARS[char] for char in text]
+            except KeyError as e:
+                raise ValueError(f"Invalid direction character: {e.args[0]!r}")
+    elif isinstance(value, (list, tuple)):
+        names = [str(name).strip().lower() for name in value]
+    else:
+        raise ValueError("Directions must be a string or a list")
+
+    return [Direction(name) for name in names]
+
+
 class MoveResult(Enum):
     """移动结果枚举"""
     SUCCESS = "success"
@@ -56,6 +92,11 @@ class MazeSize:
         """转换为字典"""
         return {"width": self.width, "height": self.height}
 
+    @staticmethod
+    def from_dict(data: Dict[str, int]) -> 'MazeSize':
+        """从字典创建"""
+        return MazeSize(width=data["width"], height=data["height"])
+
 
 @dataclass
 class GameState:
@@ -65,6 +106,8 @@ class GameState:
     exit_position: Position
     move_count: int = 0
     is_completed: bool = False
+    # 状态版本号，每次状态变化时递增，用于序列化缓存（不参与比较和输出）
+    version: int = field(default=0, compare=False)
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -76,6 +119,17 @@ class GameState:
             "is_completed": self.is_completed
         }
 
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> 'GameState':
+        """从字典创建"""
+        return GameState(
+            maze_size=MazeSize.from_dict(data["maze_size"]),
+            player_position=Position.from_dict(data["player_position"]),
+            exit_position=Position.from_dict(data["exit_position"]),
+            move_count=data.get("move_count", 0),
+            is_completed=data.get("is_completed", False)
+        )
+
     def clone(self) -> 'GameState':
         """创建副本"""
         return GameState(
@@ -83,7 +137,8 @@ class GameState:
             player_position=Position(self.player_position.row, self.player_position.col),
             exit_position=Position(self.exit_position.row, self.exit_position.col),
             move_count=self.move_count,
-            is_completed=self.is_completed
+            is_completed=self.is_completed,
+            version=self.version
         )
 
 
@@ -120,3 +175,51 @@ class MoveResponse:
             "scene_info": self.game_state.to_dict(),
             "message": self.message
         }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> 'MoveResponse':
+        """从字典创建"""
+        return MoveResponse(
+            success=data["success"],
+            result=MoveResult(data["result"]),
+            game_state=GameState.from_dict(data["scene_info"]),
+            message=data.get("message", "")
+        )
+
+
+@dataclass
+class MoveSequenceResult:
+    """连续移动结果"""
+    requested: int
+    executed: int
+    game_state: GameState
+    stop_index: Optional[int] = None
+    stop_result: Optional[MoveResult] = None
+    responses: List[MoveResponse] = field(default_factory=list, repr=False)
+
+    @property
+    def completed_all(self) -> bool:
+        """是否执行完所有移动"""
+        return self.stop_index is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "requested": self.requested,
+            "executed": self.executed,
+            "stop_index": self.stop_index,
+            "stop_result": self.stop_result.value if self.stop_result else None,
+            "scene_info": self.game_state.to_dict()
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> 'MoveSequenceResult':
+        """从字典创建"""
+        stop_result = data.get("stop_result")
+        return MoveSequenceResult(
+            requested=data["requested"],
+            executed=data["executed"],
+            game_state=GameState.from_dict(data["scene_info"]),
+            stop_index=data.get("stop_index"),
+            stop_result=MoveResult(stop_result) if stop_result else None
+        )
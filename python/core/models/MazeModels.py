@@ -27,6 +27,61 @@ class MazeData:
             return self.grid[position.row][position.col] == 0
         return False
 
+    def to_rows(self) -> List[str]:
+        """转换为每行一个 '0'/'1' 字符串的紧凑表示（1为墙）"""
+        return [''.join('1' if cell else '0' for cell in row) for row in self.grid]
+
+    @staticmethod
+    def from_rows(rows: List[str]) -> 'MazeData':
+        """从 to_rows() 的紧凑表示创建"""
+        grid = [[1 if char == '1' else 0 for char in row] for row in rows]
+        return MazeData(grid=grid, width=len(grid[0]) if grid else 0, height=len(grid))
+
+    def to_text(self) -> str:
+        """转换为文本网格，每行一个字符串（'#'为墙，'.'为路径）"""
+        return '\n'.join(''.join('#' if cell else '.' for cell in row) for row in self.grid)
+
+    def to_rle(self) -> str:
+        """
+        转换为按行游程编码的文本，例如 "3#2.#" 表示 "###..#"（数量为1时省略）
+
+        走廊较长时编码结果明显短于文本网格（55x35 的迷宫约为六成）。
+        """
+        lines = []
+        for row in self.grid:
+            runs = []
+            run_cell, run_length = row[0], 0
+            for cell in row:
+                if cell == run_cell:
+                    run_length += 1
+                    continue
+                runs.append(_format_run(run_cell, run_length))
+                run_cell, run_length = cell, 1
+            runs.append(_format_run(run_cell, run_length))
+            lines.append(''.join(runs))
+        return '\n'.join(lines)
+
+    @staticmethod
+    def from_rle(text: str) -> 'MazeData':
+        """从 to_rle() 的游程编码创建"""
+        grid = []
+        for line in text.splitlines():
+            row: List[int] = []
+            count = ''
+            for char in line:
+                if char.isdigit():
+                    count += char
+                    continue
+                row.extend([1 if char == '#' else 0] * int(count or 1))
+                count = ''
+            grid.append(row)
+        return MazeData(grid=grid, width=len(grid[0]) if grid else 0, height=len(grid))
+
+    def crop(self, row: int, col: int, height: int, width: int) -> 'MazeData':
+        """截取从 (row, col) 开始的局部迷宫（超出边界的部分被截断）"""
+        grid = [cells[col:col + width] for cells in self.grid[row:row + height]]
+        return MazeData(grid=grid, width=len(grid[0]) if grid else 0, height=len(grid))
+
     def clone(self) -> 'MazeData':
         """创建副本"""
         return MazeData(
@@ -34,3 +89,8 @@ class MazeData:
             width=self.width,
             height=self.height
         )
+
+
+def _format_run(cell: int, length: int) -> str:
+    char = '#' if cell else '.'
+    return f"{length}{char}" if length > 1 else char
@@ -35,6 +35,13 @@ class LoggerFactory:
 
             cls._initialized = True
 
+    @classmethod
+    def use_stderr(cls):
+        """将日志输出改到标准错误（stdout 被 MCP stdio 传输占用时使用）"""
+        for handler in logging.getLogger('maze_game').handlers:
+            if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+                handler.setStream(sys.stderr)
+
     @classmethod
     def get_logger(cls, name: str) -> logging.Logger:
         """获取指定名称的日志记录器"""
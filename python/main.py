@@ -11,7 +11,6 @@ project_root = os.path.dirname(current_dir)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from python.app.ApplicationController import ApplicationController
 from python.logger import logger
 
 
@@ -28,6 +27,38 @@ def parse_arguments():
                         help='迷宫宽度 (默认: 55)')
     parser.add_argument('--maze-height', type=int, default=35,
                         help='迷宫高度 (默认: 35)')
+    parser.add_argument('--mcp-transport', choices=['sse', 'streamable-http', 'stdio'], default='sse',
+                        help='MCP传输方式：sse/streamable-http/stdio (默认: sse)')
+    parser.add_argument('--mcp-host', default=None,
+                        help='MCP服务器主机地址 (默认: 与HTTP服务器相同)')
+    parser.add_argument('--mcp-port', type=int, default=None,
+                        help='MCP服务器端口 (默认: HTTP服务器端口+1)')
+    parser.add_argument('--mcp-output', choices=['text', 'json', 'terse'], default='text',
+                        help='MCP工具默认输出格式：text(中文说明)/json(紧凑JSON)/terse(极简文本) (默认: text)')
+    parser.add_argument('--event-log', default=None,
+                        help='事件日志文件路径，启用后游戏事件写入该文件，可用 python/tools/replay_event_log.py 回放')
+    parser.add_argument('--event-bridge', default=None,
+                        help='跨进程事件桥地址（Unix域套接字路径或 tcp://host:port），与其他进程互相转发游戏事件')
+    parser.add_argument('--bridge-mirror', action='store_true',
+                        help='将事件桥收到的新关卡和状态更新同步到本进程的游戏（用于观看其他进程的游戏）')
+    parser.add_argument('--no-http', action='store_true',
+                        help='不启动HTTP服务器（不导入Flask）')
+    parser.add_argument('--no-mcp', action='store_true',
+                        help='不启动MCP服务器（不导入mcp）')
+    parser.add_argument('--headless', action='store_true',
+                        help='无界面模式：只运行游戏服务和HTTP/MCP服务器，不导入pygame，不需要显示器')
+    parser.add_argument('--max-fps', type=int, default=60,
+                        help='游戏窗口最大帧率，0表示不限制；空闲时不重绘 (默认: 60)')
+    parser.add_argument('--show-fps', action='store_true',
+                        help='在游戏窗口右上角显示帧率与平均帧耗时')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='启动完成后向标准错误输出启动分析报告（各阶段耗时与按包统计的导入耗时）')
+    parser.add_argument('--rate-limit', type=float, default=20.0,
+                        help='每个客户端每秒允许的请求数，0表示不限流 (默认: 20)')
+    parser.add_argument('--rate-burst', type=int, default=40,
+                        help='每个客户端允许的突发请求数 (默认: 40)')
+    parser.add_argument('--max-queue', type=int, default=32,
+                        help='游戏服务繁忙时允许排队的请求数，超出则丢弃 (默认: 32)')
 
     return parser.parse_args()
 
@@ -37,10 +68,21 @@ def main() -> int:
     try:
         # 解析命令行参数
         args = parse_arguments()
+        from python.utils.StartupProfiler import StartupProfiler
+        profiler = StartupProfiler(trace_imports=args.profile_startup)
+
+        # stdio 传输占用标准输出，pygame 导入时的提示信息也不能写到标准输出
+        if args.mcp_transport == "stdio" and not args.headless:
+            os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        with profiler.phase("导入应用程序"):
+            from python.app.ApplicationController import ApplicationController
 
         # 创建并初始化应用程序控制器
-        controller = ApplicationController()
+        controller = ApplicationController(profiler)
         controller.initialize(args)
+        profiler.finish()
+        if args.profile_startup:
+            profiler.print_report()
 
         # 运行应用程序
         controller.run()
@@ -2,32 +2,66 @@
 """
 基于 Flask 的 HTTP 游戏服务器
 """
+import queue
 import socket
 import threading
+import time
 from typing import Optional
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, request
 
 from python.app.GameEventBus import EventType, GameEventBus
+from python.constants import ServerConstants
 from python.core.game.MazeGameService import MazeGameService
-from python.core.models.GameModels import Direction, GameState
+from python.core.models.GameModels import Direction, GameState, parse_directions
 from python.logger import logger
+from python.server.RateLimiter import RateLimiter, RateLimitExceeded, RequestGate, ServiceOverloaded
+from python.server.SingleFlight import SingleFlight
+from python.server.StateSerializer import StateSerializer
+from python.utils.MetricsRegistry import metrics
+
+REQUEST_COUNT = metrics.counter(
+    "maze_http_requests_total", "HTTP请求总数", ("route", "method", "status"))
+REQUEST_DURATION = metrics.histogram(
+    "maze_http_request_duration_seconds", "HTTP请求处理耗时", ("route", "method"))
+COALESCED_READS = metrics.counter(
+    "maze_http_coalesced_reads_total", "读请求合并结果（cached/shared/computed）", ("resource", "outcome"))
 
 
 class HttpGameServer:
     """HTTP游戏服务器"""
 
-    def __init__(self, game_service: MazeGameService, host: str = "127.0.0.1", port: int = 8000):
+    # 需要限流的接口
+    LIMITED_ENDPOINTS = frozenset({
+        'get_game_state', 'get_maze', 'make_move', 'make_moves', 'reset_current_level', 'generate_new_level',
+        'stream_game_state'
+    })
+    # 需要占用游戏服务执行槽位的接口（读接口经请求合并后不占用槽位）
+    GATED_ENDPOINTS = frozenset({'make_move', 'make_moves', 'reset_current_level', 'generate_new_level'})
+
+    def __init__(self, game_service: MazeGameService, host: str = "127.0.0.1", port: int = 8000,
+                 rate_limiter: Optional[RateLimiter] = None, request_gate: Optional[RequestGate] = None):
         self.game_service = game_service
         self.host = host
         self.port = port
         self.server_thread: Optional[threading.Thread] = None
         self.flask_app: Optional[Flask] = None
         self.event_bus = GameEventBus()
+        self.serializer = StateSerializer()
+        self.single_flight = SingleFlight()
+        # 当前保持中的状态推送连接数
+        self.active_streams = 0
+        self._streams_lock = threading.Lock()
+        self.rate_limiter = rate_limiter or RateLimiter(
+            ServerConstants.RATE_LIMIT_PER_SECOND, ServerConstants.RATE_LIMIT_BURST)
+        self.request_gate = request_gate or RequestGate(
+            ServerConstants.MAX_CONCURRENT_REQUESTS, ServerConstants.MAX_QUEUED_REQUESTS,
+            ServerConstants.QUEUE_TIMEOUT)
 
         # 创建 Flask 应用
         self.flask_app = Flask(__name__)
         self._setup_routes()
+        self._register_limit_metrics()
 
     def _find_available_port(self, start_port: int = 8000, port_range: int = 100) -> int:
         """寻找可用端口"""
@@ -48,23 +82,83 @@ class HttpGameServer:
             response_data = {"success": success, "message": message}
             if data:
                 response_data["data"] = data
-            return jsonify(response_data)
+            return Response(self.serializer.encode(response_data), mimetype='application/json')
+
+        def throttled_response(message: str, status: int, retry_after: int):
+            """限流/过载响应，附带 Retry-After 头"""
+            response = standard_response(False, message)
+            response.status_code = status
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+
+        @self.flask_app.before_request
+        def start_request_timer():
+            """记录请求开始时间"""
+            g.request_start = time.perf_counter()
+
+        @self.flask_app.before_request
+        def apply_rate_limit():
+            """按客户端限流，并为访问游戏服务的请求申请执行槽位"""
+            if request.endpoint not in self.LIMITED_ENDPOINTS:
+                return None
+
+            try:
+                self.rate_limiter.check(self._get_client_key())
+                if request.endpoint in self.GATED_ENDPOINTS:
+                    self.request_gate.acquire()
+                    g.gate_acquired = True
+            except RateLimitExceeded as e:
+                return throttled_response("请求过于频繁，请稍后重试", 429, e.retry_after_seconds)
+            except ServiceOverloaded as e:
+                logger.warning("游戏服务繁忙，请求已被丢弃")
+                return throttled_response("服务繁忙，请稍后重试", 503, e.retry_after_seconds)
+            return None
+
+        @self.flask_app.teardown_request
+        def release_request_slot(exc):
+            """释放游戏服务执行槽位"""
+            if g.pop('gate_acquired', False):
+                self.request_gate.release()
 
         @self.flask_app.route('/api/health', methods=['GET'])
         def health_check():
             """健康检查端点"""
             return standard_response(True, "服务器运行正常", {"status": "healthy"})
 
+        @self.flask_app.route('/api/metrics', methods=['GET'])
+        def get_metrics():
+            """Prometheus 文本格式的性能指标"""
+            return Response(metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+        @self.flask_app.route('/api/limits', methods=['GET'])
+        def get_limit_stats():
+            """获取限流与背压统计"""
+            return standard_response(True, "统计获取成功", {
+                "rate_limit": self.rate_limiter.get_stats(),
+                "backpressure": self.request_gate.get_stats(),
+                "streams": {"active": self.active_streams, "max": ServerConstants.MAX_STREAMS}
+            })
+
         @self.flask_app.route('/api/state', methods=['GET'])
         def get_game_state():
-            """获取当前游戏状态"""
+            """获取当前游戏状态（同一状态版本的并发请求共享一次计算）"""
             try:
-                state: GameState = self.game_service.get_current_state()
-                return standard_response(True, "状态获取成功", state.to_dict())
+                body = self._coalesced_read("state", self.game_service.state_version, self._build_state_body)
+                return Response(body, mimetype='application/json')
             except Exception as e:
                 logger.error(f"获取状态失败: {e}")
                 return standard_response(False, f"获取状态失败: {str(e)}"), 500
 
+        @self.flask_app.route('/api/maze', methods=['GET'])
+        def get_maze():
+            """获取迷宫布局（同一关卡的并发请求共享一次计算）"""
+            try:
+                body = self._coalesced_read("maze", self.game_service.level_version, self._build_maze_body)
+                return Response(body, mimetype='application/json')
+            except Exception as e:
+                logger.error(f"获取迷宫失败: {e}")
+                return standard_response(False, f"获取迷宫失败: {str(e)}"), 500
+
         @self.flask_app.route('/api/move', methods=['POST'])
         def make_move():
             """执行移动指令"""
@@ -80,28 +174,35 @@ class HttpGameServer:
                 # 调用游戏核心逻辑
                 move_result = self.game_service.move_player(direction)
 
-                # 通过事件总线通知所有监听者
+                # 同一状态版本只序列化一次，响应和事件负载共享
+                state_dict = self.serializer.state_dict(move_result.game_state)
+                result_dict = self.serializer.move_dict(move_result)
+
+                # 通过事件总线通知所有监听者（会话为发起请求的客户端）
+                session_id = self._get_client_key()
                 self.event_bus.emit(
                     EventType.PLAYER_MOVED,
                     {
                         "direction": direction.value,
-                        "result": move_result.to_dict(),
-                        "game_state": self.game_service.get_current_state().to_dict()
-                    }
+                        "result": result_dict,
+                        "game_state": state_dict
+                    },
+                    session_id=session_id
                 )
 
                 # 如果游戏状态改变，发送更新事件
                 self.event_bus.emit(
                     EventType.GAME_STATE_UPDATED,
                     {
-                        "game_state": self.game_service.get_current_state().to_dict()
-                    }
+                        "game_state": state_dict
+                    },
+                    session_id=session_id
                 )
 
                 return standard_response(
                     move_result.success,
                     move_result.message,
-                    move_result.to_dict()
+                    result_dict
                 )
             except ValueError as e:
                 logger.warning(f"请求参数错误: {e}")
@@ -110,31 +211,128 @@ class HttpGameServer:
                 logger.error(f"服务器内部错误: {e}")
                 return standard_response(False, f"服务器内部错误: {str(e)}"), 500
 
+        @self.flask_app.route('/api/move/batch', methods=['POST'])
+        def make_moves():
+            """连续执行多个移动指令"""
+            try:
+                request_data = request.get_json(silent=True)
+                if not request_data or 'directions' not in request_data:
+                    return standard_response(False, "请求格式错误，缺少'directions'字段"), 400
+
+                directions = parse_directions(request_data['directions'])
+                if not directions or len(directions) > ServerConstants.MAX_BATCH_MOVES:
+                    return standard_response(
+                        False, f"移动数量必须在 1 到 {ServerConstants.MAX_BATCH_MOVES} 之间"), 400
+
+                stop_on_failure = bool(request_data.get('stop_on_failure', True))
+                sequence = self.game_service.move_sequence(directions, stop_on_failure)
+
+                # 每一步都发送移动事件，保证事件流与逐步移动一致；负载只在有订阅者读取时构建
+                session_id = self._get_client_key()
+                for direction, move_result in zip(directions, sequence.responses):
+                    self.event_bus.emit(
+                        EventType.PLAYER_MOVED,
+                        lambda direction=direction, move_result=move_result: {
+                            "direction": direction.value,
+                            "result": self.serializer.move_dict(move_result),
+                            "game_state": self.serializer.state_dict(move_result.game_state)
+                        },
+                        session_id=session_id
+                    )
+
+                self.event_bus.emit(
+                    EventType.GAME_STATE_UPDATED,
+                    lambda: {
+                        "game_state": self.serializer.state_dict(sequence.game_state)
+                    },
+                    session_id=session_id
+                )
+
+                message = "全部移动执行完成" if sequence.completed_all else \
+                    f"移动在第 {sequence.stop_index} 步停止: {sequence.stop_result.value}"
+                return standard_response(True, message, self.serializer.sequence_dict(sequence))
+            except ValueError as e:
+                logger.warning(f"请求参数错误: {e}")
+                return standard_response(False, f"请求参数错误: {str(e)}"), 400
+            except Exception as e:
+                logger.error(f"服务器内部错误: {e}")
+                return standard_response(False, f"服务器内部错误: {str(e)}"), 500
+
+        @self.flask_app.route('/api/stream', methods=['GET'])
+        def stream_game_state():
+            """以SSE推送游戏状态更新（打开连接计入限流，同时保持的连接数有上限）"""
+            if not self._open_stream():
+                return throttled_response("状态推送连接数已达上限，请稍后重试", 429,
+                                          ServerConstants.STREAM_RETRY_AFTER)
+
+            client_queue: queue.Queue = queue.Queue(maxsize=ServerConstants.STREAM_QUEUE_SIZE)
+
+            def on_state_updated(event):
+                # 客户端消费过慢时丢弃最旧的状态，只保留最新状态
+                while True:
+                    try:
+                        client_queue.put_nowait(event.data.get("game_state"))
+                        return
+                    except queue.Full:
+                        try:
+                            client_queue.get_nowait()
+                        except queue.Empty:
+                            pass
+
+            # ?session=<客户端标识> 只推送该客户端引起的状态更新
+            session_id = request.args.get('session') or None
+
+            def generate():
+                subscription = self.event_bus.subscribe(
+                    EventType.GAME_STATE_UPDATED, on_state_updated, session_id=session_id)
+                try:
+                    state = self.game_service.get_current_state()
+                    yield self._format_sse_event(self.serializer.state_dict(state))
+                    while True:
+                        try:
+                            state_dict = client_queue.get(timeout=ServerConstants.STREAM_KEEPALIVE)
+                        except queue.Empty:
+                            yield b": keepalive\n\n"
+                            continue
+                        yield self._format_sse_event(state_dict)
+                finally:
+                    subscription.cancel()
+
+            response = Response(generate(), mimetype='text/event-stream',
+                                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+            # 连接关闭时释放名额（生成器未开始迭代就断开时 finally 不会执行，因此不在生成器中释放）
+            response.call_on_close(self._close_stream)
+            return response
+
         @self.flask_app.route('/api/reset', methods=['POST'])
         def reset_current_level():
             """重置当前关卡 (人工触发)"""
             try:
                 new_state: GameState = self.game_service.reset_current_level()
+                state_dict = self.serializer.state_dict(new_state)
 
                 # 通过事件总线通知
+                session_id = self._get_client_key()
                 self.event_bus.emit(
                     EventType.LEVEL_RESET,
                     {
-                        "game_state": new_state.to_dict()
-                    }
+                        "game_state": state_dict
+                    },
+                    session_id=session_id
                 )
 
                 self.event_bus.emit(
                     EventType.GAME_STATE_UPDATED,
                     {
-                        "game_state": new_state.to_dict()
-                    }
+                        "game_state": state_dict
+                    },
+                    session_id=session_id
                 )
 
                 return standard_response(
                     success=True,
                     message="当前关卡已重置",
-                    data=new_state.to_dict()
+                    data=state_dict
                 )
             except Exception as e:
                 logger.error(f"重置失败: {e}")
@@ -144,40 +342,135 @@ class HttpGameServer:
         def generate_new_level():
             """生成全新关卡 (人工触发)"""
             try:
-                new_state: GameState = self.game_service.generate_new_level()
+                _, maze_data, new_state = self.game_service.generate_new_level()
+                state_dict = self.serializer.state_dict(new_state)
 
-                # 通过事件总线通知
+                # 通过事件总线通知（附带游程编码的迷宫布局，供事件日志回放）
+                session_id = self._get_client_key()
                 self.event_bus.emit(
                     EventType.NEW_LEVEL_GENERATED,
-                    {
-                        "game_state": new_state.to_dict()
-                    }
+                    lambda: {
+                        "game_state": state_dict,
+                        "maze": maze_data.to_rle()
+                    },
+                    session_id=session_id
                 )
 
                 self.event_bus.emit(
                     EventType.GAME_STATE_UPDATED,
                     {
-                        "game_state": new_state.to_dict()
-                    }
+                        "game_state": state_dict
+                    },
+                    session_id=session_id
                 )
 
                 return standard_response(
                     success=True,
                     message="新关卡已生成",
-                    data=new_state.to_dict()
+                    data=state_dict
                 )
             except Exception as e:
                 logger.error(f"生成新关卡失败: {e}")
                 return standard_response(False, f"生成新关卡失败: {str(e)}"), 500
 
+        @self.flask_app.after_request
+        def record_request_metrics(response):
+            """记录请求计数与耗时"""
+            start = g.get('request_start')
+            if start is not None:
+                route = request.url_rule.rule if request.url_rule else "unmatched"
+                REQUEST_DURATION.observe(time.perf_counter() - start, route, request.method)
+                REQUEST_COUNT.inc(route, request.method, str(response.status_code))
+            return response
+
         # 添加CORS支持
         @self.flask_app.after_request
         def after_request(response):
             response.headers.add('Access-Control-Allow-Origin', '*')
-            response.headers.add('Access-Control-Allow-Headers', 'Content-Type')
+            response.headers.add('Access-Control-Allow-Headers', 'Content-Type, X-Client-Id')
+            response.headers.add('Access-Control-Expose-Headers', 'Retry-After')
             response.headers.add('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
             return response
 
+    def _coalesced_read(self, resource: str, version: int, builder) -> bytes:
+        """
+        读取指定版本资源的编码结果
+        已缓存则直接返回；否则同一版本的并发请求只由一个线程构建并共享结果。
+        """
+        key = (resource, version)
+        body = self.serializer.get_encoded(key)
+        if body is not None:
+            COALESCED_READS.inc(resource, "cached")
+            return body
+
+        def build() -> bytes:
+            encoded = builder()
+            self.serializer.put_encoded(key, encoded)
+            return encoded
+
+        body, shared = self.single_flight.do(key, build)
+        COALESCED_READS.inc(resource, "shared" if shared else "computed")
+        return body
+
+    def _build_state_body(self) -> bytes:
+        """构建 /api/state 的完整响应体"""
+        state: GameState = self.game_service.get_current_state()
+        return self.serializer.encode({
+            "success": True,
+            "message": "状态获取成功",
+            "data": self.serializer.state_dict(state)
+        })
+
+    def _build_maze_body(self) -> bytes:
+        """构建 /api/maze 的完整响应体"""
+        level_version, maze_data = self.game_service.get_versioned_maze_data()
+        return self.serializer.encode({
+            "success": True,
+            "message": "迷宫获取成功",
+            "data": {
+                "level": level_version,
+                "width": maze_data.width,
+                "height": maze_data.height,
+                "rows": maze_data.to_rows()
+            }
+        })
+
+    def _open_stream(self) -> bool:
+        """占用一个状态推送连接名额，已达上限时返回 False"""
+        with self._streams_lock:
+            if self.active_streams >= ServerConstants.MAX_STREAMS:
+                return False
+            self.active_streams += 1
+            return True
+
+    def _close_stream(self):
+        with self._streams_lock:
+            self.active_streams -= 1
+
+    def _register_limit_metrics(self):
+        """将限流与背压统计导出为指标"""
+        metrics.register_callback(
+            "maze_http_throttled_total", "HTTP被限流的请求数", "counter",
+            lambda: {(): self.rate_limiter.throttled_count})
+        metrics.register_callback(
+            "maze_service_shed_total", "游戏服务繁忙时被丢弃的请求数", "counter",
+            lambda: {(): self.request_gate.shed_count})
+        metrics.register_callback(
+            "maze_service_queue_depth", "等待游戏服务执行槽位的请求数", "gauge",
+            lambda: {(): self.request_gate.get_stats()["waiting"]})
+        metrics.register_callback(
+            "maze_http_active_streams", "当前保持中的状态推送（SSE）连接数", "gauge",
+            lambda: {(): self.active_streams})
+
+    def _format_sse_event(self, state_dict: dict) -> bytes:
+        """格式化SSE状态事件"""
+        return b"event: game_state\ndata: " + self.serializer.encode(state_dict) + b"\n\n"
+
+    @staticmethod
+    def _get_client_key() -> str:
+        """获取限流使用的客户端标识（优先使用 X-Client-Id 头）"""
+        return request.headers.get('X-Client-Id') or request.remote_addr or "unknown"
+
     def start(self):
         """在后台线程中启动 HTTP 服务器"""
 
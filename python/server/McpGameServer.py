@@ -1,198 +1,594 @@
-# python/server/mcp/McpGameServer.py
+# python/server/McpGameServer.py
 """
 精简版MCP服务器 - 只提供核心功能，使用fastmcp
 """
-from mcp.server.fastmcp import FastMCP
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from mcp.server.fastmcp import Context, FastMCP
+from pydantic import AnyUrl
 
 from python.app.GameEventBus import EventType, GameEventBus
+from python.constants import ServerConstants
 from python.core.game.MazeGameService import MazeGameService
-from python.core.models.GameModels import Direction
+from python.core.models.GameModels import Direction, parse_directions
+from python.core.models.MazeModels import MazeData
 from python.logger import logger
+from python.server.McpResponseFormatter import (OutputMode, format_error, format_move, format_new_level,
+                                                format_probe, format_reset, format_sequence, format_state)
+from python.server.RateLimiter import RateLimiter, RateLimitExceeded, RequestGate, ServiceOverloaded
+from python.utils.MetricsRegistry import metrics
+
+TOOL_DURATION = metrics.histogram(
+    "maze_mcp_tool_duration_seconds", "MCP工具调用耗时", ("tool",))
 
 
 class McpGameServer:
     """迷宫游戏MCP服务器"""
 
-    def __init__(self, game_service: MazeGameService):
+    # 支持的传输方式：stdio（本地进程，无网络开销）、sse（长连接推送）、streamable-http（按请求的HTTP）
+    TRANSPORTS = ("stdio", "sse", "streamable-http")
+
+    # MCP资源地址
+    LAYOUT_URI = "maze://layout"
+    LAYOUT_RLE_URI = "maze://layout/rle"
+    STATE_URI = "maze://state"
+
+    def __init__(self, game_service: MazeGameService,
+                 rate_limiter: Optional[RateLimiter] = None, request_gate: Optional[RequestGate] = None,
+                 output_mode: OutputMode = OutputMode.TEXT):
         self.game_service = game_service
         self.mcp = FastMCP("maze-game-mcp")
         self.event_bus = GameEventBus()
-
-        # 注册工具
+        self.output_mode = output_mode
+        self.rate_limiter = rate_limiter or RateLimiter(
+            ServerConstants.RATE_LIMIT_PER_SECOND, ServerConstants.RATE_LIMIT_BURST)
+        self.request_gate = request_gate or RequestGate(
+            ServerConstants.MAX_CONCURRENT_REQUESTS, ServerConstants.MAX_QUEUED_REQUESTS,
+            ServerConstants.QUEUE_TIMEOUT)
+        # 游戏服务调用在线程池中执行；线程池的排队数有上限，超出时直接丢弃
+        self.executor = ThreadPoolExecutor(max_workers=ServerConstants.MCP_WORKER_THREADS,
+                                           thread_name_prefix="mcp-service")
+        self._executor_slots = threading.BoundedSemaphore(
+            ServerConstants.MCP_WORKER_THREADS + self.request_gate.max_queue)
+
+        # 资源缓存：URI -> (关卡版本号或状态版本号, 内容)
+        self._resource_cache: Dict[str, Tuple[int, str]] = {}
+        # 资源订阅：URI -> 订阅该资源的会话；通知在会话所在的事件循环上发送
+        self._subscriptions: Dict[str, Set[Any]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._notify_scheduled = False
+        # 上次通知时的关卡版本号；在第一次订阅时才记录（第一个关卡可能还在后台生成）
+        self._notified_level_version: Optional[int] = None
+
+        # 注册工具和资源
         self._register_tools()
+        self._register_resources()
+        self.event_bus.subscribe(EventType.GAME_STATE_UPDATED, self._on_state_updated)
+
+        metrics.register_callback(
+            "maze_mcp_throttled_total", "MCP被限流的工具调用数", "counter",
+            lambda: {(): self.rate_limiter.throttled_count})
+
+    @staticmethod
+    def _get_session_key(ctx: Context):
+        """获取限流使用的会话标识"""
+        return ctx.client_id or id(ctx.session)
+
+    @classmethod
+    def _get_session_id(cls, ctx: Context) -> str:
+        """获取事件携带的会话标识（可序列化，供会话订阅、事件日志和事件桥使用）"""
+        return str(cls._get_session_key(ctx))
+
+    async def _call_service(self, ctx: Context, func: Callable, *args,
+                            notify: Optional[Callable[[Any], None]] = None,
+                            timeout: float = ServerConstants.MCP_CALL_TIMEOUT):
+        """
+        限流检查后，在线程池中调用游戏服务，不阻塞事件循环
+
+        Args:
+            ctx: MCP调用上下文
+            func: 游戏服务方法
+            *args: 调用参数
+            notify: 调用成功后在同一工作线程中执行的回调（用于发送事件），不占用执行槽位
+            timeout: 等待结果的超时秒数，超时抛出 asyncio.TimeoutError
+
+        Note:
+            超时后工作线程中的调用不会被中断，可能仍会完成
+        """
+        self.rate_limiter.check(self._get_session_key(ctx))
+        return await self._submit(func, args, notify, timeout)
+
+    async def _submit(self, func: Callable, args: tuple, notify: Optional[Callable[[Any], None]] = None,
+                      timeout: float = ServerConstants.MCP_CALL_TIMEOUT):
+        """提交到线程池执行并等待结果，排队已满时抛出 ServiceOverloaded"""
+        if not self._executor_slots.acquire(blocking=False):
+            raise ServiceOverloaded(self.request_gate.queue_timeout)
+
+        try:
+            future = self.executor.submit(self._run_in_slot, func, args, notify)
+        except BaseException:
+            self._executor_slots.release()
+            raise
+        future.add_done_callback(lambda _: self._executor_slots.release())
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+    def _run_in_slot(self, func: Callable, args: tuple, notify: Optional[Callable[[Any], None]]):
+        """在工作线程中占用执行槽位调用游戏服务（与HTTP接口共享槽位和排队上限）"""
+        with self.request_gate.slot():
+            result = func(*args)
+        if notify is not None:
+            notify(result)
+        return result
+
+    @staticmethod
+    def _throttled_message(error: Exception, mode: OutputMode) -> str:
+        """限流/过载时返回给客户端的提示"""
+        if isinstance(error, RateLimitExceeded):
+            return format_error(mode, "rate_limited",
+                                f"⏳ 请求过于频繁，请在 {error.retry_after_seconds} 秒后重试",
+                                error.retry_after_seconds)
+        return format_error(mode, "overloaded",
+                            f"⏳ 服务繁忙，请在 {error.retry_after_seconds} 秒后重试",
+                            error.retry_after_seconds)
+
+    @staticmethod
+    def _timeout_message(mode: OutputMode, timeout: float) -> str:
+        """游戏服务响应超时时返回给客户端的提示"""
+        return format_error(mode, "timeout",
+                            f"⌛ 游戏服务在 {timeout:g} 秒内未响应，操作可能仍会完成，请稍后查询游戏状态")
+
+    def _resolve_mode(self, output: str) -> OutputMode:
+        """解析单次调用的输出模式，无法识别时回退到服务器默认值"""
+        try:
+            return OutputMode.parse(output, self.output_mode)
+        except ValueError:
+            return self.output_mode
+
+    def _run_sequence(self, directions, stop_on_failure: bool):
+        """执行连续移动，并探测停止位置的相邻格子"""
+        sequence = self.game_service.move_sequence(directions, stop_on_failure)
+        position, open_directions = self.game_service.probe()
+        # 两次调用之间其他客户端可能移动了玩家，此时探测结果不属于停止位置
+        if position != sequence.game_state.player_position:
+            open_directions = None
+        return sequence, open_directions
+
+    def _build_layout(self, uri: str, encode: Callable[[MazeData], str]) -> str:
+        """生成迷宫布局资源（按关卡版本缓存）"""
+        level_version, maze_data = self.game_service.get_versioned_maze_data()
+        cached = self._resource_cache.get(uri)
+        if cached is not None and cached[0] == level_version:
+            return cached[1]
+        body = encode(maze_data)
+        self._resource_cache[uri] = (level_version, body)
+        return body
+
+    def _build_state(self) -> str:
+        """生成游戏状态资源（按状态版本缓存）"""
+        game_state = self.game_service.get_current_state()
+        cached = self._resource_cache.get(self.STATE_URI)
+        if cached is not None and cached[0] == game_state.version:
+            return cached[1]
+        body = format_state(game_state, OutputMode.JSON)
+        self._resource_cache[self.STATE_URI] = (game_state.version, body)
+        return body
+
+    async def _read_resource(self, uri: str, build: Callable[[], str]) -> str:
+        """读取资源；版本未变化时直接返回缓存，不占用线程池"""
+        version = self.game_service.state_version if uri == self.STATE_URI else self.game_service.level_version
+        cached = self._resource_cache.get(uri)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        return await self._submit(build, ())
+
+    def _on_state_updated(self, event):
+        """游戏状态更新时（任意线程）安排向订阅者发送资源更新通知，未发送前的多次更新只通知一次"""
+        loop = self._loop
+        if loop is None or self._notify_scheduled or not any(self._subscriptions.values()):
+            return
+        self._notify_scheduled = True
+        try:
+            asyncio.run_coroutine_threadsafe(self._notify_subscribers(), loop)
+        except RuntimeError:
+            # 事件循环已关闭
+            self._notify_scheduled = False
+
+    async def _notify_subscribers(self):
+        """发送 notifications/resources/updated，布局只在关卡变化时通知"""
+        self._notify_scheduled = False
+        uris = [self.STATE_URI]
+        level_version = self.game_service.level_version
+        if self._notified_level_version is None:
+            self._notified_level_version = level_version
+        elif level_version != self._notified_level_version:
+            self._notified_level_version = level_version
+            uris.extend((self.LAYOUT_URI, self.LAYOUT_RLE_URI))
+
+        for uri in uris:
+            sessions = self._subscriptions.get(uri)
+            for session in tuple(sessions or ()):
+                try:
+                    await session.send_resource_updated(AnyUrl(uri))
+                except Exception:
+                    # 会话已断开
+                    sessions.discard(session)
+
+    def get_limit_stats(self) -> dict:
+        """获取限流与背压统计"""
+        return {
+            "rate_limit": self.rate_limiter.get_stats(),
+            "backpressure": self.request_gate.get_stats()
+        }
+
+    def _tool(self):
+        """注册MCP工具，并记录每次调用的耗时"""
+        register = self.mcp.tool()
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def timed_tool(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    TOOL_DURATION.observe(time.perf_counter() - start, func.__name__)
+
+            return register(timed_tool)
+
+        return decorator
 
     def _register_tools(self):
         """注册MCP工具"""
 
-        @self.mcp.tool()
-        async def get_game_state() -> str:
-            """获取当前游戏状态信息"""
-            try:
-                game_state = self.game_service.get_current_state()
-                player_pos = game_state.player_position
-                exit_pos = game_state.exit_position
-
-                status = "已完成" if game_state.is_completed else "进行中"
-
-                return f"""当前游戏状态：
-• 迷宫尺寸：{game_state.maze_size.width} × {game_state.maze_size.height}
-• 玩家位置：列{player_pos.col}, 行{player_pos.row}
-• 出口位置：列{exit_pos.col}, 行{exit_pos.row}
-• 移动次数：{game_state.move_count}
-• 游戏状态：{status}
+        @self._tool()
+        async def get_game_state(ctx: Context, output: str = "") -> str:
+            """获取当前游戏状态信息
 
-{"🎯 恭喜！玩家已到达出口！" if game_state.is_completed else "🏃 请继续探索迷宫..."}
-"""
+            Args:
+                output: 输出格式，可选值：text(中文说明), json(紧凑JSON), terse(极简文本)；留空使用服务器默认值
+            """
+            mode = self._resolve_mode(output)
+            try:
+                game_state = await self._call_service(ctx, self.game_service.get_current_state)
+                return format_state(game_state, mode)
+            except (RateLimitExceeded, ServiceOverloaded) as e:
+                return self._throttled_message(e, mode)
+            except asyncio.TimeoutError:
+                return self._timeout_message(mode, ServerConstants.MCP_CALL_TIMEOUT)
             except Exception as e:
-                return f"获取游戏状态失败: {str(e)}"
+                return format_error(mode, "internal_error", f"获取游戏状态失败: {str(e)}")
 
-        @self.mcp.tool()
-        async def move_player(direction: str) -> str:
+        @self._tool()
+        async def move_player(direction: str, ctx: Context, output: str = "") -> str:
             """移动玩家到指定方向
 
             Args:
                 direction: 移动方向，可选值：up(上), down(下), left(左), right(右), wait(等待)
+                output: 输出格式，可选值：text(中文说明), json(紧凑JSON), terse(极简文本)；留空使用服务器默认值
             """
+            mode = self._resolve_mode(output)
             try:
                 direction_enum = Direction(direction.lower())
-                move_response = self.game_service.move_player(direction_enum)
+            except ValueError:
+                return format_error(mode, "invalid_direction",
+                                    f"无效的方向：{direction}。请使用：up, down, left, right, wait")
+
+            session_id = self._get_session_id(ctx)
 
-                logger.info(f"MCP移动执行结果：{move_response}")
+            def notify(move_response):
+                logger.debug("MCP移动执行结果：%s", move_response)
 
-                # 通过事件总线通知所有监听者
+                # 通过事件总线通知所有监听者（负载只在有订阅者读取时构建）
                 self.event_bus.emit(
                     EventType.PLAYER_MOVED,
-                    {
+                    lambda: {
                         "direction": direction_enum.value,
                         "result": move_response.to_dict(),
-                        "game_state": self.game_service.get_current_state().to_dict()
-                    }
+                        "game_state": move_response.game_state.to_dict()
+                    },
+                    session_id=session_id
                 )
 
                 # 如果游戏状态改变，发送更新事件
                 self.event_bus.emit(
                     EventType.GAME_STATE_UPDATED,
-                    {
-                        "game_state": self.game_service.get_current_state().to_dict()
-                    }
+                    lambda: {
+                        "game_state": move_response.game_state.to_dict()
+                    },
+                    session_id=session_id
                 )
 
-                if move_response.success:
-                    if move_response.result.value == "already_at_exit":
-                        return "玩家已在出口位置，无需移动。"
-                    elif move_response.result.value == "success":
-                        new_pos = move_response.game_state.player_position
-
-                        if move_response.game_state.is_completed:
-                            return f"""✅ 移动成功！玩家已到达出口！
-• 新位置：列{new_pos.col}, 行{new_pos.row}
-• 总移动次数：{move_response.game_state.move_count}
-• 🎉 恭喜完成迷宫！"""
-                        else:
-                            return f"""✅ 移动成功！
-• 新位置：列{new_pos.col}, 行{new_pos.row}
-• 总移动次数：{move_response.game_state.move_count}
-• 状态：游戏中..."""
-                    else:
-                        return f"移动结果：{move_response.result.value}"
-                else:
-                    if move_response.result.value == "wall":
-                        return "❌ 移动失败：撞到墙了！"
-                    elif move_response.result.value == "out_of_bounds":
-                        return "❌ 移动失败：超出迷宫边界！"
-                    else:
-                        return f"移动失败：{move_response.message}"
+            try:
+                move_response = await self._call_service(
+                    ctx, self.game_service.move_player, direction_enum, notify=notify)
+                return format_move(move_response, mode)
+            except (RateLimitExceeded, ServiceOverloaded) as e:
+                return self._throttled_message(e, mode)
+            except asyncio.TimeoutError:
+                return self._timeout_message(mode, ServerConstants.MCP_CALL_TIMEOUT)
+            except Exception as e:
+                return format_error(mode, "internal_error", f"移动失败: {str(e)}")
+
+        @self._tool()
+        async def move_sequence(directions: str, ctx: Context, stop_on_failure: bool = True,
+                                output: str = "") -> str:
+            """一次调用连续执行多步移动，返回停止位置、停止原因及该位置的可通行方向
 
+            Args:
+                directions: 移动序列，单字符缩写串如 "uurrd"（u上 d下 l左 r右 w等待），
+                            或逗号/空格分隔的方向名如 "up,up,right"
+                stop_on_failure: 撞墙/越界时是否立即停止（默认是）
+                output: 输出格式，可选值：text(中文说明), json(紧凑JSON), terse(极简文本)；留空使用服务器默认值
+            """
+            mode = self._resolve_mode(output)
+            try:
+                direction_list = parse_directions(directions)
             except ValueError:
-                return f"无效的方向：{direction}。请使用：up, down, left, right, wait"
+                return format_error(mode, "invalid_direction",
+                                    f"无效的移动序列：{directions}。请使用 u/d/l/r/w 组成的字符串，"
+                                    f"或逗号分隔的 up, down, left, right, wait")
+            if not direction_list or len(direction_list) > ServerConstants.MAX_BATCH_MOVES:
+                return format_error(mode, "invalid_length",
+                                    f"移动数量必须在 1 到 {ServerConstants.MAX_BATCH_MOVES} 之间")
+
+            session_id = self._get_session_id(ctx)
+
+            def notify(result):
+                sequence, _ = result
+                # 每一步都发送移动事件，保证事件流与逐步移动一致
+                for direction, move_response in zip(direction_list, sequence.responses):
+                    self.event_bus.emit(
+                        EventType.PLAYER_MOVED,
+                        lambda direction=direction, move_response=move_response: {
+                            "direction": direction.value,
+                            "result": move_response.to_dict(),
+                            "game_state": move_response.game_state.to_dict()
+                        },
+                        session_id=session_id
+                    )
+
+                self.event_bus.emit(
+                    EventType.GAME_STATE_UPDATED,
+                    lambda: {
+                        "game_state": sequence.game_state.to_dict()
+                    },
+                    session_id=session_id
+                )
+
+            try:
+                sequence, open_directions = await self._call_service(
+                    ctx, self._run_sequence, direction_list, stop_on_failure, notify=notify)
+                return format_sequence(sequence, open_directions, mode)
+            except (RateLimitExceeded, ServiceOverloaded) as e:
+                return self._throttled_message(e, mode)
+            except asyncio.TimeoutError:
+                return self._timeout_message(mode, ServerConstants.MCP_CALL_TIMEOUT)
             except Exception as e:
-                return f"移动失败: {str(e)}"
+                return format_error(mode, "internal_error", f"连续移动失败: {str(e)}")
+
+        @self._tool()
+        async def probe(ctx: Context, output: str = "") -> str:
+            """查看玩家上下左右四个相邻格子是否可通行（不移动玩家，不计移动次数）
 
-        @self.mcp.tool()
-        async def reset_level() -> str:
-            """重置当前关卡，将玩家放回起点"""
+            Args:
+                output: 输出格式，可选值：text(中文说明), json(紧凑JSON), terse(极简文本)；留空使用服务器默认值
+            """
+            mode = self._resolve_mode(output)
             try:
-                game_state = self.game_service.reset_current_level()
-                player_pos = game_state.player_position
+                position, open_directions = await self._call_service(ctx, self.game_service.probe)
+                return format_probe(position, open_directions, mode)
+            except (RateLimitExceeded, ServiceOverloaded) as e:
+                return self._throttled_message(e, mode)
+            except asyncio.TimeoutError:
+                return self._timeout_message(mode, ServerConstants.MCP_CALL_TIMEOUT)
+            except Exception as e:
+                return format_error(mode, "internal_error", f"探测失败: {str(e)}")
 
-                # 通过事件总线通知
+        @self._tool()
+        async def reset_level(ctx: Context, output: str = "") -> str:
+            """重置当前关卡，将玩家放回起点
+
+            Args:
+                output: 输出格式，可选值：text(中文说明), json(紧凑JSON), terse(极简文本)；留空使用服务器默认值
+            """
+            mode = self._resolve_mode(output)
+
+            session_id = self._get_session_id(ctx)
+
+            def notify(game_state):
+                # 通过事件总线通知（负载只在有订阅者读取时构建）
                 self.event_bus.emit(
                     EventType.LEVEL_RESET,
-                    {
+                    lambda: {
                         "game_state": game_state.to_dict()
-                    }
+                    },
+                    session_id=session_id
                 )
 
                 self.event_bus.emit(
                     EventType.GAME_STATE_UPDATED,
-                    {
+                    lambda: {
                         "game_state": game_state.to_dict()
-                    }
+                    },
+                    session_id=session_id
                 )
 
-                return f"""✅ 迷宫已重置！
-• 玩家已回到起点：列{player_pos.col}, 行{player_pos.row}
-• 移动次数已清零：0
-• 游戏状态：进行中
-
-可以重新开始探索迷宫了！"""
+            try:
+                game_state = await self._call_service(
+                    ctx, self.game_service.reset_current_level, notify=notify, timeout=ServerConstants.MCP_CALL_TIMEOUT)
+                return format_reset(game_state, mode)
+            except (RateLimitExceeded, ServiceOverloaded) as e:
+                return self._throttled_message(e, mode)
+            except asyncio.TimeoutError:
+                return self._timeout_message(mode, ServerConstants.MCP_CALL_TIMEOUT)
             except Exception as e:
-                return f"重置失败: {str(e)}"
+                return format_error(mode, "internal_error", f"重置失败: {str(e)}")
 
-        @self.mcp.tool()
-        async def new_level() -> str:
-            """生成全新迷宫关卡"""
-            try:
-                game_state = self.game_service.generate_new_level()
-                player_pos = game_state.player_position
-                exit_pos = game_state.exit_position
+        @self._tool()
+        async def new_level(ctx: Context, output: str = "") -> str:
+            """生成全新迷宫关卡
+
+            Args:
+                output: 输出格式，可选值：text(中文说明), json(紧凑JSON), terse(极简文本)；留空使用服务器默认值
+            """
+            mode = self._resolve_mode(output)
+
+            session_id = self._get_session_id(ctx)
 
-                # 通过事件总线通知
+            def notify(level):
+                _, maze_data, game_state = level
+
+                # 通过事件总线通知（负载只在有订阅者读取时构建，附带游程编码的迷宫布局供事件日志回放）
                 self.event_bus.emit(
                     EventType.NEW_LEVEL_GENERATED,
-                    {
-                        "game_state": game_state.to_dict()
-                    }
+                    lambda: {
+                        "game_state": game_state.to_dict(),
+                        "maze": maze_data.to_rle()
+                    },
+                    session_id=session_id
                 )
 
                 self.event_bus.emit(
                     EventType.GAME_STATE_UPDATED,
-                    {
+                    lambda: {
                         "game_state": game_state.to_dict()
-                    }
+                    },
+                    session_id=session_id
                 )
 
-                return f"""✨ 新迷宫已生成！
-• 玩家起点：列{player_pos.col}, 行{player_pos.row}
-• 出口位置：列{exit_pos.col}, 行{exit_pos.row}
-• 移动次数：0
-• 游戏状态：进行中
-
-祝你好运！"""
+            try:
+                _, _, game_state = await self._call_service(
+                    ctx, self.game_service.generate_new_level, notify=notify, timeout=ServerConstants.MCP_NEW_LEVEL_TIMEOUT)
+                return format_new_level(game_state, mode)
+            except (RateLimitExceeded, ServiceOverloaded) as e:
+                return self._throttled_message(e, mode)
+            except asyncio.TimeoutError:
+                return self._timeout_message(mode, ServerConstants.MCP_NEW_LEVEL_TIMEOUT)
             except Exception as e:
-                return f"生成新迷宫失败: {str(e)}"
+                return format_error(mode, "internal_error", f"生成新迷宫失败: {str(e)}")
 
         # 添加一个帮助工具
-        @self.mcp.tool()
+        @self._tool()
         async def help() -> str:
             """显示所有可用工具和说明"""
             return """可用工具：
 1. get_game_state - 获取当前游戏状态信息
 2. move_player(direction) - 移动玩家到指定方向
    参数: direction - 可选值：up(上), down(下), left(左), right(右), wait(等待)
-3. reset_level - 重置当前关卡，将玩家放回起点
-4. new_level - 生成全新迷宫关卡
+3. move_sequence(directions) - 一次调用连续执行多步移动
+   参数: directions - 单字符缩写串如 "uurrd"（u上 d下 l左 r右 w等待），或 "up,up,right"
+   参数: stop_on_failure - 撞墙/越界时是否停止（默认是）
+   返回停止位置、停止原因以及该位置的可通行方向
+4. probe - 查看四个相邻格子是否可通行（不移动玩家）
+5. reset_level - 重置当前关卡，将玩家放回起点
+6. new_level - 生成全新迷宫关卡
+
+所有工具都支持可选参数 output 选择输出格式：
+- text: 中文说明（默认）
+- json: 紧凑JSON，结构与HTTP接口一致
+- terse: 极简文本，例如 "ok 12,3 m=57"（结果 列,行 移动次数），
+  连续移动为 "wall 3/8 4,31 m=12 o=ud"（结果 已执行/请求步数 列,行 移动次数 可通行方向）
 
 使用示例：
 - 获取状态: get_game_state()
 - 向上移动: move_player("up")
+- 向上移动（JSON输出）: move_player("up", output="json")
+- 连续移动: move_sequence("rrddl")
+- 探测周围: probe()
 - 重置关卡: reset_level()
 - 新关卡: new_level()
+
+可读取的资源（订阅后在变化时收到 resources/updated 通知）：
+- maze://layout - 迷宫布局文本网格（'#'墙 '.'路）
+- maze://layout/rle - 游程编码的迷宫布局
+- maze://state - 当前游戏状态JSON
 """
 
-    def run(self, host: str = "127.0.0.1", port: int = 8081):
-        """运行MCP服务器"""
-        logger.info(f"启动MCP服务器在 {host}:{8000}")
+    def _register_resources(self):
+        """注册MCP资源及资源订阅"""
+
+        @self.mcp.resource(self.LAYOUT_URI, name="maze_layout", mime_type="text/plain",
+                           description="迷宫布局文本网格：每行一个字符串，'#'为墙，'.'为路径；"
+                                       "第一行为第0行，每行第一个字符为第0列")
+        async def maze_layout() -> str:
+            return await self._read_resource(
+                self.LAYOUT_URI, lambda: self._build_layout(self.LAYOUT_URI, MazeData.to_text))
+
+        @self.mcp.resource(self.LAYOUT_RLE_URI, name="maze_layout_rle", mime_type="text/plain",
+                           description="按行游程编码的迷宫布局，例如 \"3#2.#\" 表示 \"###..#\"（数量为1时省略），"
+                                       "比文本网格更省token")
+        async def maze_layout_rle() -> str:
+            return await self._read_resource(
+                self.LAYOUT_RLE_URI, lambda: self._build_layout(self.LAYOUT_RLE_URI, MazeData.to_rle))
+
+        @self.mcp.resource(self.STATE_URI, name="maze_state", mime_type="application/json",
+                           description="当前游戏状态（玩家位置、出口位置、移动次数等），结构与 get_game_state 的JSON输出一致")
+        async def maze_state() -> str:
+            return await self._read_resource(self.STATE_URI, self._build_state)
+
+        # FastMCP 没有公开资源订阅接口，通过底层 Server 注册 resources/subscribe 处理器
+        server = self.mcp._mcp_server
+
+        @server.subscribe_resource()
+        async def subscribe_resource(uri: AnyUrl) -> None:
+            self._loop = asyncio.get_running_loop()
+            if self._notified_level_version is None:
+                self._notified_level_version = self.game_service.level_version
+            self._subscriptions.setdefault(str(uri), set()).add(server.request_context.session)
+
+        @server.unsubscribe_resource()
+        async def unsubscribe_resource(uri: AnyUrl) -> None:
+            self._subscriptions.get(str(uri), set()).discard(server.request_context.session)
+
+        # 底层 Server 生成的能力声明总是 resources.subscribe=False，客户端据此不会发送订阅请求，
+        # 因此在声明中打开订阅能力（所有传输方式都通过 get_capabilities 生成初始化选项）
+        get_capabilities = server.get_capabilities
+
+        def get_capabilities_with_subscribe(*args, **kwargs):
+            capabilities = get_capabilities(*args, **kwargs)
+            if capabilities.resources is not None:
+                capabilities.resources = capabilities.resources.model_copy(update={"subscribe": True})
+            return capabilities
+
+        server.get_capabilities = get_capabilities_with_subscribe
+
+    def run(self, host: str = ServerConstants.DEFAULT_HOST, port: int = ServerConstants.DEFAULT_PORT + 1,
+            transport: str = "sse"):
+        """
+        运行MCP服务器（阻塞直到服务器退出）
+
+        Args:
+            host: 监听地址（stdio 传输时忽略）
+            port: 监听端口（stdio 传输时忽略）
+            transport: 传输方式，可选值：sse, streamable-http, stdio
+        """
+        if transport not in self.TRANSPORTS:
+            raise ValueError(f"不支持的MCP传输方式: {transport}，可选值: {', '.join(self.TRANSPORTS)}")
+
+        self.mcp.settings.host = host
+        self.mcp.settings.port = port
+        if transport == "stdio":
+            logger.info("启动MCP服务器 (stdio)")
+        else:
+            logger.info(f"启动MCP服务器 ({transport}) 在 {self.get_endpoint_url(transport)}")
 
         # 运行fastmcp服务器
-        self.mcp.run(transport="sse")
+        try:
+            self.mcp.run(transport=transport)
+        finally:
+            self.executor.shutdown(wait=False)
+
+    def get_endpoint_url(self, transport: str = "sse") -> str:
+        """获取MCP客户端连接地址（stdio 传输没有网络地址）"""
+        if transport == "stdio":
+            return "stdio"
+        if transport == "streamable-http":
+            path = getattr(self.mcp.settings, "streamable_http_path", "/mcp")
+        else:
+            path = getattr(self.mcp.settings, "sse_path", "/sse")
+        return f"http://{self.mcp.settings.host}:{self.mcp.settings.port}{path}"
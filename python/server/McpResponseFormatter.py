@@ -0,0 +1,221 @@
+# python/server/McpResponseFormatter.py
+"""
+MCP工具输出格式化 - 文本（面向人类）、紧凑JSON与极简文本三种模式
+"""
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from python.core.models.GameModels import GameState, MoveResponse, MoveResult, MoveSequenceResult, Position
+from python.server.StateSerializer import encode_json
+
+
+class OutputMode(Enum):
+    """MCP工具输出模式"""
+    TEXT = "text"  # 带表情的中文说明（默认，兼容旧客户端）
+    JSON = "json"  # 紧凑JSON，结构与 to_dict() 一致
+    TERSE = "terse"  # 极简文本，例如 "ok 12,3 m=57"
+
+    @staticmethod
+    def parse(value: Optional[str], default: 'OutputMode') -> 'OutputMode':
+        """解析输出模式，空值使用默认模式，无法识别时抛出 ValueError"""
+        if not value:
+            return default
+        return OutputMode(value.strip().lower())
+
+
+# 极简模式中的移动结果缩写
+TERSE_RESULTS = {
+    MoveResult.SUCCESS: "ok",
+    MoveResult.WALL: "wall",
+    MoveResult.OUT_OF_BOUNDS: "oob",
+    MoveResult.ALREADY_AT_EXIT: "exit",
+}
+
+
+def _dumps(data: Any) -> str:
+    return encode_json(data).decode("utf-8")
+
+
+def _terse_state(state: GameState) -> str:
+    pos = state.player_position
+    text = f"{pos.col},{pos.row} m={state.move_count}"
+    return text + " done" if state.is_completed else text
+
+
+def format_state(state: GameState, mode: OutputMode) -> str:
+    """格式化游戏状态"""
+    if mode == OutputMode.JSON:
+        return _dumps(state.to_dict())
+    if mode == OutputMode.TERSE:
+        exit_pos = state.exit_position
+        size = state.maze_size
+        return f"{_terse_state(state)} e={exit_pos.col},{exit_pos.row} s={size.width}x{size.height}"
+
+    player_pos = state.player_position
+    exit_pos = state.exit_position
+    status = "已完成" if state.is_completed else "进行中"
+    return f"""当前游戏状态：
+• 迷宫尺寸：{state.maze_size.width} × {state.maze_size.height}
+• 玩家位置：列{player_pos.col}, 行{player_pos.row}
+• 出口位置：列{exit_pos.col}, 行{exit_pos.row}
+• 移动次数：{state.move_count}
+• 游戏状态：{status}
+
+{"🎯 恭喜！玩家已到达出口！" if state.is_completed else "🏃 请继续探索迷宫..."}
+"""
+
+
+def format_move(move_response: MoveResponse, mode: OutputMode) -> str:
+    """格式化移动结果"""
+    if mode == OutputMode.JSON:
+        return _dumps(move_response.to_dict())
+    if mode == OutputMode.TERSE:
+        return f"{TERSE_RESULTS[move_response.result]} {_terse_state(move_response.game_state)}"
+
+    if move_response.success:
+        if move_response.result == MoveResult.ALREADY_AT_EXIT:
+            return "玩家已在出口位置，无需移动。"
+        elif move_response.result == MoveResult.SUCCESS:
+            new_pos = move_response.game_state.player_position
+
+            if move_response.game_state.is_completed:
+                return f"""✅ 移动成功！玩家已到达出口！
+• 新位置：列{new_pos.col}, 行{new_pos.row}
+• 总移动次数：{move_response.game_state.move_count}
+• 🎉 恭喜完成迷宫！"""
+            else:
+                return f"""✅ 移动成功！
+• 新位置：列{new_pos.col}, 行{new_pos.row}
+• 总移动次数：{move_response.game_state.move_count}
+• 状态：游戏中..."""
+        else:
+            return f"移动结果：{move_response.result.value}"
+    else:
+        if move_response.result == MoveResult.WALL:
+            return "❌ 移动失败：撞到墙了！"
+        elif move_response.result == MoveResult.OUT_OF_BOUNDS:
+            return "❌ 移动失败：超出迷宫边界！"
+        else:
+            return f"移动失败：{move_response.message}"
+
+
+# 方向的中文名
+DIRECTION_NAMES = {"up": "上", "down": "下", "left": "左", "right": "右"}
+
+
+def _terse_open(open_directions: Dict[str, bool]) -> str:
+    """极简模式的可通行方向，例如 "ur" 表示上、右可通行"""
+    return "".join(name[0] for name, is_open in open_directions.items() if is_open) or "-"
+
+
+def _text_open(open_directions: Dict[str, bool]) -> str:
+    names = [DIRECTION_NAMES[name] for name, is_open in open_directions.items() if is_open]
+    return "、".join(names) if names else "无"
+
+
+def format_probe(position: Position, open_directions: Dict[str, bool], mode: OutputMode) -> str:
+    """格式化相邻格子探测结果"""
+    if mode == OutputMode.JSON:
+        return _dumps({"player_position": position.to_dict(), "open": open_directions})
+    if mode == OutputMode.TERSE:
+        return f"{position.col},{position.row} o={_terse_open(open_directions)}"
+
+    return f"""🔍 玩家位置：列{position.col}, 行{position.row}
+• 可通行方向：{_text_open(open_directions)}"""
+
+
+def format_sequence(sequence: MoveSequenceResult, open_directions: Optional[Dict[str, bool]],
+                    mode: OutputMode) -> str:
+    """
+    格式化连续移动结果
+
+    Args:
+        sequence: 连续移动结果
+        open_directions: 停止位置的可通行方向（省去一次 probe 调用），未知时为 None
+        mode: 输出模式
+    """
+    if mode == OutputMode.JSON:
+        data = sequence.to_dict()
+        if open_directions is not None:
+            data["open"] = open_directions
+        return _dumps(data)
+
+    stop = sequence.stop_result
+    if mode == OutputMode.TERSE:
+        result = TERSE_RESULTS[stop] if stop else "ok"
+        text = f"{result} {sequence.executed}/{sequence.requested} {_terse_state(sequence.game_state)}"
+        return text + f" o={_terse_open(open_directions)}" if open_directions is not None else text
+
+    state = sequence.game_state
+    pos = state.player_position
+    if sequence.completed_all:
+        head = f"✅ 已执行全部 {sequence.requested} 步移动"
+    elif stop == MoveResult.WALL:
+        head = f"⛔ 第 {sequence.stop_index + 1} 步撞墙，已停止（共 {sequence.requested} 步）"
+    elif stop == MoveResult.OUT_OF_BOUNDS:
+        head = f"⛔ 第 {sequence.stop_index + 1} 步超出边界，已停止（共 {sequence.requested} 步）"
+    else:
+        head = f"🎯 已到达出口，剩余 {sequence.requested - sequence.stop_index} 步未执行"
+
+    text = f"""{head}
+• 当前位置：列{pos.col}, 行{pos.row}
+• 总移动次数：{state.move_count}"""
+    if open_directions is not None:
+        text += f"\n• 可通行方向：{_text_open(open_directions)}"
+    if state.is_completed:
+        text += "\n• 🎉 恭喜完成迷宫！"
+    return text
+
+
+def format_reset(state: GameState, mode: OutputMode) -> str:
+    """格式化重置关卡结果"""
+    if mode == OutputMode.JSON:
+        return _dumps(state.to_dict())
+    if mode == OutputMode.TERSE:
+        return f"reset {_terse_state(state)}"
+
+    player_pos = state.player_position
+    return f"""✅ 迷宫已重置！
+• 玩家已回到起点：列{player_pos.col}, 行{player_pos.row}
+• 移动次数已清零：0
+• 游戏状态：进行中
+
+可以重新开始探索迷宫了！"""
+
+
+def format_new_level(state: GameState, mode: OutputMode) -> str:
+    """格式化新关卡结果"""
+    if mode == OutputMode.JSON:
+        return _dumps(state.to_dict())
+    if mode == OutputMode.TERSE:
+        return f"new {format_state(state, mode)}"
+
+    player_pos = state.player_position
+    exit_pos = state.exit_position
+    return f"""✨ 新迷宫已生成！
+• 玩家起点：列{player_pos.col}, 行{player_pos.row}
+• 出口位置：列{exit_pos.col}, 行{exit_pos.row}
+• 移动次数：0
+• 游戏状态：进行中
+
+祝你好运！"""
+
+
+def format_error(mode: OutputMode, code: str, message: str, retry_after: Optional[int] = None) -> str:
+    """
+    格式化错误
+
+    Args:
+        mode: 输出模式
+        code: 机器可读的错误码，例如 invalid_direction、rate_limited
+        message: 文本模式下返回的说明
+        retry_after: 建议的重试等待秒数
+    """
+    if mode == OutputMode.JSON:
+        error: Dict[str, Any] = {"error": code}
+        if retry_after is not None:
+            error["retry_after"] = retry_after
+        return _dumps(error)
+    if mode == OutputMode.TERSE:
+        return f"err {code}" + (f" {retry_after}" if retry_after is not None else "")
+    return message
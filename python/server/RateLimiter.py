@@ -0,0 +1,201 @@
+# python/server/RateLimiter.py
+"""
+限流与背压 - 按客户端的令牌桶限流，以及游戏服务的有界请求队列
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from python.logger import logger
+
+
+class RateLimitExceeded(Exception):
+    """客户端请求超出速率限制"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit exceeded, retry after {retry_after:.2f}s")
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_seconds(self) -> int:
+        """Retry-After 头使用的整数秒"""
+        return max(1, math.ceil(self.retry_after))
+
+
+class ServiceOverloaded(Exception):
+    """游戏服务已饱和，请求被丢弃"""
+
+    def __init__(self, retry_after: float = 1.0):
+        super().__init__("Service overloaded, request shed")
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_seconds(self) -> int:
+        """Retry-After 头使用的整数秒"""
+        return max(1, math.ceil(self.retry_after))
+
+
+class TokenBucket:
+    """令牌桶（非线程安全，由 RateLimiter 加锁保护）"""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated_at')
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def try_consume(self, now: float, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        尝试消耗令牌
+
+        Returns:
+            (是否允许, 需等待的秒数)
+        """
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True, 0.0
+        return False, (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """按客户端（或会话）划分的令牌桶限流器"""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        """
+        Args:
+            rate: 每个客户端每秒补充的令牌数，<=0 表示不限流
+            burst: 令牌桶容量（允许的突发请求数）
+            max_clients: 最多跟踪的客户端数量，超出时淘汰最久未活动的客户端
+        """
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_clients = max_clients
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.allowed_count = 0
+        self.throttled_count = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def check(self, client_key: Hashable, cost: float = 1.0) -> None:
+        """检查客户端是否允许请求，超限时抛出 RateLimitExceeded"""
+        if not self.enabled:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client_key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_clients:
+                    self._evict_idle()
+                bucket = TokenBucket(self.rate, self.burst, now)
+                self._buckets[client_key] = bucket
+
+            allowed, retry_after = bucket.try_consume(now, cost)
+            if allowed:
+                self.allowed_count += 1
+                return
+            self.throttled_count += 1
+
+        logger.debug(f"客户端请求被限流: {client_key}")
+        raise RateLimitExceeded(retry_after)
+
+    def _evict_idle(self):
+        """淘汰最久未活动的一半客户端（调用方持有锁）"""
+        oldest = sorted(self._buckets.items(), key=lambda item: item[1].updated_at)
+        for key, _ in oldest[:max(1, len(oldest) // 2)]:
+            del self._buckets[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取限流统计"""
+        return {
+            "enabled": self.enabled,
+            "rate": self.rate,
+            "burst": self.burst,
+            "tracked_clients": len(self._buckets),
+            "allowed": self.allowed_count,
+            "throttled": self.throttled_count
+        }
+
+
+class RequestGate:
+    """
+    游戏服务的有界请求队列
+    最多 max_concurrent 个请求同时执行，最多 max_queue 个请求排队等待，
+    队列已满或等待超时的请求被直接丢弃（load shedding）。
+    """
+
+    def __init__(self, max_concurrent: int = 4, max_queue: int = 32, queue_timeout: float = 2.0):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiting = 0
+        self._condition = threading.Condition()
+        self.admitted_count = 0
+        self.shed_count = 0
+
+    def acquire(self, blocking: bool = True, timeout: Optional[float] = None) -> None:
+        """获取执行槽位，失败时抛出 ServiceOverloaded"""
+        timeout = self.queue_timeout if timeout is None else timeout
+
+        with self._condition:
+            if self._active < self.max_concurrent:
+                self._active += 1
+                self.admitted_count += 1
+                return
+
+            if not blocking or self._waiting >= self.max_queue:
+                self.shed_count += 1
+                raise ServiceOverloaded(self.queue_timeout)
+
+            self._waiting += 1
+            try:
+                deadline = time.monotonic() + timeout
+                while self._active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed_count += 1
+                        raise ServiceOverloaded(self.queue_timeout)
+                    self._condition.wait(remaining)
+                self._active += 1
+                self.admitted_count += 1
+            finally:
+                self._waiting -= 1
+
+    def release(self) -> None:
+        """释放执行槽位"""
+        with self._condition:
+            self._active -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def slot(self, blocking: bool = True, timeout: Optional[float] = None):
+        """以上下文管理器形式占用执行槽位"""
+        self.acquire(blocking, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取背压统计"""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "waiting": self._waiting,
+            "admitted": self.admitted_count,
+            "shed": self.shed_count
+        }
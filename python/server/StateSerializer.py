@@ -0,0 +1,97 @@
+# python/server/StateSerializer.py
+"""
+游戏状态序列化层 - 按状态版本缓存字典表示，并提供快速JSON编码
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from python.core.models.GameModels import GameState, MoveResponse, MoveSequenceResult
+
+try:
+    # 可选依赖：安装 orjson 后使用更快的编码器
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def encode_json(data: Any) -> bytes:
+    """将对象编码为JSON字节串（优先使用orjson）"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class StateSerializer:
+    """
+    状态序列化器
+    同一状态版本的字典表示只构建一次，在响应和所有事件负载之间共享。
+    返回的字典为只读共享对象，调用方不得修改。
+    """
+
+    def __init__(self, cache_size: int = 8):
+        self._cache_size = cache_size
+        self._state_cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        # 已编码的完整响应体，键由调用方决定（例如 ("state", 状态版本)）
+        self._encoded_cache: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def state_dict(self, state: GameState) -> Dict[str, Any]:
+        """获取状态的字典表示（按版本缓存）"""
+        with self._lock:
+            cached = self._state_cache.get(state.version)
+            if cached is not None:
+                self._state_cache.move_to_end(state.version)
+                return cached
+
+        data = state.to_dict()
+
+        with self._lock:
+            self._state_cache[state.version] = data
+            while len(self._state_cache) > self._cache_size:
+                self._state_cache.popitem(last=False)
+        return data
+
+    def move_dict(self, move_response: MoveResponse) -> Dict[str, Any]:
+        """获取移动响应的字典表示（复用缓存的状态字典）"""
+        return {
+            "success": move_response.success,
+            "result": move_response.result.value,
+            "scene_info": self.state_dict(move_response.game_state),
+            "message": move_response.message
+        }
+
+    def sequence_dict(self, sequence: MoveSequenceResult) -> Dict[str, Any]:
+        """获取连续移动结果的字典表示（复用缓存的状态字典）"""
+        return {
+            "requested": sequence.requested,
+            "executed": sequence.executed,
+            "stop_index": sequence.stop_index,
+            "stop_result": sequence.stop_result.value if sequence.stop_result else None,
+            "scene_info": self.state_dict(sequence.game_state)
+        }
+
+    def get_encoded(self, key: Hashable) -> Optional[bytes]:
+        """获取已缓存的编码结果"""
+        with self._lock:
+            return self._encoded_cache.get(key)
+
+    def put_encoded(self, key: Hashable, body: bytes):
+        """缓存编码结果"""
+        with self._lock:
+            self._encoded_cache[key] = body
+            self._encoded_cache.move_to_end(key)
+            while len(self._encoded_cache) > self._cache_size:
+                self._encoded_cache.popitem(last=False)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._state_cache.clear()
+            self._encoded_cache.clear()
+
+    @staticmethod
+    def encode(data: Any) -> bytes:
+        """编码为JSON字节串"""
+        return encode_json(data)
@@ -0,0 +1,87 @@
+# python/server/run_mcp_server.py
+"""
+独立运行MCP服务器（不启动游戏窗口和HTTP服务器）
+
+每个进程拥有独立的游戏服务，可在同一台机器上以不同端口（或stdio）运行多个实例。
+"""
+import os
+import sys
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from python.logger import LoggerFactory, logger
+
+
+def parse_arguments():
+    """解析命令行参数"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='迷宫AI游戏 - 独立MCP服务器')
+    parser.add_argument('--transport', choices=['stdio', 'sse', 'streamable-http'], default='stdio',
+                        help='MCP传输方式 (默认: stdio)')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='监听地址，stdio传输时忽略 (默认: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8081,
+                        help='监听端口，stdio传输时忽略 (默认: 8081)')
+    parser.add_argument('--maze-width', type=int, default=55,
+                        help='迷宫宽度 (默认: 55)')
+    parser.add_argument('--maze-height', type=int, default=35,
+                        help='迷宫高度 (默认: 35)')
+    parser.add_argument('--event-log', default=None,
+                        help='事件日志文件路径，启用后游戏事件写入该文件')
+    parser.add_argument('--event-bridge', default=None,
+                        help='跨进程事件桥地址（Unix域套接字路径或 tcp://host:port）')
+    parser.add_argument('--mcp-output', choices=['text', 'json', 'terse'], default='text',
+                        help='MCP工具默认输出格式 (默认: text)')
+
+    return parser.parse_args()
+
+
+def main() -> int:
+    """主函数"""
+    args = parse_arguments()
+
+    # stdio 传输使用标准输出传递协议消息，日志必须改到标准错误
+    if args.transport == "stdio":
+        LoggerFactory.use_stderr()
+
+    from python.app.EventBridge import EventBridge
+    from python.app.EventLogSink import EventLogSink
+    from python.app.GameEventBus import GameEventBus
+    from python.core.game.MazeGameService import MazeGameService
+    from python.server.McpGameServer import McpGameServer
+    from python.server.McpResponseFormatter import OutputMode
+
+    # 独立服务器中没有读取事件历史的组件，关闭历史记录，无订阅者的事件几乎没有开销
+    GameEventBus().set_history_size(0)
+
+    event_log = None
+    event_bridge = None
+    try:
+        game_service = MazeGameService(args.maze_width, args.maze_height)
+        if args.event_log:
+            event_log = EventLogSink(args.event_log, snapshot_provider=game_service.snapshot)
+            GameEventBus().add_sink(event_log)
+        if args.event_bridge:
+            event_bridge = EventBridge(args.event_bridge).start()
+        server = McpGameServer(game_service, output_mode=OutputMode(args.mcp_output))
+        server.run(host=args.host, port=args.port, transport=args.transport)
+        return 0
+    except KeyboardInterrupt:
+        return 0
+    except Exception as e:
+        logger.error(f"MCP服务器运行错误: {e}")
+        return 1
+    finally:
+        if event_bridge is not None:
+            event_bridge.close()
+        if event_log is not None:
+            event_log.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
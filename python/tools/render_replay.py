@@ -0,0 +1,209 @@
+# python/tools/render_replay.py
+"""
+回放渲染 - 无窗口地把回放渲染为PNG图片序列或GIF动画
+
+输入可以是 EventLogSink 写入的事件日志（每条可回放的记录一帧），
+也可以是 .json 回放文件：游戏快照（MazeGameService.snapshot() 的结果）加上移动序列，
+例如 {"maze": "...", "game_state": {...}, "moves": "uurrdd"}（每步一帧）。
+多个输入由进程池并行渲染；每帧在上一帧的基础上只重绘玩家和出口。GIF 需要 Pillow（pip install Pillow）。
+
+用法:
+    python python/tools/render_replay.py logs/events.jsonl --output renders
+    python python/tools/render_replay.py runs/*.json --format gif --jobs 8 --frame-ms 60
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# 使用 SDL 的 dummy 视频驱动，不需要显示器
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from python.app.EventLogSink import log_files, read_records
+from python.constants import GameConstants
+from python.core.game.MazeGameService import MazeGameService
+from python.core.models.GameModels import parse_directions
+from python.logger import logger
+from python.tools.replay_event_log import EventLogReplayer
+from python.ui.HeadlessMazeRenderer import HeadlessMazeRenderer
+from python.ui.MazeRenderer import MazeRenderer
+
+try:
+    # 可选依赖：安装 Pillow 后支持输出GIF
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def replay_states(source: str) -> Iterator[MazeGameService]:
+    """
+    逐步回放输入文件，每一步之后产出游戏服务（同一个对象，状态已更新）
+
+    Args:
+        source: 事件日志路径，或扩展名为 .json 的回放文件
+    """
+    if source.endswith(".json"):
+        with open(source, "r", encoding="utf-8") as f:
+            replay = json.load(f)
+        game_service = MazeGameService(5, 5)
+        game_service.restore(replay)
+        yield game_service
+        for direction in parse_directions(replay.get("moves", "")):
+            game_service.move_player(direction)
+            yield game_service
+    else:
+        replayer = EventLogReplayer()
+        for record in read_records(source):
+            applied = replayer.applied
+            replayer.apply(record)
+            if replayer.applied > applied:
+                yield replayer.game_service
+
+
+def _gif_palette() -> 'Image.Image':
+    """迷宫颜色组成的调色板图像，用于把每帧转换为GIF的调色板模式"""
+    colors = list(MazeRenderer().colors.values())
+    palette = [channel for color in colors for channel in color]
+    palette += palette[:3] * (256 - len(colors))
+    image = Image.new("P", (1, 1))
+    image.putpalette(palette)
+    return image
+
+
+class GifWriter:
+    """把帧收集为GIF；迷宫尺寸变化（换关卡）时另起一个文件"""
+
+    def __init__(self, base_path: str, frame_ms: int):
+        self.base_path = base_path
+        self.frame_ms = frame_ms
+        self.palette = _gif_palette()
+        self.frames: List['Image.Image'] = []
+        self.paths: List[str] = []
+
+    def add(self, renderer: HeadlessMazeRenderer):
+        size = renderer.canvas.get_size()
+        if self.frames and self.frames[0].size != size:
+            self.flush()
+        frame = Image.frombytes("RGB", size, renderer.to_bytes())
+        self.frames.append(frame.quantize(palette=self.palette, dither=0))
+
+    def flush(self):
+        if not self.frames:
+            return
+        root, ext = os.path.splitext(self.base_path)
+        path = self.base_path if not self.paths else f"{root}_{len(self.paths) + 1}{ext}"
+        self.frames[0].save(path, save_all=True, append_images=self.frames[1:],
+                            duration=self.frame_ms, loop=0)
+        self.paths.append(path)
+        self.frames = []
+
+
+def _init_worker():
+    """渲染进程初始化：屏蔽游戏服务日志（包括回放中的撞墙警告），初始化 dummy 视频驱动"""
+    logger.setLevel("ERROR")
+    pygame.display.init()
+
+
+def render_source(source: str, output_dir: str, image_format: str, cell_size: int,
+                  frame_ms: int, every: int) -> Dict[str, Any]:
+    """
+    渲染一个输入文件
+
+    Returns:
+        结果摘要（输入、帧数、输出路径、耗时）
+    """
+    start = time.perf_counter()
+    name = os.path.splitext(os.path.basename(source))[0]
+    renderer = HeadlessMazeRenderer(cell_size)
+    frames = 0
+
+    if image_format == "gif":
+        writer: Optional[GifWriter] = GifWriter(os.path.join(output_dir, f"{name}.gif"), frame_ms)
+        outputs = writer.paths
+    else:
+        writer = None
+        frame_dir = os.path.join(output_dir, name)
+        os.makedirs(frame_dir, exist_ok=True)
+        outputs = [frame_dir]
+
+    for step, game_service in enumerate(replay_states(source)):
+        # 跳过的步骤也要渲染，保证画布与游戏状态同步
+        renderer.render(game_service)
+        if step % every:
+            continue
+        if writer is not None:
+            writer.add(renderer)
+        else:
+            renderer.save(os.path.join(frame_dir, f"frame_{frames:05d}.png"))
+        frames += 1
+
+    if writer is not None:
+        writer.flush()
+    return {"source": source, "frames": frames, "outputs": outputs,
+            "seconds": time.perf_counter() - start}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='把回放无窗口地渲染为PNG序列或GIF动画')
+    parser.add_argument('sources', nargs='+',
+                        help='事件日志文件，或 .json 回放文件（游戏快照加 "moves" 移动序列）')
+    parser.add_argument('--output', default='renders', help='输出目录 (默认: renders)')
+    parser.add_argument('--format', choices=['png', 'gif'], default='png',
+                        help='png：每个输入一个图片序列目录；gif：每个输入一个GIF动画 (默认: png)')
+    parser.add_argument('--cell-size', type=int, default=GameConstants.CELL_SIZE,
+                        help=f'单元格像素尺寸 (默认: {GameConstants.CELL_SIZE})')
+    parser.add_argument('--frame-ms', type=int, default=80, help='GIF每帧显示时长（毫秒，默认: 80）')
+    parser.add_argument('--every', type=int, default=1, help='每 N 步输出一帧 (默认: 1)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='并行渲染的进程数 (默认: CPU核数)')
+    args = parser.parse_args()
+
+    if args.format == "gif" and Image is None:
+        print("输出GIF需要安装 Pillow：pip install Pillow", file=sys.stderr)
+        return 1
+
+    missing = [source for source in args.sources if not os.path.exists(source) and not log_files(source)]
+    if missing:
+        print(f"找不到输入文件: {', '.join(missing)}", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+    options = (args.output, args.format, args.cell_size, args.frame_ms, max(1, args.every))
+    start = time.perf_counter()
+
+    jobs = max(1, min(args.jobs, len(args.sources)))
+    if jobs == 1:
+        _init_worker()
+        results = [render_source(source, *options) for source in args.sources]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as executor:
+            futures = [executor.submit(render_source, source, *options) for source in args.sources]
+            results = []
+            for source, future in zip(args.sources, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"渲染失败: {source}: {e}", file=sys.stderr)
+
+    for result in results:
+        print(f"{result['source']}: {result['frames']} 帧 -> {', '.join(result['outputs'])} "
+              f"({result['seconds']:.2f}s)")
+    print(f"共 {len(results)}/{len(args.sources)} 个回放，{sum(r['frames'] for r in results)} 帧，"
+          f"耗时 {time.perf_counter() - start:.2f}s（{jobs} 个进程）")
+    return 0 if len(results) == len(args.sources) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
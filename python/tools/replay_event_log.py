@@ -0,0 +1,152 @@
+# python/tools/replay_event_log.py
+"""
+事件日志回放 - 根据 EventLogSink 写入的日志重建任意时刻的游戏状态
+
+用法:
+    python python/tools/replay_event_log.py logs/events.jsonl
+    python python/tools/replay_event_log.py logs/events.jsonl --until 120 --show-maze
+    python python/tools/replay_event_log.py logs/events.jsonl --until-time 1760000000.5 --verbose
+"""
+import argparse
+import os
+import sys
+from typing import Any, Dict, Optional
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from python.app.EventLogSink import SNAPSHOT_RECORD, log_files, read_records
+from python.app.GameEventBus import EventType
+from python.core.game.MazeGameService import MazeGameService
+from python.core.models.GameModels import Direction, GameState
+from python.logger import logger
+
+
+class EventLogReplayer:
+    """
+    事件日志回放器
+    快照和新关卡记录直接恢复迷宫与状态；移动和重置记录在游戏服务上重新执行，
+    并与记录中的结果比对。不一致时（例如并发客户端的事件在日志中交错）以记录的状态为准。
+    """
+
+    def __init__(self):
+        self.game_service: Optional[MazeGameService] = None
+        self.applied = 0
+        self.skipped = 0
+        self.divergences = 0
+        self.levels = 0
+        self.last_record: Optional[Dict[str, Any]] = None
+
+    def apply(self, record: Dict[str, Any], verbose: bool = False) -> None:
+        """应用一条记录"""
+        record_type = record.get("type")
+        data = record.get("data") or {}
+
+        if record_type == SNAPSHOT_RECORD or (record_type == EventType.NEW_LEVEL_GENERATED.value and "maze" in data):
+            self._ensure_service().restore(data)
+            self.levels += 1
+        elif self.game_service is None:
+            # 第一个快照之前的记录无法回放
+            self.skipped += 1
+            return
+        elif record_type == EventType.PLAYER_MOVED.value:
+            response = self.game_service.move_player(Direction(data["direction"]))
+            recorded = (data.get("result") or {}).get("scene_info") or data.get("game_state")
+            self._verify(record, response.game_state, recorded, verbose)
+        elif record_type == EventType.LEVEL_RESET.value:
+            game_state = self.game_service.reset_current_level()
+            self._verify(record, game_state, data.get("game_state"), verbose)
+        else:
+            self.skipped += 1
+            return
+
+        self.applied += 1
+        self.last_record = record
+        if verbose:
+            state = self.game_service.get_current_state()
+            pos = state.player_position
+            print(f"#{self.applied:<6} seq={record.get('seq')} {record_type:<20} "
+                  f"-> 列{pos.col}, 行{pos.row}, 移动{state.move_count}{' 完成' if state.is_completed else ''}")
+
+    def _ensure_service(self) -> MazeGameService:
+        if self.game_service is None:
+            # 初始迷宫会被快照覆盖，使用最小尺寸以减少生成开销
+            self.game_service = MazeGameService(5, 5)
+        return self.game_service
+
+    def _verify(self, record: Dict[str, Any], actual: GameState, recorded: Optional[Dict[str, Any]],
+                verbose: bool) -> None:
+        """比对重新执行的结果与记录的结果，不一致时采用记录的状态"""
+        if not recorded:
+            return
+        expected = GameState.from_dict(recorded)
+        if expected == actual:
+            return
+        self.divergences += 1
+        if verbose:
+            print(f"  ! seq={record.get('seq')} 回放结果与记录不一致，采用记录的状态")
+        self.game_service.restore({"game_state": recorded})
+
+
+def render_maze(game_service: MazeGameService) -> str:
+    """以文本形式绘制迷宫（P为玩家，E为出口）"""
+    maze_data = game_service.get_maze_data()
+    state = game_service.get_current_state()
+    rows = [list(row) for row in maze_data.to_text().splitlines()]
+    rows[state.exit_position.row][state.exit_position.col] = 'E'
+    rows[state.player_position.row][state.player_position.col] = 'P'
+    return '\n'.join(''.join(row) for row in rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='事件日志回放')
+    parser.add_argument('path', help='事件日志文件路径（自动包含轮转出的 .1 .2 ... 旧文件）')
+    parser.add_argument('--until', type=int, default=None,
+                        help='只回放前 N 条可回放的记录')
+    parser.add_argument('--until-time', type=float, default=None,
+                        help='只回放时间戳不晚于该值（Unix时间，秒）的记录')
+    parser.add_argument('--show-maze', action='store_true', help='输出回放结束时的迷宫')
+    parser.add_argument('--verbose', action='store_true', help='逐条输出回放过程')
+    args = parser.parse_args()
+
+    files = log_files(args.path)
+    if not files:
+        print(f"找不到事件日志: {args.path}", file=sys.stderr)
+        return 1
+
+    # 回放过程中游戏服务的日志没有意义
+    logger.setLevel("WARNING")
+
+    replayer = EventLogReplayer()
+    for record in read_records(args.path):
+        if args.until_time is not None and record.get("ts", 0) > args.until_time:
+            break
+        if args.until is not None and replayer.applied >= args.until:
+            break
+        replayer.apply(record, args.verbose)
+
+    if replayer.game_service is None:
+        print("日志中没有快照或带迷宫布局的新关卡记录，无法回放", file=sys.stderr)
+        return 1
+
+    state = replayer.game_service.get_current_state()
+    pos = state.player_position
+    print(f"日志文件: {', '.join(files)}")
+    print(f"已回放记录: {replayer.applied}（关卡 {replayer.levels}，跳过 {replayer.skipped}，"
+          f"不一致 {replayer.divergences}）")
+    if replayer.last_record is not None:
+        print(f"最后一条记录: seq={replayer.last_record.get('seq')} ts={replayer.last_record.get('ts')}")
+    print(f"迷宫尺寸: {state.maze_size.width} × {state.maze_size.height}")
+    print(f"玩家位置: 列{pos.col}, 行{pos.row}")
+    print(f"移动次数: {state.move_count}")
+    print(f"游戏状态: {'已完成' if state.is_completed else '进行中'}")
+    if args.show_maze:
+        print(render_maze(replayer.game_service))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
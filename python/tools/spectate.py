@@ -0,0 +1,140 @@
+# python/tools/spectate.py
+"""
+观战窗口 - 以缩略图网格实时显示多个会话的游戏
+
+通过跨进程事件桥接收其他进程（主程序或 run_mcp_server.py，均需指定相同的 --event-bridge）
+的新关卡与状态更新事件，每个会话一个缩略图。会话的迷宫布局来自其新关卡事件，
+在收到之前缩略图只显示玩家和出口。--demo N 在本进程中模拟 N 个会话，用于测量帧率。
+
+用法:
+    python python/tools/spectate.py --event-bridge /tmp/maze-events.sock
+    python python/tools/spectate.py --demo 120 --show-fps
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from typing import List
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import pygame
+
+from python.app.EventBridge import EventBridge
+from python.app.GameEventBus import EventType, GameEventBus
+from python.constants import UIConstants
+from python.core.game.MazeGameService import MazeGameService
+from python.core.models.GameModels import Direction
+from python.logger import logger
+from python.ui.MosaicView import MosaicView
+from python.utils.FontManager import FontManager
+
+SPECTATE_EVENT_TYPES = (EventType.NEW_LEVEL_GENERATED, EventType.GAME_STATE_UPDATED)
+
+
+def run_demo(sessions: int, width: int, height: int, moves_per_second: float, stop: threading.Event):
+    """在后台线程中模拟多个会话：每个会话各自的游戏随机移动，完成后生成新关卡"""
+    event_bus = GameEventBus()
+    services: List[MazeGameService] = []
+    for index in range(sessions):
+        service = MazeGameService(width, height)
+        services.append(service)
+        event_bus.emit(EventType.NEW_LEVEL_GENERATED, service.snapshot(), f"demo-{index + 1}")
+
+    directions = [Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT]
+    interval = 1.0 / max(0.1, moves_per_second * sessions)
+    while not stop.wait(interval):
+        index = random.randrange(sessions)
+        service = services[index]
+        session_id = f"demo-{index + 1}"
+        result = service.move_player(random.choice(directions))
+        if result.game_state.is_completed:
+            service.generate_new_level()
+            event_bus.emit(EventType.NEW_LEVEL_GENERATED, service.snapshot(), session_id)
+        elif result.success:
+            event_bus.emit(EventType.GAME_STATE_UPDATED,
+                           lambda result=result: {"game_state": result.game_state.to_dict()}, session_id)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='以缩略图网格观看多个会话的游戏')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--event-bridge', default=None,
+                        help='跨进程事件桥地址（与被观看进程的 --event-bridge 相同）')
+    source.add_argument('--demo', type=int, default=0, help='在本进程中模拟 N 个会话')
+    parser.add_argument('--demo-rate', type=float, default=5.0,
+                        help='模拟会话每个每秒的移动次数 (默认: 5)')
+    parser.add_argument('--maze-width', type=int, default=55, help='模拟会话的迷宫宽度 (默认: 55)')
+    parser.add_argument('--maze-height', type=int, default=35, help='模拟会话的迷宫高度 (默认: 35)')
+    parser.add_argument('--width', type=int, default=UIConstants.WINDOW_WIDTH, help='窗口宽度')
+    parser.add_argument('--height', type=int, default=UIConstants.WINDOW_HEIGHT, help='窗口高度')
+    parser.add_argument('--max-fps', type=int, default=UIConstants.MAX_FPS, help='最大帧率 (默认: 60)')
+    parser.add_argument('--budget', type=int, default=UIConstants.MOSAIC_REFRESH_BUDGET,
+                        help=f'每帧最多刷新的缩略图数 (默认: {UIConstants.MOSAIC_REFRESH_BUDGET})')
+    parser.add_argument('--show-fps', action='store_true', help='在窗口标题中显示帧率与帧耗时')
+    args = parser.parse_args()
+
+    # 模拟会话的游戏日志没有意义
+    logger.setLevel("ERROR" if args.demo else "INFO")
+
+    pygame.init()
+    screen = pygame.display.set_mode((args.width, args.height))
+    pygame.display.set_caption("迷宫观战")
+    screen.fill(UIConstants.BACKGROUND_COLOR)
+    pygame.display.flip()
+
+    view = MosaicView(screen.get_rect(), font_manager=FontManager(), refresh_budget=args.budget)
+    event_bus = GameEventBus()
+    # 每个会话只保留最新的状态更新；新关卡事件带迷宫布局，不能合并
+    subscriber = event_bus.subscribe_queued(SPECTATE_EVENT_TYPES, view.on_event, name="spectator",
+                                            max_size=UIConstants.MOSAIC_EVENT_QUEUE_SIZE)
+
+    bridge = None
+    stop = threading.Event()
+    if args.event_bridge:
+        bridge = EventBridge(args.event_bridge, publish_types=SPECTATE_EVENT_TYPES,
+                             subscribe_types=SPECTATE_EVENT_TYPES).start()
+    else:
+        threading.Thread(target=run_demo, args=(args.demo, args.maze_width, args.maze_height,
+                                                args.demo_rate, stop),
+                         daemon=True, name="Spectate-Demo").start()
+
+    clock = pygame.time.Clock()
+    frames, frame_time, window_start = 0, 0.0, time.perf_counter()
+    running = True
+    while running:
+        clock.tick(args.max_fps)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+        frame_start = time.perf_counter()
+        subscriber.drain()
+        rects = view.update(screen)
+        if rects:
+            pygame.display.update(rects)
+        frames += 1
+        frame_time += time.perf_counter() - frame_start
+
+        if args.show_fps and frame_start - window_start >= UIConstants.FPS_OVERLAY_INTERVAL:
+            pygame.display.set_caption(
+                f"迷宫观战 - {view.session_count()} 个会话 | FPS {frames / (frame_start - window_start):.1f} | "
+                f"{frame_time / frames * 1000:.2f} ms")
+            frames, frame_time, window_start = 0, 0.0, frame_start
+
+    stop.set()
+    event_bus.unsubscribe_queued(subscriber)
+    if bridge is not None:
+        bridge.close()
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,13 @@
 # python/ui/GameWindow.py
 """
 游戏主窗口 - 使用模块化UI组件
+
+主循环由脏标记驱动：没有待重绘内容时阻塞在 pygame.event.wait 上，
+只有界面、键盘事件或事件总线上的状态更新到达时才重绘，不再每帧重绘整个屏幕。
 """
+import time
+from typing import TYPE_CHECKING, List, Optional
+
 import pygame
 import pygame_gui
 
@@ -9,33 +15,71 @@ from python.app.GameEventBus import EventType, GameEventBus
 from python.constants import *
 from python.core.game.MazeGameService import MazeGameService
 from python.logger import logger
-from python.server.HttpGameServer import HttpGameServer
 from python.ui.MazeRenderer import MazeRenderer
 from python.ui.components.ControlPanel import ControlPanel
 from python.ui.components.FunctionPanel import FunctionPanel
 from python.ui.components.GameInfoPanel import GameInfoPanel
 from python.ui.components.MazePanel import MazePanel
 from python.utils.FontManager import FontManager
+from python.utils.MetricsRegistry import metrics
+
+if TYPE_CHECKING:
+    # 只用于类型标注：界面不依赖 Flask，--no-http 时不导入
+    from python.server.HttpGameServer import HttpGameServer
+
+FRAME_DURATION = metrics.histogram(
+    "maze_render_frame_duration_seconds", "主循环每帧的更新与绘制耗时")
+
+# 传给 pygame_gui 的单帧时间上限（秒），避免长时间空闲后界面动画跳变
+MAX_TIME_DELTA = 0.1
 
 
 class GameWindow:
     """游戏主窗口 - 使用模块化UI组件"""
 
-    def __init__(self, game_service: MazeGameService, server: HttpGameServer):
-        """初始化游戏窗口"""
+    def __init__(self, game_service: MazeGameService, server: Optional['HttpGameServer'],
+                 max_fps: int = UIConstants.MAX_FPS, show_fps: bool = False):
+        """
+        初始化游戏窗口
+
+        Args:
+            game_service: 游戏服务
+            server: HTTP服务器，None 表示未启用
+            max_fps: 最大帧率，0表示不限制
+            show_fps: 是否显示帧率与帧耗时
+        """
         self.game_service = game_service
         self.server = server
         self.event_bus = GameEventBus()
         self.running = True
         self.clock = pygame.time.Clock()
+        self.max_fps = max_fps
+        self.show_fps = show_fps
+
+        # 脏标记：整屏重绘，或只刷新的屏幕区域
+        self.full_redraw = True
+        self.dirty_rects: List[pygame.Rect] = []
+        # 收到输入后持续重绘到该时刻（perf_counter）
+        self.active_until = 0.0
+
+        # 帧率统计
+        self.fps_surface = None
+        self.fps_rect = None
+        self.fps_frames = 0
+        self.fps_frame_time = 0.0
+        self.fps_window_start = time.perf_counter()
 
         # 初始化pygame
         pygame.init()
 
+        # 其他线程有事件入队时投递该事件，唤醒阻塞等待中的主循环
+        self.wake_event_type = pygame.event.custom_type()
+
         # 窗口设置
         self.window_size = (UIConstants.WINDOW_WIDTH, UIConstants.WINDOW_HEIGHT)
         self.screen = pygame.display.set_mode(self.window_size)
-        pygame.display.set_caption(UIContent.WINDOW_TITLE.format(host=self.server.get_server_url()))
+        pygame.display.set_caption(UIContent.WINDOW_TITLE.format(
+            host=self.server.get_server_url() if self.server else "未启用"))
 
         # 初始化字体管理器
         self.font_manager = FontManager()
@@ -155,28 +199,46 @@ class GameWindow:
             return
 
         try:
-            # 更新游戏信息面板
-            self.components['game_info'].update_game_state(game_state.to_dict())
+            # 更新游戏信息面板（只更新值发生变化的元素）
+            info_panel = self.components['game_info']
+            if info_panel.update_game_state(game_state):
+                self._mark_dirty([info_panel.get_panel().rect])
 
             # 更新迷宫显示
-            self.components['maze'].update()
+            self._mark_dirty(self.components['maze'].update())
 
         except Exception as e:
             logger.error(f"刷新UI失败: {e}")
 
     def _setup_event_listeners(self):
         """设置事件监听器"""
-        # 订阅服务器事件
-        self.server.get_event_bus().subscribe(
+        # 订阅服务器事件：HTTP/MCP线程只把事件放入队列，由主循环在UI线程上处理，
+        # 未处理的旧状态更新会被新状态取代
+        self.state_subscriber = self.event_bus.subscribe_queued(
             EventType.GAME_STATE_UPDATED,
-            self._on_game_state_updated
+            self._on_game_state_updated,
+            name="game_window",
+            max_size=UIConstants.EVENT_QUEUE_SIZE,
+            wakeup=self._wake_main_loop
         )
 
         # 订阅键盘事件
         self.event_bus.subscribe(EventType.KEY_PRESSED, self._on_key_pressed)
 
+    def _wake_main_loop(self):
+        """唤醒主循环（在发送方线程上调用）"""
+        try:
+            pygame.event.post(pygame.event.Event(self.wake_event_type))
+        except pygame.error:
+            # 窗口已关闭或事件队列已满，主循环会在等待超时后处理队列
+            pass
+
+    def _mark_dirty(self, rects: List[pygame.Rect]):
+        """记录需要刷新的屏幕区域"""
+        self.dirty_rects.extend(rects)
+
     def _on_game_state_updated(self, event):
-        """游戏状态更新事件处理"""
+        """游戏状态更新事件处理（关卡变化由迷宫面板根据关卡版本自行处理）"""
         self._refresh_ui()
 
     def _on_key_pressed(self, event):
@@ -202,10 +264,22 @@ class GameWindow:
             pygame.K_n: "new",
         }
 
+        # 缩放键（0 恢复默认缩放）
+        zoom_mapping = {
+            pygame.K_EQUALS: 1,
+            pygame.K_PLUS: 1,
+            pygame.K_KP_PLUS: 1,
+            pygame.K_MINUS: -1,
+            pygame.K_KP_MINUS: -1,
+            pygame.K_0: 0,
+        }
+
         if key in direction_mapping:
             self._handle_move(direction_mapping[key])
         elif key in function_mapping:
             self._handle_function(function_mapping[key])
+        elif key in zoom_mapping:
+            self._mark_dirty(self.components['maze'].zoom(zoom_mapping[key]))
 
     def _handle_move(self, direction: str):
         """处理移动"""
@@ -216,16 +290,16 @@ class GameWindow:
             if result.success:
                 self._refresh_ui()
 
-                # 通过事件总线通知
-                self.event_bus.emit(EventType.PLAYER_MOVED, {
+                # 通过事件总线通知（负载只在有订阅者读取时构建）
+                self.event_bus.emit(EventType.PLAYER_MOVED, lambda: {
                     "direction": direction,
                     "result": result.to_dict()
                 })
 
                 # 通知服务器
-                self.server.get_event_bus().emit(
+                self.event_bus.emit(
                     EventType.GAME_STATE_UPDATED,
-                    {"game_state": self.game_service.get_current_state().to_dict()}
+                    lambda: {"game_state": result.game_state.to_dict()}
                 )
 
         except Exception as e:
@@ -241,11 +315,11 @@ class GameWindow:
     def _reset_level(self):
         """重置当前关卡"""
         try:
-            self.game_service.reset_current_level()
+            game_state = self.game_service.reset_current_level()
             self._refresh_ui()
 
-            self.event_bus.emit(EventType.LEVEL_RESET, {
-                "game_state": self.game_service.get_current_state().to_dict()
+            self.event_bus.emit(EventType.LEVEL_RESET, lambda: {
+                "game_state": game_state.to_dict()
             })
 
         except Exception as e:
@@ -254,61 +328,163 @@ class GameWindow:
     def _new_level(self):
         """生成新关卡"""
         try:
-            self.game_service.generate_new_level()
-            # 需要重新创建迷宫Surface，因为迷宫尺寸可能变化
-            self.components['maze']._refresh_maze_surface()
+            _, maze_data, game_state = self.game_service.generate_new_level()
+            # 迷宫面板检测到关卡版本变化后重建静态底图
             self._refresh_ui()
 
-            self.event_bus.emit(EventType.NEW_LEVEL_GENERATED, {
-                "game_state": self.game_service.get_current_state().to_dict()
+            self.event_bus.emit(EventType.NEW_LEVEL_GENERATED, lambda: {
+                "game_state": game_state.to_dict(),
+                "maze": maze_data.to_rle()
             })
 
         except Exception as e:
             logger.error(f"生成新关卡失败: {e}")
 
     def run(self):
-        """运行主循环"""
+        """
+        运行主循环
+
+        有待重绘内容或刚收到输入时按最大帧率运行，否则阻塞等待下一个事件；
+        收到输入后整屏重绘，只有状态更新时只刷新迷宫和信息面板中变化的区域。
+        """
         logger.info("开始游戏主循环")
+        last_update = time.perf_counter()
 
         while self.running:
-            time_delta = self.clock.tick(60) / 1000.0
-
-            # 处理所有事件
-            for event in pygame.event.get():
-                # 退出事件
-                if event.type == pygame.QUIT:
-                    self.running = False
-                    break
-
-                # 键盘事件
-                elif event.type == pygame.KEYDOWN:
-                    self.event_bus.emit(EventType.KEY_PRESSED, {"key": event.key})
+            if self._is_idle():
+                # 空闲：阻塞到下一个事件或超时，不占用CPU
+                events = [pygame.event.wait(self._idle_timeout_ms())]
+                events.extend(pygame.event.get())
+            else:
+                events = pygame.event.get()
 
-                # 传递事件给UI管理器
-                self.manager.process_events(event)
+            self._handle_events(events)
+            if not self.running:
+                break
 
-                # 只处理按钮按下和释放事件，不处理其他UI事件
-                if event.type == pygame_gui.UI_BUTTON_PRESSED:
-                    for component in self.components.values():
-                        component.handle_event(event)
+            # 处理其他线程发来的状态更新
+            frame_start = time.perf_counter()
+            self.state_subscriber.drain()
 
             # 更新UI管理器
-            self.manager.update(time_delta)
+            self.manager.update(min(frame_start - last_update, MAX_TIME_DELTA))
+            last_update = frame_start
 
-            # 绘制所有内容
-            self.screen.fill(UIConstants.BACKGROUND_COLOR)
-            self.manager.draw_ui(self.screen)
+            if self.show_fps:
+                self._update_fps_overlay(frame_start)
 
-            # 绘制迷宫（通过MazePanel组件）
-            self.components['maze'].draw(self.screen)
+            # 收到输入后的持续重绘时段内每帧整屏重绘，让界面动画（按钮悬停等）完成
+            if frame_start < self.active_until:
+                self.full_redraw = True
 
-            # 更新显示
-            pygame.display.flip()
+            if self.full_redraw or self.dirty_rects:
+                self._render()
+                frame_time = time.perf_counter() - frame_start
+                FRAME_DURATION.observe(frame_time)
+                self.fps_frames += 1
+                self.fps_frame_time += frame_time
+                # 帧率上限
+                self.clock.tick(self.max_fps)
 
         # 清理资源
         self._cleanup()
         logger.info("游戏主循环结束")
 
+    def _is_idle(self) -> bool:
+        """没有待重绘的内容，且距上次输入已超过持续重绘时长"""
+        return (not self.full_redraw and not self.dirty_rects
+                and time.perf_counter() >= self.active_until)
+
+    def _idle_timeout_ms(self) -> int:
+        """空闲等待的超时（毫秒），显示帧率时不晚于下次刷新帧率统计"""
+        timeout = UIConstants.IDLE_WAIT_MS
+        if self.show_fps:
+            remaining = self.fps_window_start + UIConstants.FPS_OVERLAY_INTERVAL - time.perf_counter()
+            timeout = min(timeout, max(1, int(remaining * 1000)))
+        return timeout
+
+    def _handle_events(self, events):
+        """处理pygame事件，输入事件标记整屏重绘"""
+        for event in events:
+            # 等待超时和唤醒事件不需要重绘，状态更新由 drain() 标记脏区域
+            if event.type in (pygame.NOEVENT, self.wake_event_type):
+                continue
+
+            self.full_redraw = True
+            self.active_until = time.perf_counter() + UIConstants.ACTIVE_RENDER_SECONDS
+
+            # 退出事件
+            if event.type == pygame.QUIT:
+                self.running = False
+                break
+
+            # 键盘事件
+            elif event.type == pygame.KEYDOWN:
+                self.event_bus.emit(EventType.KEY_PRESSED, {"key": event.key})
+
+            # 鼠标滚轮缩放迷宫
+            elif event.type == pygame.MOUSEWHEEL:
+                if self.components['maze'].camera.viewport.collidepoint(pygame.mouse.get_pos()):
+                    self.components['maze'].zoom(event.y)
+
+            # 传递事件给UI管理器
+            self.manager.process_events(event)
+
+            # 只处理按钮按下和释放事件，不处理其他UI事件
+            if event.type == pygame_gui.UI_BUTTON_PRESSED:
+                for component in self.components.values():
+                    component.handle_event(event)
+
+    def _render(self):
+        """重绘：整屏重绘时翻转整个屏幕，否则只重绘并刷新脏区域"""
+        rects = self.dirty_rects
+        if self.fps_rect is not None:
+            rects.append(self.fps_rect)
+
+        if not self.full_redraw:
+            self.screen.set_clip(rects[0].unionall(rects[1:]))
+
+        # 绘制所有内容
+        self.screen.fill(UIConstants.BACKGROUND_COLOR)
+        self.manager.draw_ui(self.screen)
+
+        # 绘制迷宫（通过MazePanel组件）
+        self.components['maze'].draw(self.screen)
+
+        if self.fps_surface is not None:
+            self.screen.blit(self.fps_surface, self.fps_rect)
+
+        # 更新显示
+        self.screen.set_clip(None)
+        if self.full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+
+        self.full_redraw = False
+        self.dirty_rects = []
+
+    def _update_fps_overlay(self, now: float):
+        """每隔 FPS_OVERLAY_INTERVAL 秒刷新帧率与平均帧耗时"""
+        elapsed = now - self.fps_window_start
+        if elapsed < UIConstants.FPS_OVERLAY_INTERVAL:
+            return
+
+        frame_ms = self.fps_frame_time / self.fps_frames * 1000 if self.fps_frames else 0.0
+        text = f"FPS {self.fps_frames / elapsed:.1f} | {frame_ms:.2f} ms"
+        self.fps_frames = 0
+        self.fps_frame_time = 0.0
+        self.fps_window_start = now
+
+        surface = self.font_manager.render_text(text, background=UIConstants.BACKGROUND_COLOR)
+        rect = surface.get_rect(topright=(self.window_size[0] - UIConstants.WINDOW_MARGIN,
+                                          UIConstants.WINDOW_MARGIN))
+        # 旧文字区域也需要刷新
+        if self.fps_rect is not None:
+            self.dirty_rects.append(self.fps_rect)
+        self.fps_surface, self.fps_rect = surface, rect
+        self.dirty_rects.append(rect)
+
     def _cleanup(self):
         """清理资源"""
         try:
@@ -321,8 +497,11 @@ class GameWindow:
                 if hasattr(element, 'kill'):
                     element.kill()
 
+            self.event_bus.unsubscribe_queued(self.state_subscriber)
+
             # 停止服务器
-            self.server.stop()
+            if self.server:
+                self.server.stop()
 
             # 退出pygame
             pygame.quit()
@@ -0,0 +1,65 @@
+# python/ui/HeadlessMazeRenderer.py
+"""
+离屏迷宫渲染器 - 不需要窗口，把游戏状态逐帧渲染到内存中的画布
+
+画布保留上一帧的内容：关卡不变时只用静态底图擦除玩家和出口的旧位置并绘制新位置，
+每帧的开销与迷宫大小无关。用于回放渲染等无界面场景（配合 SDL 的 dummy 视频驱动）。
+"""
+from typing import List, Optional
+
+import pygame
+
+from python.constants import GameConstants
+from python.core.game.MazeGameService import MazeGameService
+from python.ui.MazeRenderer import MazeRenderer
+
+
+class HeadlessMazeRenderer:
+    """离屏迷宫渲染器（增量渲染）"""
+
+    def __init__(self, cell_size: int = GameConstants.CELL_SIZE, renderer: Optional[MazeRenderer] = None):
+        """
+        Args:
+            cell_size: 单元格像素尺寸
+            renderer: 迷宫渲染器，默认使用与游戏窗口相同颜色的 MazeRenderer
+        """
+        self.cell_size = cell_size
+        self.renderer = renderer or MazeRenderer(cell_size)
+        self.level_version = -1
+        self.static_layer: Optional[pygame.Surface] = None
+        self.canvas: Optional[pygame.Surface] = None
+        # 上一帧玩家和出口所在的区域
+        self.overlay_rects: List[pygame.Rect] = []
+
+    def render(self, game_service: MazeGameService) -> List[pygame.Rect]:
+        """
+        把游戏服务的当前状态渲染到画布
+
+        Returns:
+            与上一帧相比变化的区域；关卡变化时为整个画布
+        """
+        level_version, maze_data = game_service.get_versioned_maze_data()
+        game_state = game_service.get_current_state()
+
+        if level_version != self.level_version or self.canvas is None:
+            self.level_version = level_version
+            self.static_layer = self.renderer.build_static_layer(maze_data, self.cell_size)
+            self.canvas = self.static_layer.copy()
+            self.overlay_rects = self.renderer.draw_overlay(self.canvas, game_state, cell_size=self.cell_size)
+            return [self.canvas.get_rect()]
+
+        # 用静态底图擦除上一帧的出口和玩家，再在新位置绘制
+        for rect in self.overlay_rects:
+            self.canvas.blit(self.static_layer, rect, rect)
+        previous_rects = self.overlay_rects
+        self.overlay_rects = self.renderer.draw_overlay(self.canvas, game_state, cell_size=self.cell_size)
+        return [rect for rect in previous_rects + self.overlay_rects
+                if rect not in previous_rects or rect not in self.overlay_rects]
+
+    def to_bytes(self) -> bytes:
+        """当前画布的 RGB 像素数据"""
+        return pygame.image.tobytes(self.canvas, "RGB")
+
+    def save(self, path: str):
+        """将当前画布保存为图片（格式由扩展名决定，如 .png）"""
+        pygame.image.save(self.canvas, path)
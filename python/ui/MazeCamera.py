@@ -0,0 +1,137 @@
+# python/ui/MazeCamera.py
+"""
+迷宫视口相机 - 缩放级别、跟随玩家、计算可见范围
+
+迷宫大于视口时只显示其中一部分，相机保证玩家始终位于视口中部区域；
+迷宫小于视口时居中显示。
+"""
+from typing import Optional, Sequence, Tuple
+
+import pygame
+
+from python.constants import GameConstants
+
+
+class MazeCamera:
+    """迷宫视口相机"""
+
+    # 玩家离视口边缘小于该比例时移动相机
+    FOLLOW_MARGIN = 0.3
+
+    def __init__(self, viewport: pygame.Rect,
+                 zoom_levels: Sequence[int] = GameConstants.ZOOM_CELL_SIZES,
+                 default_cell_size: int = GameConstants.CELL_SIZE):
+        """
+        Args:
+            viewport: 视口在屏幕上的区域
+            zoom_levels: 可选的单元格像素尺寸
+            default_cell_size: 默认单元格尺寸
+        """
+        self.viewport = pygame.Rect(viewport)
+        self.zoom_levels = tuple(sorted(zoom_levels))
+        self.default_index = min(range(len(self.zoom_levels)),
+                                 key=lambda index: abs(self.zoom_levels[index] - default_cell_size))
+        self.zoom_index = self.default_index
+
+        self.rows = 0
+        self.cols = 0
+        # 迷宫左上角相对视口左上角的偏移（像素）
+        self.origin_x = 0
+        self.origin_y = 0
+        # 跟随的单元格 (row, col)
+        self.target: Optional[Tuple[int, int]] = None
+
+    @property
+    def cell_size(self) -> int:
+        return self.zoom_levels[self.zoom_index]
+
+    def reset(self, rows: int, cols: int, row: int, col: int):
+        """
+        切换到新迷宫：选择能完整显示迷宫的最大缩放级别（不超过默认级别），
+        迷宫太大时使用默认级别并跟随玩家
+        """
+        self.rows, self.cols = rows, cols
+        self.zoom_index = self.default_index
+        for index in range(self.default_index, -1, -1):
+            cell_size = self.zoom_levels[index]
+            if cols * cell_size <= self.viewport.width and rows * cell_size <= self.viewport.height:
+                self.zoom_index = index
+                break
+
+        # 以玩家为视口中心开始
+        self.origin_x = self.viewport.width // 2 - (col * self.cell_size + self.cell_size // 2)
+        self.origin_y = self.viewport.height // 2 - (row * self.cell_size + self.cell_size // 2)
+        self.target = None
+        self.follow(row, col)
+
+    def follow(self, row: int, col: int) -> bool:
+        """
+        跟随玩家，返回相机是否移动
+        """
+        self.target = (row, col)
+        cell_size = self.cell_size
+        origin_x = self._follow_axis(self.origin_x, self.cols * cell_size, self.viewport.width,
+                                     col * cell_size + cell_size // 2)
+        origin_y = self._follow_axis(self.origin_y, self.rows * cell_size, self.viewport.height,
+                                     row * cell_size + cell_size // 2)
+        moved = (origin_x, origin_y) != (self.origin_x, self.origin_y)
+        self.origin_x, self.origin_y = origin_x, origin_y
+        return moved
+
+    def _follow_axis(self, origin: int, maze_size: int, view_size: int, target: int) -> int:
+        """计算单个方向上的偏移"""
+        if maze_size <= view_size:
+            return (view_size - maze_size) // 2
+
+        low = int(view_size * self.FOLLOW_MARGIN)
+        high = int(view_size * (1 - self.FOLLOW_MARGIN))
+        position = origin + target
+        if position < low:
+            origin = low - target
+        elif position > high:
+            origin = high - target
+        return max(view_size - maze_size, min(0, origin))
+
+    def zoom(self, steps: int) -> bool:
+        """
+        改变缩放级别（正数放大），保持跟随的单元格在屏幕上的位置不变
+
+        Returns:
+            缩放级别是否改变
+        """
+        index = max(0, min(len(self.zoom_levels) - 1, self.zoom_index + steps))
+        if index == self.zoom_index:
+            return False
+
+        old_size = self.cell_size
+        self.zoom_index = index
+        if self.target is not None:
+            row, col = self.target
+            screen_x = self.origin_x + col * old_size + old_size // 2
+            screen_y = self.origin_y + row * old_size + old_size // 2
+            self.origin_x = screen_x - (col * self.cell_size + self.cell_size // 2)
+            self.origin_y = screen_y - (row * self.cell_size + self.cell_size // 2)
+            self.follow(row, col)
+        return True
+
+    def reset_zoom(self) -> bool:
+        """恢复默认缩放级别"""
+        return self.zoom(self.default_index - self.zoom_index)
+
+    def screen_origin(self) -> Tuple[int, int]:
+        """迷宫左上角在屏幕上的位置"""
+        return self.viewport.x + self.origin_x, self.viewport.y + self.origin_y
+
+    def visible_range(self) -> Tuple[int, int, int, int]:
+        """
+        可见的单元格范围
+
+        Returns:
+            (起始行, 起始列, 结束行, 结束列)，结束值不包含
+        """
+        cell_size = self.cell_size
+        col_start = max(0, -self.origin_x // cell_size)
+        row_start = max(0, -self.origin_y // cell_size)
+        col_end = min(self.cols, (self.viewport.width - self.origin_x + cell_size - 1) // cell_size)
+        row_end = min(self.rows, (self.viewport.height - self.origin_y + cell_size - 1) // cell_size)
+        return row_start, col_start, row_end, col_end
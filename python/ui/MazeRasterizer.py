@@ -0,0 +1,75 @@
+# python/ui/MazeRasterizer.py
+"""
+迷宫光栅化 - 用 NumPy 数组运算一次性生成迷宫底图的全部像素
+
+通路和墙体各预先生成一个单元格大小的像素块（墙体网格线由边框掩码写入），
+按网格索引取块并重排即得到放大后的整张底图，最后用一次 surfarray.blit_array 写入Surface。
+未安装 numpy 时 rasterize() 返回 None，调用方应回退到逐单元格绘制。
+"""
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+from python.core.models.MazeModels import MazeData
+from python.logger import logger
+
+try:
+    # 可选依赖：安装 numpy 后使用数组光栅化
+    import numpy
+    import pygame.surfarray
+except ImportError:
+    numpy = None
+
+
+def grid_array(maze_data: MazeData) -> 'numpy.ndarray':
+    """将迷宫网格转换为 (height, width) 的 uint8 数组（1为墙）"""
+    buffer = b"".join(bytes(row) for row in maze_data.grid)
+    return numpy.frombuffer(buffer, dtype=numpy.uint8).reshape(maze_data.height, maze_data.width)
+
+
+def _border_mask(cell_size: int) -> 'numpy.ndarray':
+    """单元格内 1 像素边框的掩码 (cell_size, cell_size)"""
+    mask = numpy.zeros((cell_size, cell_size), dtype=bool)
+    mask[0, :] = mask[-1, :] = True
+    mask[:, 0] = mask[:, -1] = True
+    return mask
+
+
+def rasterize(maze_data: MazeData, cell_size: int,
+              colors: Dict[str, Tuple[int, int, int]], grid: bool = True) -> Optional[pygame.Surface]:
+    """
+    生成迷宫静态底图（墙体、通路、墙体网格线），与逐单元格绘制的结果一致
+
+    Args:
+        maze_data: 迷宫数据
+        cell_size: 单元格像素尺寸
+        colors: 颜色表，使用 'path'、'wall'、'grid' 三项
+        grid: 是否绘制墙体网格线
+
+    Returns:
+        底图Surface；未安装 numpy 或光栅化失败时返回 None
+    """
+    if numpy is None:
+        return None
+
+    try:
+        cells = grid_array(maze_data)
+        height, width = cells.shape
+
+        surface = pygame.Surface((width * cell_size, height * cell_size))
+        path_color, wall_color, grid_color = (surface.map_rgb(colors[name]) for name in ('path', 'wall', 'grid'))
+
+        # 两种单元格的像素块：通路为纯色，墙体带 1 像素网格线边框
+        tiles = numpy.empty((2, cell_size, cell_size), dtype=numpy.uint32)
+        tiles[0] = path_color
+        tiles[1] = numpy.where(_border_mask(cell_size), grid_color, wall_color) if grid else wall_color
+
+        # surfarray 的数组按 (x, y) 排列：按转置后的网格取像素块得到 (列, 行, 块内y, 块内x)，
+        # 调整为 (列, 块内x, 行, 块内y) 后合并即为整张底图
+        pixels = tiles[cells.T].transpose(0, 3, 1, 2).reshape(width * cell_size, height * cell_size)
+        pygame.surfarray.blit_array(surface, pixels)
+        return surface
+
+    except Exception as e:
+        logger.error(f"迷宫光栅化失败，回退到逐单元格绘制: {e}")
+        return None
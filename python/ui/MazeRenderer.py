@@ -1,17 +1,23 @@
 # python/ui/MazeRenderer.py
 """
-迷宫渲染器 - 简化版，移除缩放逻辑
+迷宫渲染器 - 按给定的单元格尺寸和偏移绘制，缩放和视口由 MazeCamera 决定
+
+渲染分为两层：墙体与通路组成的静态底图（每个关卡只构建一次），
+以及每帧绘制的玩家和出口（只有两个单元格）。
 """
+from typing import List, Optional, Tuple
+
 import pygame
 
 from python.constants import ColorConstants, GameConstants
 from python.core.models.GameModels import GameState
 from python.core.models.MazeModels import MazeData
 from python.logger import logger
+from python.ui import MazeRasterizer
 
 
 class MazeRenderer:
-    """迷宫渲染器 - 固定大小，居中显示"""
+    """迷宫渲染器 - 单元格尺寸可变（随 MazeCamera 缩放），底图可按视口裁剪局部构建"""
 
     def __init__(self, cell_size: int = GameConstants.CELL_SIZE):
         """初始化渲染器"""
@@ -24,9 +30,78 @@ class MazeRenderer:
             'grid': ColorConstants.GRID
         }
 
+    def build_static_layer(self, maze_data: MazeData, cell_size: Optional[int] = None,
+                           grid: bool = True) -> pygame.Surface:
+        """
+        构建静态底图（墙体、通路和墙体网格线），关卡不变时可一直复用
+
+        安装 numpy 时使用数组光栅化（见 MazeRasterizer）；否则先用通路色填充整张底图，
+        再把预先画好的墙体单元格通过一次 blits 调用贴到所有墙体位置。
+
+        Args:
+            maze_data: 迷宫数据（可以是 MazeData.crop 得到的局部）
+            cell_size: 单元格像素尺寸，默认使用渲染器的尺寸
+            grid: 是否绘制墙体网格线（单元格很小时应关闭，例如缩略图）
+        """
+        cell_size = cell_size or self.cell_size
+        layer = MazeRasterizer.rasterize(maze_data, cell_size, self.colors, grid)
+        if layer is not None:
+            return layer
+
+        layer = pygame.Surface((maze_data.width * cell_size, maze_data.height * cell_size))
+        layer.fill(self.colors['path'])
+
+        wall_tile = pygame.Surface((cell_size, cell_size))
+        wall_tile.fill(self.colors['wall'])
+        if grid:
+            pygame.draw.rect(wall_tile, self.colors['grid'], wall_tile.get_rect(), 1)
+
+        layer.blits([(wall_tile, (col * cell_size, row * cell_size))
+                     for row, cells in enumerate(maze_data.grid)
+                     for col, cell in enumerate(cells) if cell == 1],
+                    doreturn=False)
+        return layer
+
+    def build_thumbnail(self, maze_data: MazeData, size: Tuple[int, int]) -> pygame.Surface:
+        """
+        构建缩略图底图：每个单元格1像素绘制（不含网格线）后缩放到指定尺寸，
+        缩小时平滑缩放（细小通路不会整段消失），放大时按最近邻缩放
+        """
+        layer = self.build_static_layer(maze_data, 1, grid=False)
+        if size[0] < layer.get_width() or size[1] < layer.get_height():
+            return pygame.transform.smoothscale(layer, size)
+        return pygame.transform.scale(layer, size)
+
+    def draw_overlay(self, surface: pygame.Surface, game_state: GameState,
+                     offset: Tuple[int, int] = (0, 0), cell_size: Optional[int] = None) -> List[pygame.Rect]:
+        """
+        在静态底图之上绘制出口和玩家
+
+        Args:
+            surface: 目标Surface（通常是屏幕）
+            game_state: 游戏状态
+            offset: 迷宫左上角在目标Surface上的位置
+            cell_size: 单元格像素尺寸，默认使用渲染器的尺寸
+
+        Returns:
+            绘制的区域（出口、玩家）
+        """
+        exit_rect = self.cell_rect(game_state.exit_position.row, game_state.exit_position.col, offset, cell_size)
+        player_rect = self.cell_rect(game_state.player_position.row, game_state.player_position.col,
+                                     offset, cell_size)
+        pygame.draw.rect(surface, self.colors['exit'], exit_rect)
+        pygame.draw.rect(surface, self.colors['player'], player_rect)
+        return [exit_rect, player_rect]
+
+    def cell_rect(self, row: int, col: int, offset: Tuple[int, int] = (0, 0),
+                  cell_size: Optional[int] = None) -> pygame.Rect:
+        """单元格在目标Surface上的区域"""
+        cell_size = cell_size or self.cell_size
+        return pygame.Rect(offset[0] + col * cell_size, offset[1] + row * cell_size, cell_size, cell_size)
+
     def draw(self, maze_data: MazeData, game_state: GameState, surface: pygame.Surface) -> pygame.Surface:
         """
-        在给定的Surface上绘制迷宫
+        在给定的Surface上绘制完整迷宫（一次性绘制；持续显示时应缓存 build_static_layer 的结果）
 
         Args:
             maze_data: 迷宫数据对象
@@ -41,38 +116,8 @@ class MazeRenderer:
             return surface
 
         try:
-            # 清空Surface（使用透明色）
-            surface.fill((255, 255, 255, 0))
-
-            # 绘制所有单元格
-            for row in range(maze_data.height):
-                for col in range(maze_data.width):
-                    # 计算单元格位置
-                    x = col * self.cell_size
-                    y = row * self.cell_size
-
-                    rect = pygame.Rect(x, y, self.cell_size, self.cell_size)
-
-                    # 确定单元格类型和颜色
-                    from python.core.models.GameModels import Position
-                    pos = Position(row, col)
-
-                    if pos == game_state.player_position:
-                        color = self.colors['player']
-                    elif pos == game_state.exit_position:
-                        color = self.colors['exit']
-                    elif maze_data.is_wall(pos):
-                        color = self.colors['wall']
-                    else:
-                        color = self.colors['path']
-
-                    # 绘制单元格
-                    pygame.draw.rect(surface, color, rect)
-
-                    # 绘制网格线
-                    if maze_data.is_wall(pos):
-                        pygame.draw.rect(surface, self.colors['grid'], rect, 1)
-
+            surface.blit(self.build_static_layer(maze_data), (0, 0))
+            self.draw_overlay(surface, game_state)
             return surface
 
         except Exception as e:
@@ -0,0 +1,71 @@
+# python/ui/MazeTileCache.py
+"""
+迷宫底图分块缓存 - 按缩放级别分块渲染静态底图，只构建可见的块
+
+每块边长不超过 MAZE_TILE_PIXELS 像素，最近最少使用的块在超出容量时被淘汰，
+内存占用与迷宫大小无关。
+"""
+from collections import OrderedDict
+from typing import Iterator, Tuple
+
+import pygame
+
+from python.constants import UIConstants
+from python.core.models.MazeModels import MazeData
+from python.ui.MazeRenderer import MazeRenderer
+
+
+class MazeTileCache:
+    """迷宫底图分块缓存（按 (单元格尺寸, 块行, 块列) 缓存）"""
+
+    def __init__(self, renderer: MazeRenderer, tile_pixels: int = UIConstants.MAZE_TILE_PIXELS,
+                 max_tiles: int = UIConstants.MAZE_TILE_CACHE_SIZE):
+        self.renderer = renderer
+        self.tile_pixels = tile_pixels
+        self.max_tiles = max_tiles
+        self._tiles: 'OrderedDict[Tuple[int, int, int], pygame.Surface]' = OrderedDict()
+
+    def tile_cells(self, cell_size: int) -> int:
+        """每块的边长（单元格数）"""
+        return max(1, self.tile_pixels // cell_size)
+
+    def clear(self):
+        """清空缓存（关卡变化时调用）"""
+        self._tiles.clear()
+
+    def get(self, maze_data: MazeData, cell_size: int, tile_row: int, tile_col: int) -> pygame.Surface:
+        """获取一块底图，不在缓存中时构建"""
+        key = (cell_size, tile_row, tile_col)
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            return tile
+
+        cells = self.tile_cells(cell_size)
+        region = maze_data.crop(tile_row * cells, tile_col * cells, cells, cells)
+        tile = self.renderer.build_static_layer(region, cell_size)
+        self._tiles[key] = tile
+        while len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def visible_tiles(self, maze_data: MazeData, cell_size: int,
+                      visible_range: Tuple[int, int, int, int]) -> Iterator[Tuple[int, int, pygame.Surface]]:
+        """
+        遍历覆盖可见范围的块
+
+        Args:
+            visible_range: (起始行, 起始列, 结束行, 结束列)，见 MazeCamera.visible_range
+
+        Yields:
+            (块左上角相对迷宫左上角的x, y像素偏移, 块Surface)
+        """
+        row_start, col_start, row_end, col_end = visible_range
+        if row_end <= row_start or col_end <= col_start:
+            return
+
+        cells = self.tile_cells(cell_size)
+        tile_pixels = cells * cell_size
+        for tile_row in range(row_start // cells, (row_end - 1) // cells + 1):
+            for tile_col in range(col_start // cells, (col_end - 1) // cells + 1):
+                yield tile_col * tile_pixels, tile_row * tile_pixels, self.get(maze_data, cell_size, tile_row, tile_col)
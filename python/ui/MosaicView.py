@@ -0,0 +1,242 @@
+# python/ui/MosaicView.py
+"""
+多会话缩略图视图 - 在一个窗口中以网格显示多个会话的游戏
+
+每个会话的迷宫只在收到新关卡（或网格布局变化）时缩放成缩略图底图一次；
+之后每次移动只用底图擦除玩家和出口的旧位置并绘制新位置。
+每帧最多刷新 refresh_budget 个缩略图，其余的留到后续帧（按等待时间先后），
+因此会话数量再多，单帧的绘制量也有上限。
+"""
+import math
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import pygame
+
+from python.app.GameEventBus import EventType, GameEvent
+from python.constants import UIConstants
+from python.core.models.GameModels import GameState
+from python.core.models.MazeModels import MazeData
+from python.ui.MazeRenderer import MazeRenderer
+from python.utils.FontManager import FontManager
+
+
+class SessionThumbnail:
+    """一个会话的缩略图"""
+
+    def __init__(self, session_id: Optional[Hashable]):
+        self.session_id = session_id
+        self.maze_rle: Optional[str] = None
+        self.maze_data: Optional[MazeData] = None
+        self.game_state: Optional[GameState] = None
+        # 缩放后的静态底图及其在屏幕上的位置
+        self.base: Optional[pygame.Surface] = None
+        self.base_pos: Tuple[int, int] = (0, 0)
+        # 上次绘制的出口和玩家在屏幕上的区域
+        self.marker_rects: List[pygame.Rect] = []
+        self.needs_rebuild = True
+
+
+class MosaicView:
+    """多会话缩略图视图，事件通过 on_event 传入（在调用 update 的线程上）"""
+
+    # 缩略图之间的间距（像素）
+    TILE_PADDING = 4
+    # 玩家和出口标记的最小边长（像素），缩略图很小时仍然可见
+    MIN_MARKER_SIZE = 3
+
+    def __init__(self, rect: pygame.Rect, renderer: Optional[MazeRenderer] = None,
+                 font_manager: Optional[FontManager] = None,
+                 refresh_budget: int = UIConstants.MOSAIC_REFRESH_BUDGET,
+                 maze_provider: Optional[Callable[[GameState], Optional[MazeData]]] = None):
+        """
+        Args:
+            rect: 视图在屏幕上的区域
+            renderer: 迷宫渲染器（提供颜色和缩略图底图）
+            font_manager: 字体管理器（渲染会话标签），None 时不显示标签
+            refresh_budget: 每帧最多刷新的缩略图数
+            maze_provider: 会话尚未收到带迷宫布局的新关卡时，用于获取迷宫的回调；
+                           返回 None 时缩略图只显示玩家和出口
+        """
+        self.rect = pygame.Rect(rect)
+        self.renderer = renderer or MazeRenderer()
+        self.font_manager = font_manager
+        self.refresh_budget = max(1, refresh_budget)
+        self.maze_provider = maze_provider
+
+        self.thumbnails: Dict[Optional[Hashable], SessionThumbnail] = {}
+        # 等待刷新的会话（先进先出）
+        self._dirty: 'OrderedDict[Optional[Hashable], None]' = OrderedDict()
+        self.columns = 0
+        self.tile_size = (0, 0)
+        self.layout_changed = True
+
+    def on_event(self, event: GameEvent):
+        """处理 GAME_STATE_UPDATED 和 NEW_LEVEL_GENERATED 事件：只记录最新状态，绘制留给 update"""
+        data = event.data or {}
+        state = data.get("game_state")
+        if not state:
+            return
+
+        thumbnail = self.thumbnails.get(event.session_id)
+        if thumbnail is None:
+            thumbnail = self.thumbnails[event.session_id] = SessionThumbnail(event.session_id)
+            self._update_layout()
+
+        game_state = GameState.from_dict(state)
+        if event.event_type == EventType.NEW_LEVEL_GENERATED and data.get("maze"):
+            # 迷宫在刷新时才解析，避免一次收到大量新关卡时阻塞
+            thumbnail.maze_rle = data["maze"]
+            thumbnail.maze_data = None
+            thumbnail.needs_rebuild = True
+        elif thumbnail.game_state is None or thumbnail.game_state.maze_size != game_state.maze_size:
+            # 迷宫未知或已变化（新关卡事件不带布局）
+            thumbnail.maze_rle = None
+            thumbnail.maze_data = None
+            thumbnail.needs_rebuild = True
+        thumbnail.game_state = game_state
+        self._dirty[event.session_id] = None
+
+    def set_rect(self, rect: pygame.Rect):
+        """改变视图区域（例如窗口大小变化）"""
+        self.rect = pygame.Rect(rect)
+        self.columns = 0
+        self._update_layout()
+
+    def _update_layout(self):
+        """按会话数选择使缩略图最大的列数，布局变化时所有缩略图需要重建"""
+        count = max(1, len(self.thumbnails))
+        label_height = self._label_height()
+        best = None
+        for columns in range(1, count + 1):
+            rows = math.ceil(count / columns)
+            width, height = self.rect.width // columns, self.rect.height // rows
+            # 迷宫通常是横向的，按 3:2 估计缩略图能得到的尺寸
+            score = min(width, (height - label_height) * 3 // 2)
+            if best is None or score > best[0]:
+                best = (score, columns, (width, height))
+
+        _, columns, tile_size = best
+        if (columns, tile_size) == (self.columns, self.tile_size):
+            return
+        self.columns, self.tile_size = columns, tile_size
+        self.layout_changed = True
+        for session_id, thumbnail in self.thumbnails.items():
+            thumbnail.needs_rebuild = True
+            self._dirty[session_id] = None
+
+    def tile_rect(self, index: int) -> pygame.Rect:
+        """第 index 个缩略图的区域"""
+        width, height = self.tile_size
+        row, column = divmod(index, self.columns)
+        return pygame.Rect(self.rect.x + column * width, self.rect.y + row * height, width, height)
+
+    def update(self, surface: pygame.Surface) -> List[pygame.Rect]:
+        """
+        刷新等待中的缩略图（最多 refresh_budget 个）并绘制到 surface
+
+        Returns:
+            需要刷新的屏幕区域，可用于 pygame.display.update(rects)
+        """
+        rects = []
+        if self.layout_changed:
+            self.layout_changed = False
+            surface.fill(UIConstants.BACKGROUND_COLOR, self.rect)
+            rects.append(self.rect)
+
+        indexes = {session_id: index for index, session_id in enumerate(self.thumbnails)}
+        for _ in range(min(self.refresh_budget, len(self._dirty))):
+            session_id, _ = self._dirty.popitem(last=False)
+            thumbnail = self.thumbnails[session_id]
+            if thumbnail.needs_rebuild:
+                rects.append(self._draw_tile(surface, thumbnail, self.tile_rect(indexes[session_id])))
+            else:
+                rects.extend(self._draw_markers(surface, thumbnail))
+        return rects
+
+    def _draw_tile(self, surface: pygame.Surface, thumbnail: SessionThumbnail, tile: pygame.Rect) -> pygame.Rect:
+        """重建缩略图底图并绘制整个缩略图（标签、底图、玩家和出口）"""
+        thumbnail.needs_rebuild = False
+        surface.fill(UIConstants.BACKGROUND_COLOR, tile)
+        area = tile.inflate(-self.TILE_PADDING, -self.TILE_PADDING)
+
+        if self.font_manager:
+            # 布局变化时所有标签重新绘制，文字渲染结果由 FontManager 缓存
+            label = self.font_manager.render_text(self._label(thumbnail.session_id),
+                                                  UIConstants.MOSAIC_LABEL_FONT_SIZE)
+            surface.blit(label, area.topleft, pygame.Rect(0, 0, area.width, label.get_height()))
+            area.top += self._label_height()
+            area.height -= self._label_height()
+
+        if area.width <= 0 or area.height <= 0:
+            thumbnail.base = None
+            return tile
+        maze_size = thumbnail.game_state.maze_size
+        scale = min(area.width / maze_size.width, area.height / maze_size.height)
+        size = (max(1, int(maze_size.width * scale)), max(1, int(maze_size.height * scale)))
+
+        maze_data = self._maze_for(thumbnail)
+        if maze_data is not None:
+            thumbnail.base = self.renderer.build_thumbnail(maze_data, size)
+        else:
+            thumbnail.base = pygame.Surface(size)
+            thumbnail.base.fill(self.renderer.colors['path'])
+        thumbnail.base_pos = (area.centerx - size[0] // 2, area.top)
+        surface.blit(thumbnail.base, thumbnail.base_pos)
+
+        thumbnail.marker_rects = []
+        self._draw_markers(surface, thumbnail)
+        return tile
+
+    def _maze_for(self, thumbnail: SessionThumbnail) -> Optional[MazeData]:
+        """获取会话的迷宫：优先使用新关卡事件中的布局，否则询问 maze_provider"""
+        if thumbnail.maze_data is None and thumbnail.maze_rle:
+            thumbnail.maze_data = MazeData.from_rle(thumbnail.maze_rle)
+            thumbnail.maze_rle = None
+        if thumbnail.maze_data is None and self.maze_provider is not None:
+            maze_data = self.maze_provider(thumbnail.game_state)
+            if maze_data is not None and (maze_data.width, maze_data.height) == (
+                    thumbnail.game_state.maze_size.width, thumbnail.game_state.maze_size.height):
+                return maze_data
+        return thumbnail.maze_data
+
+    def _draw_markers(self, surface: pygame.Surface, thumbnail: SessionThumbnail) -> List[pygame.Rect]:
+        """用底图擦除上次的玩家和出口，再绘制新位置，返回变化的区域"""
+        if thumbnail.base is None:
+            return []
+
+        previous_rects = thumbnail.marker_rects
+        for rect in previous_rects:
+            surface.blit(thumbnail.base, rect, rect.move(-thumbnail.base_pos[0], -thumbnail.base_pos[1]))
+
+        game_state = thumbnail.game_state
+        exit_rect = self._cell_rect(thumbnail, game_state.exit_position.row, game_state.exit_position.col)
+        player_rect = self._cell_rect(thumbnail, game_state.player_position.row, game_state.player_position.col)
+        pygame.draw.rect(surface, self.renderer.colors['exit'], exit_rect)
+        pygame.draw.rect(surface, self.renderer.colors['player'], player_rect)
+        thumbnail.marker_rects = [exit_rect, player_rect]
+        return [rect for rect in previous_rects + thumbnail.marker_rects
+                if rect not in previous_rects or rect not in thumbnail.marker_rects]
+
+    def _cell_rect(self, thumbnail: SessionThumbnail, row: int, col: int) -> pygame.Rect:
+        """单元格在屏幕上的区域（不小于 MIN_MARKER_SIZE，且不超出底图）"""
+        width, height = thumbnail.base.get_size()
+        maze_size = thumbnail.game_state.maze_size
+        left, right = col * width // maze_size.width, (col + 1) * width // maze_size.width
+        top, bottom = row * height // maze_size.height, (row + 1) * height // maze_size.height
+        rect = pygame.Rect(left, top, max(1, right - left), max(1, bottom - top))
+        rect.inflate_ip(max(0, self.MIN_MARKER_SIZE - rect.width), max(0, self.MIN_MARKER_SIZE - rect.height))
+        rect.clamp_ip(thumbnail.base.get_rect())
+        return rect.move(thumbnail.base_pos)
+
+    def _label_height(self) -> int:
+        if not self.font_manager:
+            return 0
+        return self.font_manager.get_font(UIConstants.MOSAIC_LABEL_FONT_SIZE).get_linesize()
+
+    @staticmethod
+    def _label(session_id: Optional[Hashable]) -> str:
+        return "本地" if session_id is None else str(session_id)
+
+    def session_count(self) -> int:
+        return len(self.thumbnails)
@@ -2,11 +2,15 @@
 """
 游戏信息面板组件
 """
+from typing import Any, Dict, Optional, Union
+
 import pygame
 import pygame_gui
 
 from python.constants import *
+from python.core.models.GameModels import GameState
 from python.logger import logger
+from python.ui.components.RetainedState import RetainedState
 
 
 class GameInfoPanel:
@@ -33,6 +37,10 @@ class GameInfoPanel:
         # UI元素字典
         self.ui_elements = {}
 
+        # 上次显示的游戏状态，以及各标签上次设置的文字
+        self.game_state: Optional[GameState] = None
+        self.retained = RetainedState()
+
         # 创建面板
         self._create_panel()
         self._create_content()
@@ -132,42 +140,42 @@ class GameInfoPanel:
             container=panel
         )
 
-    def update_game_state(self, game_state: Dict[str, Any]):
-        """更新游戏状态显示"""
+    def update_game_state(self, game_state: Union[GameState, Dict[str, Any]]) -> bool:
+        """
+        更新游戏状态显示，只更新文字发生变化的标签
+
+        Returns:
+            是否有标签被更新
+        """
         try:
             if not game_state:
-                return
-
-            # 获取位置信息
-            player_pos = game_state.get("player_position", {"col": 0, "row": 0})
-            exit_pos = game_state.get("exit_position", {"col": 0, "row": 0})
-
-            # 更新标签文本
-            self.ui_elements['move_count'].set_text(
-                UIContent.MOVE_COUNT_LABEL.format(count=game_state.get("move_count", 0))
-            )
-
-            status = UIContent.STATUS_COMPLETED if game_state.get("is_completed", False) else UIContent.STATUS_PLAYING
-            self.ui_elements['status'].set_text(
-                UIContent.STATUS_LABEL.format(status=status)
-            )
-
-            self.ui_elements['position'].set_text(
-                UIContent.POSITION_LABEL.format(
-                    col=player_pos.get("col", 0),
-                    row=player_pos.get("row", 0)
-                )
-            )
-
-            self.ui_elements['exit'].set_text(
-                UIContent.EXIT_LABEL.format(
-                    col=exit_pos.get("col", 0),
-                    row=exit_pos.get("row", 0)
-                )
-            )
+                return False
+            if isinstance(game_state, dict):
+                game_state = GameState.from_dict(game_state)
+
+            # 状态未变化（状态比较不包含版本号）
+            if game_state == self.game_state:
+                return False
+            self.game_state = game_state
+
+            player_pos = game_state.player_position
+            exit_pos = game_state.exit_position
+            status = UIContent.STATUS_COMPLETED if game_state.is_completed else UIContent.STATUS_PLAYING
+
+            texts = {
+                'move_count': UIContent.MOVE_COUNT_LABEL.format(count=game_state.move_count),
+                'status': UIContent.STATUS_LABEL.format(status=status),
+                'position': UIContent.POSITION_LABEL.format(col=player_pos.col, row=player_pos.row),
+                'exit': UIContent.EXIT_LABEL.format(col=exit_pos.col, row=exit_pos.row),
+            }
+            changed = False
+            for key, text in texts.items():
+                changed |= self.retained.set_text(key, self.ui_elements[key], text)
+            return changed
 
         except Exception as e:
             logger.error(f"更新游戏信息面板失败: {e}")
+            return False
 
     def get_panel(self) -> pygame_gui.elements.UIPanel:
         """获取面板元素"""
@@ -1,13 +1,19 @@
 # python/ui/components/MazePanel.py
 """
 迷宫显示面板组件
+
+迷宫通过相机显示：只绘制视口内的底图分块，大迷宫跟随玩家滚动，可缩放。
 """
+from typing import List
+
 import pygame
 import pygame_gui
 
 from python.core.game.MazeGameService import MazeGameService
 from python.logger import logger
+from python.ui.MazeCamera import MazeCamera
 from python.ui.MazeRenderer import MazeRenderer
+from python.ui.MazeTileCache import MazeTileCache
 
 
 class MazePanel:
@@ -28,16 +34,24 @@ class MazePanel:
         self.container_rect = container_rect
         self.game_service = game_service
         self.maze_renderer = maze_renderer
-        self.maze_surface = None
+        self.tile_cache = MazeTileCache(maze_renderer)
+        self.maze_data = None
+        self.level_version = -1
+        self.game_state = None
+        # 上次 update 时玩家和出口在屏幕上的区域
+        self.overlay_rects: List[pygame.Rect] = []
+        # 相机在两次 update 之间被缩放，下次 update 需要刷新整个视口
+        self.view_changed = False
 
         # UI元素字典
         self.ui_elements = {}
 
         # 创建面板
         self._create_panel()
+        self.camera = MazeCamera(self.ui_elements['panel'].rect)
 
         # 初始刷新
-        self._refresh_maze_surface()
+        self.update()
 
         logger.debug("迷宫显示面板初始化完成")
 
@@ -49,45 +63,85 @@ class MazePanel:
             object_id='#maze_panel'
         )
 
-    def _refresh_maze_surface(self):
-        """刷新迷宫Surface"""
-        maze_data = self.game_service.get_maze_data()
+    def _load_level(self):
+        """切换到新关卡：清空底图分块缓存并重置相机（关卡变化时调用）"""
+        level_version, maze_data = self.game_service.get_versioned_maze_data()
         if not maze_data:
             return
 
-        # 计算迷宫原始尺寸
-        maze_width = maze_data.width * self.maze_renderer.cell_size
-        maze_height = maze_data.height * self.maze_renderer.cell_size
+        self.maze_data = maze_data
+        self.level_version = level_version
+        self.tile_cache.clear()
+        player = self.game_service.get_current_state().player_position
+        self.camera.reset(maze_data.height, maze_data.width, player.row, player.col)
 
-        # 使用固定尺寸（原始尺寸）
-        self.maze_surface = pygame.Surface((maze_width, maze_height), pygame.SRCALPHA)
+        logger.debug(f"迷宫面板切换关卡: {maze_data.width}x{maze_data.height}, 单元格 {self.camera.cell_size}px")
 
-        logger.debug(f"迷宫Surface创建: {maze_width}x{maze_height}")
+    def update(self) -> List[pygame.Rect]:
+        """
+        更新面板显示：关卡变化时重置缓存和相机，否则只记录玩家和出口的新位置并让相机跟随玩家
+
+        Returns:
+            屏幕坐标系下需要刷新的区域，可用于 pygame.display.update(rects)
+        """
+        rebuilt = self.game_service.level_version != self.level_version
+        if rebuilt:
+            self._load_level()
 
-    def update(self):
-        """更新面板显示"""
-        maze_data = self.game_service.get_maze_data()
         game_state = self.game_service.get_current_state()
+        self.game_state = game_state
+        if not self.maze_data:
+            return []
+
+        player = game_state.player_position
+        moved = self.camera.follow(player.row, player.col)
+
+        origin = self.camera.screen_origin()
+        cell_size = self.camera.cell_size
+        previous_rects = self.overlay_rects
+        self.overlay_rects = [
+            self.maze_renderer.cell_rect(game_state.exit_position.row, game_state.exit_position.col,
+                                         origin, cell_size),
+            self.maze_renderer.cell_rect(player.row, player.col, origin, cell_size)
+        ]
+
+        viewport = self.camera.viewport
+        if rebuilt or moved or self.view_changed:
+            self.view_changed = False
+            return [viewport]
+        return [rect.clip(viewport) for rect in previous_rects + self.overlay_rects
+                if rect not in previous_rects or rect not in self.overlay_rects]
+
+    def zoom(self, steps: int) -> List[pygame.Rect]:
+        """
+        缩放迷宫（正数放大，0 恢复默认级别）
 
-        if maze_data and game_state and self.maze_surface:
-            # 重新绘制迷宫
-            self.maze_renderer.draw(maze_data, game_state, self.maze_surface)
+        Returns:
+            屏幕坐标系下需要刷新的区域，缩放级别未改变时为空列表
+        """
+        changed = self.camera.zoom(steps) if steps else self.camera.reset_zoom()
+        if not changed:
+            return []
+        self.view_changed = True
+        return self.update()
 
     def draw(self, screen: pygame.Surface):
-        """绘制迷宫到屏幕"""
-        if not self.maze_surface:
+        """绘制迷宫到屏幕：贴上视口内的底图分块，再绘制玩家和出口"""
+        if not self.maze_data or not self.game_state:
             return
 
-        # 获取面板位置和大小
-        panel = self.ui_elements['panel']
-        container_rect = panel.rect
+        previous_clip = screen.get_clip()
+        screen.set_clip(self.camera.viewport)
 
-        # 计算居中偏移
-        surf_rect = self.maze_surface.get_rect()
-        surf_rect.center = container_rect.center
+        origin_x, origin_y = self.camera.screen_origin()
+        cell_size = self.camera.cell_size
+        screen.blits([(tile, (origin_x + x, origin_y + y))
+                      for x, y, tile in self.tile_cache.visible_tiles(self.maze_data, cell_size,
+                                                                       self.camera.visible_range())],
+                     doreturn=False)
+        self.maze_renderer.draw_overlay(screen, self.game_state, (origin_x, origin_y), cell_size)
 
-        # 绘制到屏幕上
-        screen.blit(self.maze_surface, surf_rect)
+        screen.set_clip(previous_clip)
 
     def get_panel(self) -> pygame_gui.elements.UIPanel:
         """获取面板元素"""
@@ -97,12 +151,16 @@ class MazePanel:
         """设置面板位置"""
         if 'panel' in self.ui_elements:
             self.ui_elements['panel'].set_relative_position(position)
+            self.camera.viewport = pygame.Rect(self.ui_elements['panel'].rect)
+            self.view_changed = True
 
     def set_dimensions(self, dimensions: tuple):
         """设置面板尺寸"""
         if 'panel' in self.ui_elements:
             self.ui_elements['panel'].set_dimensions(dimensions)
             self.container_rect = pygame.Rect(self.container_rect.topleft, dimensions)
+            self.camera.viewport = pygame.Rect(self.ui_elements['panel'].rect)
+            self.level_version = -1
 
     def handle_event(self, event) -> bool:
         """
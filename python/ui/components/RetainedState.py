@@ -0,0 +1,44 @@
+# python/ui/components/RetainedState.py
+"""
+面板元素的保留状态 - 记录每个 pygame_gui 元素上次设置的值，值未变化时不再调用元素
+
+pygame_gui 的 set_text 等方法每次调用都会重新排版并渲染文字，即使文字没有变化；
+面板通过本类设置元素，一次状态更新的界面开销只与实际变化的元素数有关。
+"""
+from typing import Any, Callable, Dict, Hashable
+
+from python.utils.MetricsRegistry import metrics
+
+ELEMENT_UPDATES = metrics.counter(
+    "maze_ui_element_updates_total", "面板元素更新次数（applied 为实际更新，skipped 为值未变化而跳过）",
+    ("outcome",))
+
+
+class RetainedState:
+    """面板元素的保留状态"""
+
+    def __init__(self):
+        self._values: Dict[Hashable, Any] = {}
+
+    def apply(self, key: Hashable, value: Any, setter: Callable[[Any], None]) -> bool:
+        """
+        值与上次不同时调用 setter(value)
+
+        Returns:
+            是否实际更新了元素
+        """
+        if key in self._values and self._values[key] == value:
+            ELEMENT_UPDATES.inc("skipped")
+            return False
+        setter(value)
+        self._values[key] = value
+        ELEMENT_UPDATES.inc("applied")
+        return True
+
+    def set_text(self, key: Hashable, element, text: str) -> bool:
+        """设置标签或按钮的文字"""
+        return self.apply(key, text, element.set_text)
+
+    def reset(self):
+        """清空记录（元素重建后调用，下次设置时总是更新）"""
+        self._values.clear()
@@ -3,11 +3,12 @@
 字体管理器 - 专门处理pygame-gui字体问题
 """
 import os
-from typing import Any, Dict
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 
 import pygame
 
-from python.constants import ResourcePaths
+from python.constants import ColorConstants, ResourcePaths, UIConstants
 from python.logger import logger
 
 
@@ -16,6 +17,9 @@ class FontManager:
 
     def __init__(self):
         self.font_path = None
+        self._fonts: Dict[int, pygame.font.Font] = {}
+        # 渲染过的文字（最近最少使用的先淘汰）
+        self._text_cache: 'OrderedDict[Tuple, pygame.Surface]' = OrderedDict()
         self._load_font()
 
     def _load_font(self):
@@ -70,8 +74,9 @@ class FontManager:
                 logger.warning("字体文件不存在，使用默认字体")
                 return False
 
-            # 测试字体是否能被pygame加载
+            # 测试字体是否能被pygame加载，加载结果留给 get_font 复用
             test_font = pygame.font.Font(self.font_path, 14)
+            self._fonts.setdefault(14, test_font)
             test_surface = test_font.render("测试", True, (0, 0, 0))
 
             if test_surface.get_width() == 0:
@@ -151,3 +156,29 @@ class FontManager:
 
         # 回退到系统字体
         return pygame.font.SysFont(None, size)
+
+    def get_font(self, size: int = 14) -> pygame.font.Font:
+        """获取pygame字体对象（按字号缓存，不重复加载字体文件）"""
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = self.create_pygame_font(size)
+        return font
+
+    def render_text(self, text: str, size: int = 14, color: Tuple[int, int, int] = ColorConstants.TEXT_PRIMARY,
+                    background: Optional[Tuple[int, int, int]] = None) -> pygame.Surface:
+        """
+        渲染文字（用于非UI渲染），相同的文字、字号和颜色只渲染一次
+
+        返回的Surface由缓存共享，调用方不应修改
+        """
+        key = (text, size, color, background)
+        surface = self._text_cache.get(key)
+        if surface is not None:
+            self._text_cache.move_to_end(key)
+            return surface
+
+        surface = self.get_font(size).render(text, True, color, background)
+        self._text_cache[key] = surface
+        if len(self._text_cache) > UIConstants.TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+        return surface
@@ -0,0 +1,262 @@
+# python/utils/MetricsRegistry.py
+"""
+指标注册表 - 计数器与延迟直方图，输出 Prometheus 文本格式
+
+记录路径不加锁：每个线程写入自己的分片，只有抓取（render）时才合并各分片，
+因此可以在满负载下常开。已退出线程的分片在抓取时或每新建 RETIRE_INTERVAL 个分片时合并回收。
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# 默认延迟直方图分桶（秒）
+DEFAULT_LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                           0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+# 每新建这么多个线程分片，就把已退出线程的分片合并一次（没有抓取时分片数也有上限）
+RETIRE_INTERVAL = 64
+
+
+class _Shard:
+    """单个线程的指标分片"""
+
+    __slots__ = ('thread', 'counters', 'histograms')
+
+    def __init__(self, thread: Optional[threading.Thread]):
+        self.thread = thread
+        self.counters: Dict[Tuple[str, LabelValues], float] = {}
+        # 直方图值: [各分桶计数..., +Inf计数, 总和]
+        self.histograms: Dict[Tuple[str, LabelValues], List[float]] = {}
+
+
+class Metric:
+    """指标基类"""
+
+    metric_type = "untyped"
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, help_text: str, label_names: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+
+
+class Counter(Metric):
+    """单调递增计数器"""
+
+    metric_type = "counter"
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        """计数加一（或指定数量）"""
+        counters = self.registry._shard().counters
+        key = (self.name, label_values)
+        counters[key] = counters.get(key, 0.0) + amount
+
+
+class Histogram(Metric):
+    """直方图"""
+
+    metric_type = "histogram"
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, help_text: str,
+                 label_names: Sequence[str], buckets: Sequence[float]):
+        super().__init__(registry, name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values: str):
+        """记录一个观测值"""
+        histograms = self.registry._shard().histograms
+        key = (self.name, label_values)
+        values = histograms.get(key)
+        if values is None:
+            values = histograms[key] = [0.0] * (len(self.buckets) + 2)
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    @contextmanager
+    def time(self, *label_values: str):
+        """以上下文管理器形式记录耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+
+class MetricsRegistry:
+    """
+    指标注册表（单例）
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(MetricsRegistry, cls).__new__(cls)
+                    instance._init_singleton()
+                    cls._instance = instance
+        return cls._instance
+
+    def _init_singleton(self):
+        """初始化单例"""
+        self._metrics: Dict[str, Metric] = {}
+        self._callbacks: Dict[str, Tuple[str, str, Callable[[], Dict[LabelValues, float]], Tuple[str, ...]]] = {}
+        self._shards: List[_Shard] = []
+        # 已退出线程的分片合并到这里，避免每请求一个线程的服务器让分片无限增长
+        self._retired = _Shard(None)
+        self._new_shards = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _shard(self) -> _Shard:
+        """获取当前线程的分片"""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+                self._new_shards += 1
+                if self._new_shards >= RETIRE_INTERVAL:
+                    self._retire_dead_shards()
+            self._local.shard = shard
+            return shard
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        """注册（或获取已注册的）计数器"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Counter(self, name, help_text, label_names)
+        return metric
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        """注册（或获取已注册的）直方图"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(self, name, help_text, label_names, buckets)
+        return metric
+
+    def register_callback(self, name: str, help_text: str, metric_type: str,
+                          callback: Callable[[], Dict[LabelValues, float]], label_names: Sequence[str] = ()):
+        """注册在抓取时才计算的指标（例如从其他组件读取的统计值）"""
+        with self._lock:
+            self._callbacks[name] = (help_text, metric_type, callback, tuple(label_names))
+
+    def _retire_dead_shards(self):
+        """把已退出线程的分片合并到 _retired 并移除（持有锁时调用）"""
+        live_shards = []
+        for shard in self._shards:
+            if shard.thread is not None and not shard.thread.is_alive():
+                # 线程已退出，不会再写入，可以安全合并
+                self._merge_into(self._retired, shard.counters.copy(), shard.histograms.copy())
+            else:
+                live_shards.append(shard)
+        self._shards = live_shards
+        self._new_shards = 0
+
+    def _merge(self) -> Tuple[Dict, Dict]:
+        """合并所有分片（持有锁时调用）"""
+        self._retire_dead_shards()
+
+        merged = _Shard(None)
+        self._merge_into(merged, self._retired.counters, self._retired.histograms)
+        for shard in self._shards:
+            self._merge_into(merged, shard.counters.copy(), shard.histograms.copy())
+        return merged.counters, merged.histograms
+
+    @staticmethod
+    def _merge_into(target: _Shard, counters: Dict, histograms: Dict):
+        for key, value in counters.items():
+            target.counters[key] = target.counters.get(key, 0.0) + value
+        for key, values in histograms.items():
+            existing = target.histograms.get(key)
+            if existing is None:
+                target.histograms[key] = list(values)
+            else:
+                for index, value in enumerate(values):
+                    existing[index] += value
+
+    def render_prometheus(self) -> str:
+        """输出 Prometheus 文本格式（0.0.4）"""
+        with self._lock:
+            counters, histograms = self._merge()
+            metrics = list(self._metrics.values())
+            callbacks = list(self._callbacks.items())
+
+        lines: List[str] = []
+        for metric in sorted(metrics, key=lambda m: m.name):
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            if isinstance(metric, Histogram):
+                self._render_histogram(lines, metric, histograms)
+            else:
+                for (name, label_values), value in sorted(counters.items()):
+                    if name == metric.name:
+                        lines.append(f"{name}{_format_labels(metric.label_names, label_values)} {_format_value(value)}")
+
+        for name, (help_text, metric_type, callback, label_names) in sorted(callbacks):
+            try:
+                samples = callback()
+            except Exception:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for label_values, value in samples.items():
+                lines.append(f"{name}{_format_labels(label_names, label_values)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histogram(lines: List[str], metric: Histogram, histograms: Dict):
+        for (name, label_values), values in sorted(histograms.items()):
+            if name != metric.name:
+                continue
+            cumulative = 0.0
+            for bound, count in zip(metric.buckets, values):
+                cumulative += count
+                labels = _format_labels(metric.label_names + ("le",), label_values + (_format_value(bound),))
+                lines.append(f"{name}_bucket{labels} {_format_value(cumulative)}")
+            cumulative += values[len(metric.buckets)]
+            labels = _format_labels(metric.label_names + ("le",), label_values + ("+Inf",))
+            lines.append(f"{name}_bucket{labels} {_format_value(cumulative)}")
+            base_labels = _format_labels(metric.label_names, label_values)
+            lines.append(f"{name}_sum{base_labels} {values[-1]!r}")
+            lines.append(f"{name}_count{base_labels} {_format_value(cumulative)}")
+
+    def reset(self):
+        """清空所有已记录的数值（保留指标定义）"""
+        with self._lock:
+            for shard in self._shards:
+                shard.counters.clear()
+                shard.histograms.clear()
+            self._retired = _Shard(None)
+
+
+def _format_labels(label_names: Sequence[str], label_values: Sequence[str]) -> str:
+    if not label_names:
+        return ""
+    pairs = []
+    for name, value in zip(label_names, label_values):
+        escaped = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+# 全局指标注册表
+metrics = MetricsRegistry()
@@ -0,0 +1,126 @@
+# python/utils/StartupProfiler.py
+"""
+启动分析器 - 记录启动各阶段的耗时，可选地统计各模块的导入耗时
+
+阶段耗时总是记录（开销可以忽略），并以 maze_startup_phase_seconds 指标导出；
+导入耗时需要替换 builtins.__import__，只在 --profile-startup 时启用，且只统计启动线程上的导入。
+"""
+import builtins
+import sys
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from typing import Dict, List, Optional, TextIO, Tuple
+
+from python.utils.MetricsRegistry import metrics
+
+
+def _pad(text: str, width: int) -> str:
+    """按显示宽度补齐空格（中文字符占两列）"""
+    display_width = sum(2 if unicodedata.east_asian_width(char) in "WF" else 1 for char in text)
+    return text + " " * max(0, width - display_width)
+
+
+class ImportTimer:
+    """统计每个模块导入的自身耗时（不含其导入的其他模块），类似 python -X importtime"""
+
+    def __init__(self):
+        self.self_times: Dict[str, float] = {}
+        self._stack: List[float] = []
+        self._thread: Optional[threading.Thread] = None
+        self._original_import = None
+
+    def install(self):
+        if self._original_import is not None:
+            return
+        self._thread = threading.current_thread()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original_import is None:
+            return
+        builtins.__import__ = self._original_import
+        self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # 相对导入、已导入的模块和其他线程上的导入直接交给原函数，耗时计入调用方
+        if level or name in sys.modules or threading.current_thread() is not self._thread:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        start = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            self.self_times[name] = self.self_times.get(name, 0.0) + elapsed - children
+            if self._stack:
+                self._stack[-1] += elapsed
+
+    def by_package(self) -> List[Tuple[str, float]]:
+        """按包汇总的导入耗时（本项目的模块按 python.子包 汇总），从高到低排列"""
+        totals: Dict[str, float] = {}
+        for name, seconds in self.self_times.items():
+            parts = name.split(".")
+            package = ".".join(parts[:2]) if parts[0] == "python" else parts[0]
+            totals[package] = totals.get(package, 0.0) + seconds
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+class StartupProfiler:
+    """启动分析器"""
+
+    def __init__(self, trace_imports: bool = False):
+        """
+        Args:
+            trace_imports: 是否统计各模块的导入耗时
+        """
+        self.start_time = time.perf_counter()
+        self.phases: List[Tuple[str, float, int]] = []
+        self.import_timer = ImportTimer() if trace_imports else None
+        if self.import_timer:
+            self.import_timer.install()
+        metrics.register_callback(
+            "maze_startup_phase_seconds", "启动各阶段耗时", "gauge",
+            lambda: {(name,): seconds for name, seconds, _ in self.phases}, ("phase",))
+
+    @contextmanager
+    def phase(self, name: str):
+        """记录一个启动阶段的耗时和期间新导入的模块数"""
+        modules = len(sys.modules)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start, len(sys.modules) - modules))
+
+    def elapsed(self) -> float:
+        """从创建分析器到现在的秒数"""
+        return time.perf_counter() - self.start_time
+
+    def finish(self):
+        """停止统计导入耗时（服务器线程上的后续导入不再计入）"""
+        if self.import_timer:
+            self.import_timer.uninstall()
+
+    def report(self, top: int = 15) -> List[str]:
+        """生成启动分析报告"""
+        total = self.elapsed()
+        lines = ["=" * 60, f"启动分析 (总耗时 {total * 1000:.1f} ms)", "=" * 60, "阶段耗时:"]
+        for name, seconds, modules in self.phases:
+            lines.append(f"  {_pad(name, 16)} {seconds * 1000:8.1f} ms  {seconds / total:6.1%}  新导入模块 {modules}")
+
+        if self.import_timer:
+            packages = self.import_timer.by_package()
+            lines += ["", f"导入耗时 (按包，前 {min(top, len(packages))} 个，共 {len(packages)} 个):"]
+            for package, seconds in packages[:top]:
+                lines.append(f"  {package:<28} {seconds * 1000:8.1f} ms")
+        lines.append("=" * 60)
+        return lines
+
+    def print_report(self, stream: TextIO = sys.stderr, top: int = 15):
+        for line in self.report(top):
+            print(line, file=stream)